@@ -40,9 +40,16 @@ REQUIREMENTS = [
     "vt2geojson>=0.2.1",
     "haversine>=2.3.1",
     "shapely>=2.1.0",
+    "numpy>=1.21.0",
     "turfpy>=0.0.7",
     "geojson>=2.5.0",
 ]
+# Optional dependencies, installed with e.g. pip install "mapillary[parquet]"
+EXTRAS_REQUIRE = {
+    "parquet": ["pyarrow>=8.0.0"],
+    "zstd": ["zstandard>=0.15.0"],
+    "json": ["orjson>=3.6.0"],
+}
 CLASSIFIERS = [
     "Development Status :: 5 - Production/Stable",
     "Intended Audience :: Developers",
@@ -122,6 +129,8 @@ setuptools.setup(
     # # A string or list of strings specifying what other distributions need to be installed
     # # when this one is
     install_requires=REQUIREMENTS,
+    # # Optional dependencies, grouped by functionality
+    extras_require=EXTRAS_REQUIRE,
     # # What Python version is required
     python_requires=REQUIRES_PYTHON,
     # # What package data to include
@@ -16,3 +16,4 @@ from . import detection  # noqa: F401
 from . import feature  # noqa: F401
 from . import image  # noqa: F401
 from . import save  # noqa: F401
+from . import store  # noqa: F401
@@ -15,19 +15,34 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 """
 
 # Package imports
+import itertools
+import logging
 import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
 
 # Local imports
 
 # # Adapter Imports
 from mapillary.models.api.entities import EntityAdapter
+from mapillary.models.api.vector_tiles import DECODE_ERRORS
 
 # # Models
 from mapillary.models.geojson import GeoJSON
+from mapillary.models.logger import Logger
+
+# # Utils
+from mapillary.utils.format import decode_pixel_geometries
 
 # # Rules
 from mapillary.utils.verify import valid_id
 
+logger: logging.Logger = Logger.setup_logger(name="mapillary.controller.detection")
+
+# The errors raised on a response without detections, or on an undecodable pixel geometry
+PAYLOAD_ERRORS = DECODE_ERRORS + (KeyError, TypeError)
+
 
 def get_image_detections_controller(
     image_id: typing.Union[str, int], fields: list = []
@@ -87,3 +102,106 @@ def get_map_feature_detections_controller(
             fields=fields,
         )
     )
+
+
+def get_detections_for_ids_controller(
+    ids: typing.Iterable[typing.Union[str, int]],
+    image: bool,
+    fields: list,
+    workers: int,
+    decode: bool,
+    normalized: bool,
+) -> typing.Iterator[typing.Tuple[str, GeoJSON]]:
+    """
+    Get the detections of many images, or map features, concurrently
+
+    Unlike `get_image_detections_controller`, the IDs are not checked against the API first,
+    and the detections are yielded as their requests complete, rather than in the order of
+    the IDs
+
+    :param ids: The image IDs, or the map feature IDs
+    :type ids: typing.Iterable[typing.Union[str, int]]
+
+    :param image: Whether the IDs are image IDs, or else map feature IDs
+    :type image: bool
+
+    :param fields: The fields possible for the detection endpoint
+    :type fields: list
+
+    :param workers: The number of requests made at once
+    :type workers: int
+
+    :param decode: If True, the pixel geometries of the detections are decoded into NumPy
+        arrays, see `mapillary.utils.format.pixel_geometry_to_arrays`
+    :type decode: bool
+
+    :param normalized: Whether the decoded pixel geometries are normalized, or in pixels
+    :type normalized: bool
+
+    :raises requests.HTTPError: Raised when the access token is rejected
+
+    :return: The pairs of ID and detections. The IDs whose request fails, or whose response
+        cannot be read, are logged and skipped
+    :rtype: typing.Iterator[typing.Tuple[str, GeoJSON]]
+    """
+
+    adapter = EntityAdapter()
+
+    def fetch(identity: str) -> GeoJSON:
+        data = adapter.fetch_detections(identity=identity, id_type=image, fields=fields)
+
+        # Decoded in the worker threads, along with the requests
+        if decode:
+            for feature, arrays in zip(
+                data["features"],
+                decode_pixel_geometries(data, normalized=normalized),
+            ):
+                feature["properties"]["pixel_geometry"] = arrays
+
+        return GeoJSON(geojson=data)
+
+    ids = iter(ids)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Only a few requests are queued ahead, so that any number of IDs can be streamed
+        pending = {
+            executor.submit(fetch, str(identity)): str(identity)
+            for identity in itertools.islice(ids, workers * 2)
+        }
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                identity = pending.pop(future)
+
+                try:
+                    detections = future.result()
+
+                except requests.HTTPError as error:
+                    # An invalid access token fails every request
+                    if error.response is not None and error.response.status_code in (
+                        401,
+                        403,
+                    ):
+                        raise
+
+                    logger.warning(f"Failed to get the detections of {identity}, {error}")
+                    continue
+
+                except (requests.ConnectionError, requests.Timeout) as error:
+                    logger.warning(f"Failed to get the detections of {identity}, {error}")
+                    continue
+
+                except PAYLOAD_ERRORS as error:
+                    # A response without detections, or an undecodable pixel geometry
+                    logger.warning(
+                        f"Failed to read the detections of {identity}, "
+                        f"{type(error).__name__}: {error}"
+                    )
+                    continue
+
+                yield identity, detections
+
+            for identity in itertools.islice(ids, len(done)):
+                pending[executor.submit(fetch, str(identity))] = str(identity)
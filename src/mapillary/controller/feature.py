@@ -17,12 +17,13 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 # Configs
 from mapillary.config.api.vector_tiles import VectorTiles
 
-# Client
-from mapillary.models.client import Client
+# Caches
+from mapillary.models.cache import NegativeTileCache
 
 # Utils
+from mapillary.utils.filter import map_features_filter_components
+from mapillary.utils.spatial import route_coordinates
 from mapillary.utils.verify import valid_id, points_traffic_signs_check
-from mapillary.utils.filter import pipeline
 from mapillary.utils.format import (
     merged_features_list_to_geojson,
     feature_to_geojson,
@@ -30,10 +31,21 @@ from mapillary.utils.format import (
 
 # Adapters
 from mapillary.models.api.entities import EntityAdapter
+from mapillary.models.api.vector_tiles import VectorTilesAdapter
+
+# Planner
+from mapillary.models.planner import (
+    TilePlanner,
+    QueryPlan,
+    features_along_route,
+    scheduled_features,
+)
+
+# Exception Handling
+from mapillary.models.exceptions import InvalidOptionError
 
-# Package imports
-import mercantile
-from vt2geojson.tools import vt_bytes_to_geojson
+# Class Representation
+from mapillary.models.geojson import GeoJSON
 
 
 def get_feature_from_key_controller(key: int, fields: list) -> str:
@@ -68,6 +80,8 @@ def get_map_features_in_bbox_controller(
     filter_values: list,
     filters: dict,
     layer: str = "points",
+    limit: int = None,
+    order: str = None,
 ) -> str:
     """
     For extracting either map feature points or traffic signs within a bounding box
@@ -84,6 +98,18 @@ def get_map_features_in_bbox_controller(
     :param filters: Chronological filters
     :type filters: dict
 
+    :param limit: The maximum number of map features, the fetching of the tiles stopping as
+        soon as it is met, see `mapillary.models.planner.scheduled_features`. Defaults to
+        None, for every map feature
+    :type limit: int
+
+    :param order: Either None, 'center' for the closest map features to the center of the
+        bounding box first, or 'newest' for the most recently first seen map features first.
+        Defaults to None
+    :type order: str
+
+    :raises InvalidOptionError: Raised when the limit is not positive, or the order is unknown
+
     :return: GeoJSON
     :rtype: str
     """
@@ -91,67 +117,153 @@ def get_map_features_in_bbox_controller(
     # Verifying the existence of the filter kwargs
     filters = points_traffic_signs_check(filters)
 
-    # Instantiating Client for API requests
-    client = Client()
-
-    # Getting all tiles within or intersecting the bbox
-    tiles = list(
-        mercantile.tiles(
-            west=bbox["west"],
-            south=bbox["south"],
-            east=bbox["east"],
-            north=bbox["north"],
-            zooms=14,
-        )
-    )
+    # Instantiating the adapter, through which the tiles are fetched
+    adapter = VectorTilesAdapter()
 
-    # Filtered features lists from different tiles will be merged into
-    # filtered_features
-    filtered_features = []
+    # Getting all tiles within or intersecting the bbox, leaving out the quadrants without
+    # coverage
+    tiles = TilePlanner(adapter=adapter).plan(bbox=bbox, zoom=14)
 
-    for tile in tiles:
+    # Filtered features lists from different tiles will be merged into filtered_features, until
+    # the limit is met
+    filtered_features = scheduled_features(
+        adapter=adapter,
+        tiles=tiles,
         # Decide which endpoint to send a request to based on the layer
-        url = (
-            VectorTiles.get_map_feature_point(x=tile.x, y=tile.y, z=tile.z)
-            if layer == "points"
-            else VectorTiles.get_map_feature_traffic_sign(x=tile.x, y=tile.y, z=tile.z)
-        )
+        get_url=VectorTiles.get_map_feature_point
+        if layer == "points"
+        else VectorTiles.get_map_feature_traffic_sign,
+        layer=None,
+        components=map_features_filter_components(
+            bbox=bbox, filter_values=filter_values, filters=filters
+        ),
+        bounding_box=bbox,
+        limit=limit,
+        order=order,
+        time_property="first_seen_at",
+    )
+
+    return merged_features_list_to_geojson(filtered_features)
+
+
+def get_map_features_along_route_controller(
+    linestring,
+    buffer: float,
+    filter_values: list,
+    filters: dict,
+    feature_type: str = "point",
+) -> GeoJSON:
+    """
+    For extracting either map feature points or traffic signs within a corridor along a route,
+    in the order the route passes them, see
+    `mapillary.controller.image.images_along_route_controller`
 
-        res = client.get(url)
+    :param linestring: The route, as a GeoJSON LineString, a Feature or a FeatureCollection
+        holding one, or a list of [longitude, latitude] pairs
+    :type linestring: Union[dict, list, numpy.ndarray]
 
-        # Decoding byte tiles
-        data = vt_bytes_to_geojson(res.content, tile.x, tile.y, tile.z)
+    :param buffer: The distance from the route to the edges of the corridor, in meters
+    :type buffer: float
+
+    :param filter_values: a list of filter values supported by the API.
+    :type filter_values: list
+
+    :param filters: Chronological filters
+    :type filters: dict
+
+    :param feature_type: 'point' or 'traffic_signs', defaults to 'point'
+    :type feature_type: str
+
+    :raises InvalidOptionError: Raised when the route is not a LineString, the buffer is not
+        positive, or the feature type is unknown
+
+    :return: The map features along the route, with their 'distance' from the route and their
+        'position' along the route, in meters, added to their properties
+    :rtype: GeoJSON
+    """
+
+    route = route_coordinates(linestring=linestring)
+
+    if buffer <= 0:
+        raise InvalidOptionError(param="buffer_m", value=buffer, options=["a positive distance"])
+
+    if feature_type not in ["point", "traffic_signs"]:
+        raise InvalidOptionError(
+            param="feature_type", value=feature_type, options=["point", "traffic_signs"]
+        )
+
+    # Verifying the existence of the filter kwargs
+    filters = points_traffic_signs_check(filters)
 
-        filtered_features.extend(
-            pipeline(
-                data=data,
+    return GeoJSON(
+        geojson={
+            "type": "FeatureCollection",
+            "features": features_along_route(
+                adapter=VectorTilesAdapter(),
+                route=route,
+                buffer=buffer,
+                zoom=14,
+                get_url=VectorTiles.get_map_feature_point
+                if feature_type == "point"
+                else VectorTiles.get_map_feature_traffic_sign,
+                layer=None,
                 components=[
-                    # Skip filtering based on filter_values if they're not specified by the user
-                    {
-                        "filter": "filter_values",
-                        "values": filter_values,
-                        "property": "value",
-                    }
-                    if filter_values is not None
-                    else {},
-                    # Check if the features actually lie within the bbox
-                    {"filter": "features_in_bounding_box", "bbox": bbox},
-                    # Checks if the feature existed after a given date
-                    {
-                        "filter": "existed_at",
-                        "existed_at": filters["existed_at"],
-                    }
-                    if filters["existed_at"] is not None
-                    else {},
-                    # Filter out all the features after a given timestamp
-                    {
-                        "filter": "existed_before",
-                        "existed_before": filters["existed_before"],
-                    }
-                    if filters["existed_before"] is not None
-                    else {},
+                    component
+                    for component in map_features_filter_components(
+                        bbox=None, filter_values=filter_values, filters=filters
+                    )
+                    if component.get("filter") != "features_in_bounding_box"
                 ],
-            )
-        )
+            ),
+        }
+    )
 
-    return merged_features_list_to_geojson(filtered_features)
+
+def estimate_map_features_in_bbox_controller(
+    bbox: dict,
+    filter_values: list,
+    filters: dict,
+    layer: str = "points",
+) -> QueryPlan:
+    """
+    For estimating the cost of `get_map_features_in_bbox_controller`, without fetching the tiles
+    at the target zoom level
+
+    :param bbox: Bounding box coordinates as argument
+    :type bbox: dict
+
+    :param layer: 'points' or 'traffic_signs'
+    :type layer: str
+
+    :param filter_values: a list of filter values supported by the API.
+    :type filter_values: list
+
+    :param filters: Chronological filters
+    :type filters: dict
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+    """
+
+    # Verifying the existence of the filter kwargs
+    filters = points_traffic_signs_check(filters)
+
+    plan = TilePlanner(adapter=VectorTilesAdapter()).explain(
+        query="map_feature_points_in_bbox"
+        if layer == "points"
+        else "traffic_signs_in_bbox",
+        bbox=bbox,
+        zoom=14,
+        layer=layer,
+        get_url=VectorTiles.get_map_feature_point
+        if layer == "points"
+        else VectorTiles.get_map_feature_traffic_sign,
+        filters=map_features_filter_components(
+            bbox=bbox, filter_values=filter_values, filters=filters
+        ),
+    )
+
+    # Persist the coverage tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return plan
@@ -15,12 +15,14 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 """
 
 # Library imports
-import json
 
+import haversine
+import heapq
 import mercantile
+import numpy
 import shapely
 from geojson import Polygon
-from typing import Union
+from typing import List, Sequence, Union
 
 # # Configs
 from mapillary.config.api.entities import Entities
@@ -34,14 +36,38 @@ from mapillary.models.api.vector_tiles import VectorTilesAdapter
 # # Client
 from mapillary.models.client import Client
 
+# # Caches
+from mapillary.models.cache import NegativeTileCache
+
+# # Planner
+from mapillary.models.planner import (
+    BATCH_TILES,
+    TilePlanner,
+    QueryPlan,
+    features_along_route,
+    scheduled_features,
+)
+
 # # Exception Handling
-from mapillary.models.exceptions import InvalidImageKeyError
+from mapillary.models.exceptions import InvalidImageKeyError, InvalidOptionError
 
 # # Class Representation
 from mapillary.models.geojson import GeoJSON, Coordinates
 
 # # Utilities
-from mapillary.utils.filter import pipeline
+from mapillary.utils import codec
+from mapillary.utils.filter import (
+    bbox_filter_components,
+    close_to_filter_components,
+    pipeline,
+    shape_filter_components,
+)
+from mapillary.utils.spatial import (
+    bearing,
+    coordinates_array,
+    haversine_distances,
+    route_coordinates,
+)
 from mapillary.utils.format import (
     feature_to_geojson,
     merged_features_list_to_geojson,
@@ -55,9 +81,12 @@ from mapillary.utils.verify import (
     resolution_check,
     valid_id,
 )
+from mapillary.utils.time import date_to_unix_timestamp
 from requests import HTTPError
 from turfpy.measurement import bbox
-from vt2geojson.tools import vt_bytes_to_geojson
+
+# The largest number of point to image distances computed at once by the batch queries
+MATRIX_SIZE = 1 << 22
 
 
 def get_image_close_to_controller(
@@ -103,12 +132,29 @@ def get_image_close_to_controller(
     # exception
     image_check(kwargs=kwargs)
 
-    unfiltered_data = VectorTilesAdapter().fetch_layer(
-        layer="image",
-        zoom=kwargs["zoom"] if "zoom" in kwargs else 14,
-        longitude=longitude,
-        latitude=latitude,
-    )
+    adapter = VectorTilesAdapter()
+    zoom = kwargs["zoom"] if "zoom" in kwargs else 14
+
+    if "radius" in kwargs:
+        # The circle may reach past the tile containing the point, into its neighbours
+        unfiltered_data = features_within_radius(
+            adapter=adapter,
+            longitude=longitude,
+            latitude=latitude,
+            radius=kwargs["radius"],
+            zoom=zoom,
+        )
+
+        # Persist the tiles found to be empty or failing
+        NegativeTileCache.flush_default()
+
+    else:
+        unfiltered_data = adapter.fetch_layer(
+            layer="image",
+            zoom=zoom,
+            longitude=longitude,
+            latitude=latitude,
+        )
 
     if kwargs == {}:
         return GeoJSON(geojson=unfiltered_data)
@@ -119,36 +165,12 @@ def get_image_close_to_controller(
         and unfiltered_data["features"][0]["properties"] != {}
     ):
         return GeoJSON(
-            geojson=json.loads(
+            geojson=codec.loads(
                 merged_features_list_to_geojson(
                     pipeline(
                         data=unfiltered_data,
-                        components=[
-                            # Filter using kwargs.min_captured_at
-                            {
-                                "filter": "min_captured_at",
-                                "min_timestamp": kwargs["min_captured_at"],
-                            }
-                            if "min_captured_at" in kwargs
-                            else {},
-                            # Filter using kwargs.max_captured_at
-                            {
-                                "filter": "max_captured_at",
-                                "min_timestamp": kwargs["max_captured_at"],
-                            }
-                            if "max_captured_at" in kwargs
-                            else {},
-                            # Filter using kwargs.image_type
-                            {"filter": "image_type", "tile": kwargs["image_type"]}
-                            if "image_type" in kwargs
-                            else {},
-                            # Filter using kwargs.organization_id
-                            {
-                                "filter": "organization_id",
-                                "organization_ids": kwargs["organization_id"],
-                            }
-                            if "organization_id" in kwargs
-                            else {},
+                        components=close_to_filter_components(kwargs=kwargs)
+                        + [
                             # Filter using kwargs.radius
                             {
                                 "filter": "haversine_dist",
@@ -164,13 +186,129 @@ def get_image_close_to_controller(
         )
 
 
+def get_images_close_to_controller(
+    coordinates: Union[numpy.ndarray, Sequence[Sequence[float]]],
+    kwargs: dict,
+) -> List[GeoJSON]:
+    """
+    Extracting the GeoJSON for the image data near each of many [longitude, latitude]
+    coordinates, as `get_image_close_to_controller` does for one
+
+    The points are grouped by the tiles their radius reaches into, so that each distinct tile
+    is fetched, decoded and filtered once, and the distances from all the points of a tile to
+    its images are computed at once
+
+    :param coordinates: The (longitude, latitude) pairs, of shape (n, 2)
+    :type coordinates: Union[numpy.ndarray, Sequence[Sequence[float]]]
+
+    :param kwargs: The kwargs for the filter, as for `get_image_close_to_controller`
+    :type kwargs: dict
+
+    :return: A GeoJSON for each point, in the order of the points
+    :rtype: List[GeoJSON]
+    """
+
+    # Checking if a non valid key has been passed to the function If that is the case, throw an
+    # exception
+    image_check(kwargs=kwargs)
+
+    coordinates = numpy.asarray(coordinates, dtype=numpy.float64).reshape(-1, 2)
+    zoom = kwargs["zoom"] if "zoom" in kwargs else 14
+    radius = kwargs.get("radius")
+
+    adapter = VectorTilesAdapter()
+    components = close_to_filter_components(kwargs=kwargs)
+
+    # The indices of the points each tile is searched for
+    groups = list(
+        TilePlanner.points_tiles(
+            longitudes=coordinates[:, 0],
+            latitudes=coordinates[:, 1],
+            radius=radius,
+            zoom=zoom,
+        ).items()
+    )
+
+    # The images of each point, by ID, as the images in the buffer of a tile are found in its
+    # neighbours as well
+    results = [{} for _ in range(len(coordinates))]
+
+    # The tiles are fetched a batch at a time, to hold only a few of them in memory
+    for start in range(0, len(groups), BATCH_TILES):
+        batch = dict(groups[start:start + BATCH_TILES])
+        tiles = adapter.fetch_tiles(
+            urls={
+                tile: VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+                for tile in batch
+            },
+            layer="image",
+        )
+
+        for tile, indices in batch.items():
+            features = tiles[tile]["features"]
+
+            if features and features[0]["properties"] != {}:
+                features = pipeline(
+                    data={"type": "FeatureCollection", "features": features},
+                    components=components,
+                )
+
+            if not features:
+                continue
+
+            if radius is None:
+                for index in indices:
+                    results[index].update(
+                        (feature["properties"].get("id", id(feature)), feature)
+                        for feature in features
+                    )
+                continue
+
+            images = coordinates_array(features)
+
+            # Bounding the size of the distance matrices of the densest tiles
+            step = max(1, MATRIX_SIZE // len(features))
+            for chunk in range(0, len(indices), step):
+                points = indices[chunk:chunk + step]
+                within = (
+                    haversine_distances(
+                        coordinates[points, 0][:, None],
+                        coordinates[points, 1][:, None],
+                        images,
+                    )
+                    < radius
+                )
+
+                for index, row in zip(points, within):
+                    for column in numpy.flatnonzero(row):
+                        feature = features[column]
+                        results[index].setdefault(
+                            feature["properties"].get("id", id(feature)), feature
+                        )
+
+    # Persist the tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return [
+        GeoJSON(
+            geojson={"type": "FeatureCollection", "features": list(images.values())}
+        )
+        for images in results
+    ]
+
+
 def get_image_looking_at_controller(
     at: Union[dict, Coordinates, list],
     filters: dict,
+    max_distance: float = None,
 ) -> GeoJSON:
     """
     Checks if the image with coordinates 'at' is looked with the given filters.
 
+    When a maximum distance, or a radius, is given, every tile within that distance of 'at' is
+    searched, rather than only the tile containing it. The images are then filtered by their
+    distance first, and by whether they look at 'at' last, for all of them at once
+
     :param filters: Filters to pass the data through
     :type filters: dict
 
@@ -202,6 +340,12 @@ def get_image_looking_at_controller(
     :param filters.organization_id: The organization to retrieve the data for
     :type filters.organization_id: str
 
+    :param max_distance: The maximum distance of the images from 'at', in meters. Defaults to
+        None, for the radius if given, else the images of the tile containing 'at'
+    :type max_distance: float
+
+    :raises InvalidOptionError: Raised when the maximum distance is not positive
+
     :return: GeoJSON
     :rtype: dict
     """
@@ -214,26 +358,58 @@ def get_image_looking_at_controller(
     # If that is the case, throw an exception
     image_check(kwargs=filters)
 
-    at_image_data = GeneralAdapter().fetch_image_tiles(
-        zoom=filters["zoom"] if "zoom" in filters else 14,
-        longitude=at["lng"],
-        latitude=at["lat"],
-        layer="image",
-    )
+    max_distance = looking_at_distance(filters=filters, max_distance=max_distance)
+    zoom = filters["zoom"] if "zoom" in filters else 14
+
+    if max_distance is None:
+        at_image_data = GeneralAdapter().fetch_image_tiles(
+            zoom=zoom,
+            longitude=at["lng"],
+            latitude=at["lat"],
+            layer="image",
+        )
+
+    else:
+        # The images facing 'at' may lie in the tiles around the one containing it
+        at_image_data = features_within_radius(
+            adapter=VectorTilesAdapter(),
+            longitude=at["lng"],
+            latitude=at["lat"],
+            radius=max_distance,
+            zoom=zoom,
+        )
+
+        # Persist the tiles found to be empty or failing
+        NegativeTileCache.flush_default()
+
+        if at_image_data["features"]:
+            distances = haversine_distances(
+                at["lng"], at["lat"], coordinates_array(at_image_data["features"])
+            )
+            at_image_data = {
+                "type": "FeatureCollection",
+                "features": [
+                    feature
+                    for feature, within in zip(
+                        at_image_data["features"], distances < max_distance
+                    )
+                    if within
+                ],
+            }
 
     if not at_image_data["features"]:
         return GeoJSON(geojson=at_image_data)
 
     # Filters are to be applied to the data retrieved from the database in the following logic
-    # # 1. Filter by the filters provided by the filters parameter
-    # # 2. Secondly, from the fetched tile, trim out data that falls outside the given radius, if
-    # no radius is specified, assume 20m to be safe
-    # # 2. Then, from the remaining feature points, extract only those that are qualified by the
+    # # 1. From the fetched tiles, trim out data that falls outside the maximum distance, done
+    # above
+    # # 2. Filter by the filters provided by the filters parameter
+    # # 3. Then, from the remaining feature points, extract only those that are qualified by the
     # "hits_by_look_at" function
 
     # Filter the unfiltered results by the given filters
     return GeoJSON(
-        geojson=json.loads(
+        geojson=codec.loads(
             merged_features_list_to_geojson(
                 pipeline(
                     data=at_image_data,
@@ -263,14 +439,6 @@ def get_image_looking_at_controller(
                         }
                         if "organization_id" in filters
                         else {},
-                        # Filter using kwargs.radius
-                        {
-                            "filter": "haversine_dist",
-                            "radius": filters.get("radius"),
-                            "coords": [at["lng"], at["lat"]],
-                        }
-                        if "radius" in filters
-                        else {},
                         # Filter by `hits_by_look_at`
                         {"filter": "hits_by_look_at", "at": at},
                     ],
@@ -283,10 +451,15 @@ def get_image_looking_at_controller(
 def is_image_being_looked_at_controller(
     at: Union[dict, Coordinates, list],
     filters: dict,
+    max_distance: float = None,
 ) -> bool:
     """
     Checks if the image with coordinates 'at' is looked with the given filters.
 
+    Unlike `get_image_looking_at_controller`, the images are checked one at a time, the
+    cheapest filters first, and the check stops at the first image looking at 'at'. With a
+    maximum distance, the tiles are fetched the closest first, and only until then
+
     :param at: The dict of coordinates of the position of the looking at coordinates.
 
         Format::
@@ -319,14 +492,113 @@ def is_image_being_looked_at_controller(
     :param filters.organization_id: The organization to retrieve the data for
     :type filters.organization_id: str
 
+    :param max_distance: The maximum distance of the images from 'at', in meters, see
+        `get_image_looking_at_controller`
+    :type max_distance: float
+
+    :raises InvalidOptionError: Raised when the maximum distance is not positive
+
     :return: True if the image is looked at by the given looker and at coordinates, False otherwise
     :rtype: bool
     """
 
-    result: dict = get_image_looking_at_controller(at=at, filters=filters).to_dict()
+    # Converting 'at' of type Coordinates|List to dict
+    at: dict = coord_or_list_to_dict(data=at)
+
+    # Checking if a non valid key has been passed to the function If that is the case, throw an
+    # exception
+    image_check(kwargs=filters)
+
+    max_distance = looking_at_distance(filters=filters, max_distance=max_distance)
+    zoom = filters["zoom"] if "zoom" in filters else 14
 
-    # If the result is empty, the image is not looked at, hence return False
-    return len(result["features"]) != 0
+    # The predicates, from the cheapest to the most expensive one
+    predicates = []
+
+    if "image_type" in filters and filters["image_type"] != "all":
+        is_pano = filters["image_type"] == "pano"
+        predicates.append(lambda properties, _: properties["is_pano"] == is_pano)
+
+    if "min_captured_at" in filters:
+        min_timestamp = date_to_unix_timestamp(filters["min_captured_at"])
+        predicates.append(lambda properties, _: properties["captured_at"] >= min_timestamp)
+
+    if "max_captured_at" in filters:
+        max_timestamp = date_to_unix_timestamp(filters["max_captured_at"])
+        predicates.append(lambda properties, _: properties["captured_at"] <= max_timestamp)
+
+    if "organization_id" in filters:
+        # One ID or a list of them, compared as strings, as the tiles give integer IDs
+        organization_ids = filters["organization_id"]
+        if not isinstance(organization_ids, (list, tuple, set)):
+            organization_ids = [organization_ids]
+        organization_ids = {str(organization_id) for organization_id in organization_ids}
+
+        predicates.append(
+            lambda properties, _: "organization_id" in properties
+            and str(properties["organization_id"]) in organization_ids
+        )
+
+    if max_distance is not None:
+        box = TilePlanner.radius_bbox(at["lng"], at["lat"], max_distance)
+        predicates.append(
+            lambda _, coordinates: box["west"] <= coordinates[0] <= box["east"]
+            and box["south"] <= coordinates[1] <= box["north"]
+            and haversine.haversine(
+                (at["lat"], at["lng"]), (coordinates[1], coordinates[0]), unit="m"
+            )
+            < max_distance
+        )
+
+    # As `mapillary.utils.filter.is_looking_at`, without building the TurfPy features
+    def looks_at(properties: dict, coordinates: list) -> bool:
+        if properties["is_pano"]:
+            return True
+
+        compass_angle = properties.get("compass_angle", -1)
+        if compass_angle < 0:
+            return False
+
+        difference = (
+            abs(bearing(coordinates[0], coordinates[1], at["lng"], at["lat"]) - compass_angle)
+            % 360
+        )
+
+        return 310 < difference or difference < 50
+
+    predicates.append(looks_at)
+
+    def features():
+        if max_distance is None:
+            yield from GeneralAdapter().fetch_image_tiles(
+                zoom=zoom, longitude=at["lng"], latitude=at["lat"], layer="image"
+            )["features"]
+            return
+
+        adapter = VectorTilesAdapter()
+
+        # The closest tiles first, the later ones being fetched only when needed
+        for tile in TilePlanner.radius_tiles(
+            longitude=at["lng"], latitude=at["lat"], radius=max_distance, zoom=zoom
+        ):
+            yield from adapter.fetch_tile(
+                url=VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z),
+                tile=tile,
+                layer="image",
+            )["features"]
+
+    try:
+        return any(
+            all(
+                predicate(feature["properties"], feature["geometry"]["coordinates"])
+                for predicate in predicates
+            )
+            for feature in features()
+        )
+
+    finally:
+        # Persist the tiles found to be empty or failing
+        NegativeTileCache.flush_default()
 
 
 def get_image_thumbnail_controller(image_id: str, resolution: int) -> str:
@@ -355,11 +627,16 @@ def get_image_thumbnail_controller(image_id: str, resolution: int) -> str:
         # If given ID is an invalid image ID, let the user know
         raise InvalidImageKeyError(image_id)
 
-    return json.loads(res.content.decode("utf-8"))[f"thumb_{resolution}_url"]
+    return codec.loads(res.content)[f"thumb_{resolution}_url"]
 
 
 def get_images_in_bbox_controller(
-    bounding_box: dict, layer: str, zoom: int, filters: dict
+    bounding_box: dict,
+    layer: str,
+    zoom: int,
+    filters: dict,
+    limit: int = None,
+    order: str = None,
 ) -> str:
     """
     For getting a complete list of images that lie within a bounding box,
@@ -404,9 +681,20 @@ def get_images_in_bbox_controller(
     :param filters.sequence_id:
     :type filters.sequence_id: str
 
+    :param limit: The maximum number of images, the fetching of the tiles stopping as soon as
+        it is met, see `mapillary.models.planner.scheduled_features`. Defaults to None, for
+        every image
+    :type limit: int
+
+    :param order: Either None, 'center' for the closest images to the center of the bounding
+        box first, or 'newest' for the most recently captured images first. Defaults to None
+    :type order: str
+
     :raises InvalidKwargError: Raised when a function is called with the invalid keyword argument(s)
         that do not belong to the requested API end call
 
+    :raises InvalidOptionError: Raised when the limit is not positive, or the order is unknown
+
     :return: GeoJSON
     :rtype: str
 
@@ -421,79 +709,341 @@ def get_images_in_bbox_controller(
         image_bbox_check(filters) if layer == "image" else sequence_bbox_check(filters)
     )
 
-    # Instantiate the Client
-    client = Client()
+    # Instantiate the adapter, through which the tiles are fetched
+    adapter = VectorTilesAdapter()
+
+    # A list of tiles that are either confined within or intersect with the bbox, leaving out
+    # the quadrants without coverage
+    tiles = TilePlanner(adapter=adapter).plan(bbox=bounding_box, zoom=zoom)
+
+    # The tiles are fetched, and their features filtered, until the limit is met
+    filtered_results = scheduled_features(
+        adapter=adapter,
+        tiles=tiles,
+        get_url=VectorTiles.get_image_layer
+        if layer == "image"
+        else VectorTiles.get_sequence_layer,
+        layer=layer,
+        components=bbox_filter_components(
+            bounding_box=bounding_box, layer=layer, filters=filters
+        ),
+        bounding_box=bounding_box,
+        limit=limit,
+        order=order,
+    )
 
-    # filtered images or sequence data will be appended to this list
-    filtered_results = []
+    return merged_features_list_to_geojson(filtered_results)
 
-    # A list of tiles that are either confined within or intersect with the bbox
-    tiles = list(
-        mercantile.tiles(
-            west=bounding_box["west"],
-            south=bounding_box["south"],
-            east=bounding_box["east"],
-            north=bounding_box["north"],
-            zooms=zoom,
+
+def nearest_images_controller(
+    longitude: float,
+    latitude: float,
+    k: int,
+    max_distance: float,
+    filters: dict,
+) -> GeoJSON:
+    """
+    For getting the k images nearest to a point, within a maximum distance
+
+    The tiles are searched in rings around the tile containing the point, the closest tiles of
+    each ring first, while the k nearest images found so far are kept in a bounded heap. The
+    search stops as soon as no tile left can hold an image closer than the k-th one
+
+    :param longitude: The longitude of the point
+    :type longitude: float
+
+    :param latitude: The latitude of the point
+    :type latitude: float
+
+    :param k: The number of images to return
+    :type k: int
+
+    :param max_distance: The maximum distance of the images, in meters
+    :type max_distance: float
+
+    :param filters: The filters of the images, as for `get_images_in_bbox_controller`
+    :type filters: dict
+
+    :raises InvalidOptionError: Raised when k, or the maximum distance, is not positive
+
+    :return: The nearest images, the closest first, with their 'distance' in meters added to
+        their properties
+    :rtype: GeoJSON
+    """
+
+    if k < 1:
+        raise InvalidOptionError(param="k", value=k, options=["a positive integer"])
+
+    if max_distance <= 0:
+        raise InvalidOptionError(
+            param="max_distance", value=max_distance, options=["a positive distance"]
+        )
+
+    zoom = filters.get("zoom", 14)
+    components = [
+        component
+        for component in bbox_filter_components(
+            bounding_box=None, layer="image", filters=image_bbox_check(filters)
+        )
+        if component.get("filter") != "features_in_bounding_box"
+    ]
+
+    adapter = VectorTilesAdapter()
+    center = mercantile.tile(longitude, latitude, zoom)
+
+    # The tiles within the maximum distance, grouped in rings around the center tile
+    rings = {}
+    for tile in TilePlanner.radius_tiles(
+        longitude=longitude, latitude=latitude, radius=max_distance, zoom=zoom
+    ):
+        ring = max(abs(tile.x - center.x), abs(tile.y - center.y))
+        rings.setdefault(ring, []).append(
+            (TilePlanner.tile_distance(longitude, latitude, tile), tile)
+        )
+
+    # The closest tile of the rings that follow each ring, to know when to stop
+    order = sorted(rings)
+    closest_after = {}
+    closest = float("inf")
+    for ring in reversed(order):
+        closest_after[ring] = closest
+        closest = min(closest, rings[ring][0][0])
+
+    # The k nearest images so far, as a max-heap on the distance
+    nearest = []
+    seen = set()
+
+    def bound() -> float:
+        return -nearest[0][0] if len(nearest) == k else max_distance
+
+    for ring in order:
+        tiles = adapter.fetch_tiles(
+            urls={
+                tile: VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+                for distance, tile in rings[ring]
+                if distance <= bound()
+            },
+            layer="image",
         )
+
+        features = [
+            feature
+            for feature in pipeline(
+                data={
+                    "type": "FeatureCollection",
+                    "features": [
+                        feature
+                        for geojson in tiles.values()
+                        for feature in geojson["features"]
+                    ],
+                },
+                components=components,
+            )
+            if feature["properties"].get("id") not in seen
+        ]
+
+        if features:
+            distances = haversine_distances(
+                longitude, latitude, coordinates_array(features)
+            )
+
+            for index in numpy.argsort(distances, kind="stable"):
+                distance = float(distances[index])
+
+                if distance > bound():
+                    break
+
+                feature = features[index]
+                seen.add(feature["properties"].get("id"))
+                entry = (-distance, -len(seen), feature)
+
+                if len(nearest) < k:
+                    heapq.heappush(nearest, entry)
+                else:
+                    heapq.heapreplace(nearest, entry)
+
+        # No tile left can hold an image closer than the k-th one
+        if closest_after[ring] > bound():
+            break
+
+    # Persist the tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return GeoJSON(
+        geojson={
+            "type": "FeatureCollection",
+            "features": [
+                # The cached features are copied rather than modified
+                {
+                    **feature,
+                    "properties": {**feature["properties"], "distance": -distance},
+                }
+                for distance, _, feature in sorted(nearest, reverse=True)
+            ],
+        }
     )
 
-    for tile in tiles:
-        url = (
-            VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
-            if layer == "image"
-            else VectorTiles.get_sequence_layer(x=tile.x, y=tile.y, z=tile.z)
+
+def images_along_route_controller(
+    linestring: Union[dict, list, numpy.ndarray],
+    buffer: float,
+    filters: dict,
+) -> GeoJSON:
+    """
+    For getting the images within a corridor along a route, i.e., within a distance of a
+    LineString, in the order the route passes them
+
+    Only the tiles the corridor reaches into are fetched, see
+    `mapillary.models.planner.TilePlanner.corridor_tiles`, and the distances from the images to
+    the route are computed at once for each tile
+
+    :param linestring: The route, as a GeoJSON LineString, a Feature or a FeatureCollection
+        holding one, or a list of [longitude, latitude] pairs
+    :type linestring: Union[dict, list, numpy.ndarray]
+
+    :param buffer: The distance from the route to the edges of the corridor, in meters
+    :type buffer: float
+
+    :param filters: The filters of the images, as for `get_images_in_bbox_controller`
+    :type filters: dict
+
+    :raises InvalidOptionError: Raised when the route is not a LineString, or the buffer is
+        not positive
+
+    :return: The images along the route, with their 'distance' from the route and their
+        'position' along the route, in meters, added to their properties
+    :rtype: GeoJSON
+    """
+
+    route = route_coordinates(linestring=linestring)
+
+    if buffer <= 0:
+        raise InvalidOptionError(param="buffer_m", value=buffer, options=["a positive distance"])
+
+    zoom = filters.get("zoom", 14)
+    components = [
+        component
+        for component in bbox_filter_components(
+            bounding_box=None, layer="image", filters=image_bbox_check(filters)
         )
+        if component.get("filter") != "features_in_bounding_box"
+    ]
+
+    return GeoJSON(
+        geojson={
+            "type": "FeatureCollection",
+            "features": features_along_route(
+                adapter=VectorTilesAdapter(),
+                route=route,
+                buffer=buffer,
+                zoom=zoom,
+                get_url=VectorTiles.get_image_layer,
+                layer="image",
+                components=components,
+            ),
+        }
+    )
 
-        # Get the response from the API
-        res = client.get(url)
 
-        # Get the GeoJSON response by decoding the byte tile
-        geojson = vt_bytes_to_geojson(
-            b_content=res.content, layer=layer, z=tile.z, x=tile.x, y=tile.y
+def get_images_in_regions_controller(regions: list, filters: dict) -> List[GeoJSON]:
+    """
+    For getting the images within each of many regions at once, e.g., bounding boxes or
+    polygons that overlap
+
+    The tiles of all the regions are planned together, and each tile of their union is
+    fetched, decoded and filtered once. Its images are then assigned to every region they lie
+    in through a spatial index of the regions
+
+    :param regions: The regions, each either a bounding box, with the keys 'west', 'south',
+        'east' and 'north', a GeoJSON Polygon or MultiPolygon, a Feature or a FeatureCollection
+        of those, or a shapely geometry
+    :type regions: list
+
+    :param filters: The filters of the images, as for `get_images_in_bbox_controller`
+    :type filters: dict
+
+    :raises InvalidOptionError: Raised when a region is neither a bounding box nor a shape
+
+    :return: A GeoJSON for each region, in the order of the regions
+    :rtype: List[GeoJSON]
+    """
+
+    geometries = [region_geometry(region=region) for region in regions]
+
+    zoom = filters.get("zoom", 14)
+    components = [
+        component
+        for component in bbox_filter_components(
+            bounding_box=None, layer="image", filters=image_bbox_check(filters)
         )
+        if component.get("filter") != "features_in_bounding_box"
+    ]
 
-        # Filter the unfiltered results by the given filters
-        filtered_results.extend(
-            pipeline(
-                data=geojson,
-                components=[
-                    {"filter": "features_in_bounding_box", "bbox": bounding_box}
-                    if layer == "image"
-                    else {},
-                    {
-                        "filter": "max_captured_at",
-                        "max_timestamp": filters.get("max_captured_at"),
-                    }
-                    if filters["max_captured_at"] is not None
-                    else {},
-                    {
-                        "filter": "min_captured_at",
-                        "min_timestamp": filters.get("min_captured_at"),
-                    }
-                    if filters["min_captured_at"] is not None
-                    else {},
-                    {"filter": "image_type", "type": filters.get("image_type")}
-                    if filters["image_type"] is not None
-                    or filters["image_type"] != "all"
-                    else {},
-                    {
-                        "filter": "organization_id",
-                        "organization_ids": filters.get("organization_id"),
-                    }
-                    if filters["organization_id"] is not None
-                    else {},
-                    {"filter": "sequence_id", "ids": filters.get("sequence_id")}
-                    if layer == "image" and filters["sequence_id"] is not None
-                    else {},
-                    {"filter": "compass_angle", "angles": filters.get("compass_angle")}
-                    if layer == "image" and filters["compass_angle"] is not None
-                    else {},
-                ],
+    adapter = VectorTilesAdapter()
+    planner = TilePlanner(adapter=adapter)
+
+    # The union of the tiles of the regions, each tile once
+    tiles = list(
+        dict.fromkeys(
+            tile
+            for geometry in geometries
+            for tile in planner.plan(
+                bbox=dict(zip(["west", "south", "east", "north"], geometry.bounds)),
+                zoom=zoom,
             )
         )
+    )
 
-    return merged_features_list_to_geojson(filtered_results)
+    tree = shapely.STRtree(geometries)
+
+    # Leaving out the tiles of the bounding boxes of the polygons that no region reaches into
+    if tiles:
+        boxes = shapely.box(*numpy.array([mercantile.bounds(tile) for tile in tiles]).T)
+        tiles = [tiles[index] for index in numpy.unique(tree.query(boxes)[0])]
+
+    results = [[] for _ in geometries]
+    seen = set()
+
+    # The tiles are fetched a batch at a time, to hold only a few of them in memory
+    for start in range(0, len(tiles), BATCH_TILES):
+        fetched = adapter.fetch_tiles(
+            urls={
+                tile: VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+                for tile in tiles[start:start + BATCH_TILES]
+            },
+            layer="image",
+        )
+
+        for geojson in fetched.values():
+            # The images in the buffer of a tile are found in its neighbours as well
+            features = [
+                feature
+                for feature in (
+                    pipeline(data=geojson, components=components)
+                    if geojson["features"]
+                    else []
+                )
+                if feature["properties"].get("id", id(feature)) not in seen
+            ]
+            seen.update(feature["properties"].get("id", id(feature)) for feature in features)
+
+            if not features:
+                continue
+
+            points, regions_of = tree.query(
+                shapely.points(coordinates_array(features)), predicate="intersects"
+            )
+
+            for point, region in zip(points, regions_of):
+                results[region].append(features[point])
+
+    # Persist the tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return [
+        GeoJSON(geojson={"type": "FeatureCollection", "features": features})
+        for features in results
+    ]
 
 
 def get_image_from_key_controller(key: int, fields: list) -> str:
@@ -623,7 +1173,7 @@ def geojson_features_controller(
     # Return as GeoJSON output
     return GeoJSON(
         # Load the geojson to convert to GeoJSON object
-        geojson=json.loads(
+        geojson=codec.loads(
             # Convert feature list to GeoJSON
             merged_features_list_to_geojson(
                 # Execute pipeline for filters
@@ -794,7 +1344,7 @@ def shape_features_controller(
     # Return as GeoJSON output
     return GeoJSON(
         # Load the geojson to convert to GeoJSON object
-        geojson=json.loads(
+        geojson=codec.loads(
             # Convert feature list to GeoJSON
             merged_features_list_to_geojson(
                 # Execute pipeline for filters
@@ -802,47 +1352,299 @@ def shape_features_controller(
                     # Sending layers as input
                     data=output,
                     # Specifying components for the filter
-                    components=[
-                        # Get only features within the given boundary
-                        {"filter": "in_shape", "boundary": boundary},
-                        # Filter using kwargs.min_captured_at
-                        {
-                            "filter": "min_captured_at",
-                            "min_timestamp": filters["min_captured_at"],
-                        }
-                        if "min_captured_at" in filters
-                        else {},
-                        # Filter using filters.max_captured_at
-                        {
-                            "filter": "max_captured_at",
-                            "min_timestamp": filters["max_captured_at"],
-                        }
-                        if "max_captured_at" in filters
-                        else {},
-                        # Filter using filters.image_type
-                        {"filter": "image_type", "tile": filters["image_type"]}
-                        if "image_type" in filters
-                        else {},
-                        # Filter using filters.organization_id
-                        {
-                            "filter": "organization_id",
-                            "organization_ids": filters["organization_ids"],
-                        }
-                        if "organization_id" in filters
-                        else {},
-                        # Filter using filters.sequence_id
-                        {"filter": "sequence_id", "ids": filters.get("sequence_id")}
-                        if "sequence_id" in filters
-                        else {},
-                        # Filter using filters.compass_angle
-                        {
-                            "filter": "compass_angle",
-                            "angles": filters.get("compass_angle"),
-                        }
-                        if "compass_angle" in filters
-                        else {},
-                    ],
+                    components=shape_filter_components(
+                        boundary=boundary, filters=filters
+                    ),
                 )
             )
         )
     )
+
+
+def estimate_images_in_bbox_controller(
+    bounding_box: dict, layer: str, zoom: int, filters: dict
+) -> QueryPlan:
+    """
+    For estimating the cost of `get_images_in_bbox_controller`, without fetching the tiles at
+    the target zoom level
+
+    :param bounding_box: A bounding box representation
+    :type bounding_box: dict
+
+    :param zoom: The zoom level
+    :param zoom: int
+
+    :param layer: Either 'image', 'sequence', 'overview'
+    :type layer: str
+
+    :param filters: Filters to pass the data through, see `get_images_in_bbox_controller`
+    :type filters: dict
+
+    :raises InvalidKwargError: Raised when a function is called with the invalid keyword argument(s)
+        that do not belong to the requested API end call
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+    """
+
+    # Check if the given filters are valid ones
+    filters["zoom"] = filters.get("zoom", zoom)
+    filters = (
+        image_bbox_check(filters) if layer == "image" else sequence_bbox_check(filters)
+    )
+
+    plan = TilePlanner(adapter=VectorTilesAdapter()).explain(
+        query="images_in_bbox" if layer == "image" else "sequences_in_bbox",
+        bbox=bounding_box,
+        zoom=zoom,
+        layer=layer,
+        get_url=VectorTiles.get_image_layer
+        if layer == "image"
+        else VectorTiles.get_sequence_layer,
+        decoded_layer=layer,
+        filters=bbox_filter_components(
+            bounding_box=bounding_box, layer=layer, filters=filters
+        ),
+    )
+
+    # Persist the coverage tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return plan
+
+
+def estimate_shape_features_controller(
+    shape, is_image: bool = True, filters: dict = None
+) -> QueryPlan:
+    """
+    For estimating the cost of `shape_features_controller`, without fetching the tiles at the
+    target zoom level
+
+    :param shape: A shape that describes features, formatted as a geojson
+    :type shape: dict
+
+    :param is_image: Is the feature extraction for images? True for images, False for map features
+        Defaults to True
+    :type is_image: bool
+
+    :param filters: Different filters that may be applied to the output, see
+        `shape_features_controller`
+    :type filters: dict (kwargs)
+
+    :raises InvalidKwargError: Raised when a function is called with the invalid keyword argument(s)
+        that do not belong to the requested API end call
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+    """
+
+    image_bbox_check(filters)
+
+    # Wrapping the shape in a Polygon object
+    polygon = Polygon(shape["features"][0]["geometry"]["coordinates"])
+
+    # Getting the boundary parameters from polygon
+    boundary = shapely.geometry.shape(polygon)
+
+    # The bounding box of the polygon, as [west, south, east, north]
+    coordinates = bbox(polygon)
+
+    if is_image:
+        layer = filters["layer"] if "layer" in filters else "image"
+        decoded_layer = layer
+        get_url = {
+            "overview": VectorTiles.get_overview_layer,
+            "sequence": VectorTiles.get_sequence_layer,
+            "image": VectorTiles.get_image_layer,
+        }[layer]
+    else:
+        layer = filters["feature_type"] if "feature_type" in filters else "point"
+        decoded_layer = None
+        get_url = (
+            VectorTiles.get_map_feature_point
+            if layer == "point"
+            else VectorTiles.get_map_feature_traffic_sign
+        )
+
+    plan = TilePlanner(adapter=VectorTilesAdapter()).explain(
+        query="images_in_shape" if is_image else "map_features_in_shape",
+        bbox={
+            "west": coordinates[0],
+            "south": coordinates[1],
+            "east": coordinates[2],
+            "north": coordinates[3],
+        },
+        zoom=filters["zoom"] if "zoom" in filters else 14,
+        layer=layer,
+        get_url=get_url,
+        decoded_layer=decoded_layer,
+        filters=shape_filter_components(boundary=boundary, filters=filters),
+    )
+
+    # Persist the coverage tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return plan
+
+
+def region_geometry(region) -> shapely.geometry.base.BaseGeometry:
+    """
+    Converts a region to a shapely geometry
+
+    :param region: A bounding box, with the keys 'west', 'south', 'east' and 'north', a GeoJSON
+        geometry, a Feature or a FeatureCollection, whose geometries are merged, or a shapely
+        geometry
+    :type region: Union[dict, shapely.geometry.base.BaseGeometry]
+
+    :raises InvalidOptionError: Raised when the region is neither a bounding box nor a shape
+
+    :return: The region
+    :rtype: shapely.geometry.base.BaseGeometry
+    """
+
+    if isinstance(region, shapely.geometry.base.BaseGeometry):
+        return region
+
+    # The models of mapillary.models.geojson
+    if hasattr(region, "to_dict"):
+        region = region.to_dict()
+
+    if isinstance(region, dict):
+        if {"west", "south", "east", "north"} <= region.keys():
+            return shapely.box(
+                region["west"], region["south"], region["east"], region["north"]
+            )
+
+        if region.get("type") == "FeatureCollection":
+            return shapely.union_all(
+                [region_geometry(region=feature) for feature in region["features"]]
+            )
+
+        if region.get("type") == "Feature":
+            return region_geometry(region=region["geometry"])
+
+        if "coordinates" in region:
+            return shapely.geometry.shape(region)
+
+    raise InvalidOptionError(
+        param="regions",
+        value=type(region).__name__,
+        options=["a bounding box", "a GeoJSON shape", "a shapely geometry"],
+    )
+
+
+def features_within_radius(
+    adapter: VectorTilesAdapter,
+    longitude: float,
+    latitude: float,
+    radius: float,
+    zoom: int = 14,
+    layer: str = "image",
+) -> dict:
+    """
+    Fetches the images that may lie within a radius of a point
+
+    Only the tiles intersecting the circle are fetched, concurrently, and from the tile caches
+    when possible. The images are then pre-filtered with the bounding box of the circle, so
+    that the exact haversine distance, see `mapillary.utils.filter.haversine_dist`, is only
+    computed for the images close to the circle
+
+    :param adapter: The adapter through which the tiles are fetched
+    :type adapter: mapillary.models.api.vector_tiles.VectorTilesAdapter
+
+    :param longitude: The longitude of the center
+    :type longitude: float
+
+    :param latitude: The latitude of the center
+    :type latitude: float
+
+    :param radius: The radius, in meters
+    :type radius: float
+
+    :param zoom: The zoom level of the tiles, defaults to 14
+    :type zoom: int
+
+    :param layer: Either 'image', or 'computed_image', defaults to 'image'
+    :type layer: str
+
+    :return: A GeoJSON of the images within the bounding box of the circle, each image once
+    :rtype: dict
+    """
+
+    get_layer = (
+        VectorTiles.get_image_layer
+        if layer == "image"
+        else VectorTiles.get_computed_image_layer
+    )
+
+    tiles = adapter.fetch_tiles(
+        urls={
+            tile: get_layer(x=tile.x, y=tile.y, z=tile.z)
+            for tile in TilePlanner.radius_tiles(
+                longitude=longitude, latitude=latitude, radius=radius, zoom=zoom
+            )
+        },
+        layer=layer,
+    )
+
+    # Images within the buffer of a tile are found in its neighbours as well
+    features = list(
+        {
+            feature["properties"].get("id", index): feature
+            for index, feature in enumerate(
+                feature
+                for geojson in tiles.values()
+                for feature in geojson["features"]
+            )
+        }.values()
+    )
+
+    if features:
+        box = TilePlanner.radius_bbox(longitude, latitude, radius)
+        coordinates = numpy.array(
+            [feature["geometry"]["coordinates"] for feature in features],
+            dtype=numpy.float64,
+        ).reshape(-1, 2)
+
+        inside = (
+            (coordinates[:, 0] >= box["west"])
+            & (coordinates[:, 0] <= box["east"])
+            & (coordinates[:, 1] >= box["south"])
+            & (coordinates[:, 1] <= box["north"])
+        )
+
+        features = [feature for feature, keep in zip(features, inside) if keep]
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+def looking_at_distance(filters: dict, max_distance: float = None) -> Union[float, None]:
+    """
+    Gives the maximum viewing distance of the look at queries, the radius filter bounding it
+    as well
+
+    :param filters: The filters of the query, see `mapillary.utils.verify.image_check`
+    :type filters: dict
+
+    :param max_distance: The maximum distance given, if any
+    :type max_distance: float
+
+    :raises InvalidOptionError: Raised when the maximum distance is not positive
+
+    :return: The maximum distance in meters, or None when the query is not bounded
+    :rtype: Union[float, None]
+    """
+
+    if "radius" in filters:
+        max_distance = (
+            filters["radius"]
+            if max_distance is None
+            else min(max_distance, filters["radius"])
+        )
+
+    if max_distance is not None and max_distance <= 0:
+        raise InvalidOptionError(
+            param="max_distance", value=max_distance, options=["a positive distance"]
+        )
+
+    return max_distance
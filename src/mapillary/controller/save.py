@@ -15,22 +15,145 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 
 # Package Imports
 import os
-import json
+import io
+import re
+import gzip
 import csv
-from shapely.geometry import shape
+import collections
+import datetime
+import tempfile
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import mercantile
 
 # Local Imports
-from mapillary.utils.format import flatten_geojson
+from mapillary.models.exceptions import InvalidOptionError
+from mapillary.models.geojson import GeoJSON
+from mapillary.models.store import LocalStore
+from mapillary.utils import codec
+from mapillary.utils.dependency import import_optional
+from mapillary.utils.format import (
+    features_schema,
+    first_position,
+    flatten_feature,
+    geometries_to_wkb,
+    geometry_bounds,
+    geometry_to_wkt,
+    iterate_features,
+)
 from mapillary.utils.time import date_to_unix_timestamp
 from mapillary.utils.verify import check_file_name_validity
 
+# The stream compressions of the text formats, and the suffixes added to their file names
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def check_compression(compression: typing.Optional[str]) -> str:
+    """
+    Checks that a stream compression is supported and available
+
+    :param compression: Either 'gzip', 'zstd', or None for no compression
+    :type compression: typing.Optional[str]
+
+    :raises InvalidOptionError: Raised when the compression is not supported
+    :raises MissingDependencyError: Raised when zstandard is needed, but not installed
+
+    :return: The suffix to add to the file name
+    :rtype: str
+    """
+
+    if compression is None:
+        return ""
+
+    if compression not in COMPRESSION_SUFFIXES:
+        raise InvalidOptionError(
+            param="compression",
+            value=compression,
+            options=list(COMPRESSION_SUFFIXES.keys()),
+        )
+
+    if compression == "zstd":
+        import_optional(module="zstandard", extra="zstd")
+
+    return COMPRESSION_SUFFIXES[compression]
+
+
+def open_output(
+    file_path: str,
+    compression: typing.Optional[str] = None,
+    append: bool = False,
+    newline: str = None,
+) -> typing.TextIO:
+    """
+    Opens a text file for writing, compressed as it is written rather than once complete
+
+    Appending to a compressed file adds a new gzip member, or zstd frame, which readers of
+    either format decompress as a single stream
+
+    :param file_path: The path of the file
+    :type file_path: str
+
+    :param compression: Either 'gzip', 'zstd', or None for no compression, see
+        `check_compression`
+    :type compression: typing.Optional[str]
+
+    :param append: Whether to append to the file, rather than overwrite it
+    :type append: bool
+
+    :param newline: How lines are ended, as for `open`
+    :type newline: str
+
+    :return: The file, opened for writing text
+    :rtype: typing.TextIO
+    """
+
+    mode = "a" if append else "w"
+
+    if compression == "gzip":
+        return gzip.open(
+            file_path, f"{mode}t", compresslevel=6, encoding="utf-8", newline=newline
+        )
+
+    if compression == "zstd":
+        zstandard = import_optional(module="zstandard", extra="zstd")
+
+        return io.TextIOWrapper(
+            zstandard.ZstdCompressor(level=3).stream_writer(
+                open(file_path, f"{mode}b"), closefd=True
+            ),
+            encoding="utf-8",
+            newline=newline,
+            write_through=False,
+        )
+
+    # A large write buffer, as the files are written in chunks
+    return open(
+        file_path, mode, encoding="utf-8", newline=newline, buffering=1024 * 1024
+    )
+
 
-def save_as_csv_controller(data: str, path: str, file_name: str) -> None:
+def save_as_csv_controller(
+    data: typing.Union[str, dict, typing.Iterable],
+    path: str,
+    file_name: str,
+    fields: list = None,
+    chunk_size: int = 10000,
+    compression: str = None,
+    precision: int = None,
+    raise_errors: bool = False,
+) -> None:
     """
     Save data as CSV to given file path
 
-    :param data: The data to save as CSV
-    :type data: str
+    The features are streamed to the file in chunks of rows, so that the memory used does not
+    grow with the number of features. The columns are the union of the properties of all the
+    features. They are discovered in a pre-pass over the data, unless given through `fields`.
+    A one-shot iterator of features is spooled to a temporary file during the pre-pass
+
+    :param data: The data to save as CSV, either a GeoJSON string, a GeoJSON dictionary, or an
+        iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, typing.Iterable]
 
     :param path: The path to save to
     :type path: str
@@ -38,16 +161,30 @@ def save_as_csv_controller(data: str, path: str, file_name: str) -> None:
     :param file_name: The file name to save as
     :type file_name: str
 
+    :param fields: The property columns to write, after the 'ID' and 'WKT' columns. Defaults to
+        all the properties found in the data
+    :type fields: list
+
+    :param chunk_size: The number of rows written at once, defaults to 10000
+    :type chunk_size: int
+
+    :param compression: Either 'gzip' or 'zstd' to compress the file as it is written, adding
+        '.gz' or '.zst' to its name. Defaults to None, for no compression
+    :type compression: str
+
+    :param raise_errors: Whether to raise the errors met while writing, rather than printing
+        them. Defaults to False
+    :type raise_errors: bool
+
     :return: None
     :rtype: None
     """
 
-    # Ensure that the geojson is a dictionary
-    if isinstance(data, str):
-        data = json.loads(data)
+    suffix = check_compression(compression)
 
-    # Flatten the geojson
-    features = flatten_geojson(data)
+    # Ensure that the geojson is parsed once, rather than for each pass
+    if isinstance(data, (str, bytes)):
+        data = codec.loads(data)
 
     # Ensure that the file name is valid
     # Set the file name according to the given value. Default is
@@ -56,18 +193,22 @@ def save_as_csv_controller(data: str, path: str, file_name: str) -> None:
         file_name
         if (file_name is not None and check_file_name_validity(file_name))
         else f"mapillary_{date_to_unix_timestamp('*')}_"
-    ) + ".csv"
+    ) + f".csv{suffix}"
+
+    # A one-shot iterator can only be read once, so it is spooled while discovering the columns
+    spool = None
 
     try:
-        # Context manager for writing to file
-        with open(os.path.join(path, file_name), "w", newline="") as file_path:
-            # Enforce the header for field_names
-            field_names = (
-                ["ID", "WKT"]
-                + [
+        if fields is None:
+            if isinstance(data, typing.Iterator):
+                spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+                data = spool_features(features=data, spool=spool)
+
+            fields = (
+                [
                     key
-                    for key in features[0].keys()
-                    if key != "id" and key != "geometry"
+                    for key in features_schema(iterate_features(data))
+                    if key not in ["id", "geometry", "organization_id"]
                 ]
                 # organization_id may or may not exist in the flattened features
                 # If it does exist, then its value will be reflected
@@ -75,47 +216,478 @@ def save_as_csv_controller(data: str, path: str, file_name: str) -> None:
                 + ["organization_id"]
             )
 
-            # Create the csv writer
-            writer = csv.DictWriter(file_path, fieldnames=field_names)
+        # Enforce the header for field_names
+        field_names = ["ID", "WKT"] + [
+            key for key in fields if key not in ["id", "geometry"]
+        ]
+
+        # Context manager for writing to file
+        with open_output(
+            os.path.join(path, file_name), compression=compression, newline=""
+        ) as file_path:
+            # Create the csv writer. Missing properties are left empty, and properties not in
+            # the header are skipped
+            writer = csv.DictWriter(
+                file_path, fieldnames=field_names, extrasaction="ignore"
+            )
 
             # Write the header
             writer.writeheader()
 
-            for feature in features:
-                writer.writerow(
+            rows = []
+
+            for feature in iterate_features(data):
+                rows.append(
                     {
+                        # The rest of the columns are the features attributes
+                        **flatten_feature(feature),
                         # ID is the id of the feature. It will always exist
                         # and will always be the first column
-                        "ID": feature["id"],
+                        "ID": feature["properties"]["id"],
                         # WKT is the geometry of the feature in well-known text format.
                         # It will always exist
-                        "WKT": shape(feature["geometry"]).wkt,
-                        # The rest of the columns are the features attributes
-                        **{
-                            key: feature[key]
-                            for key in feature.keys()
-                            if key != "id" and key != "geometry"
-                        },
+                        "WKT": geometry_to_wkt(feature["geometry"]),
                         # organization_id is the id of the organization that the feature belongs to.
                         # If it does exist, then its value will be reflected
                         # If it does not exist, then it will be set to "NULL"
-                        "organization_id": feature["organization_id"]
-                        if "organization_id" in feature
-                        else "NULL",
+                        "organization_id": feature["properties"].get(
+                            "organization_id", "NULL"
+                        ),
                     }
                 )
+
+                # Write the rows a chunk at a time
+                if len(rows) >= chunk_size:
+                    writer.writerows(rows)
+                    rows = []
+
+            writer.writerows(rows)
+
     except Exception as e:
+        # As for the part files of a partitioned dataset
+        if raise_errors:
+            raise
+
         # If there is an error, log it
         print(f"An error occurred: {e}")
+
+    finally:
+        if spool is not None:
+            spool.close()
+
     return None
 
 
-def save_as_geojson_controller(data: str, path: str, file_name: str) -> None:
+def spool_features(features: typing.Iterator, spool: typing.IO) -> typing.Iterable:
+    """
+    Writes features to a temporary file, one per line, so that they can be read more than once
+
+    :param features: A one-shot iterator of GeoJSON features
+    :type features: typing.Iterator
+
+    :param spool: A temporary file opened for reading and writing text
+    :type spool: typing.IO
+
+    :return: A re-iterable source of the spooled features
+    :rtype: typing.Iterable
+    """
+
+    for feature in features:
+        spool.write(codec.dumps(feature).decode("utf-8"))
+        spool.write("\n")
+
+    class SpooledFeatures:
+        """Reads the spooled features back, from the start of the file, on every iteration"""
+
+        def __iter__(self) -> typing.Iterator:
+            spool.seek(0)
+            return (codec.loads(line) for line in spool)
+
+    return SpooledFeatures()
+
+
+# The column types of the properties known to the SDK, for the Parquet format. Properties not
+# listed here are typed after their values
+PARQUET_COLUMN_TYPES = {
+    "id": "int64",
+    "captured_at": "timestamp",
+    "compass_angle": "float64",
+    "computed_compass_angle": "float64",
+    "is_pano": "bool",
+    "sequence_id": "string",
+    "organization_id": "int64",
+    "creator_id": "int64",
+    "image_id": "int64",
+    "value": "string",
+    "first_seen_at": "timestamp",
+    "last_seen_at": "timestamp",
+    "altitude": "float64",
+    "computed_altitude": "float64",
+    "height": "int64",
+    "width": "int64",
+    "camera_type": "string",
+}
+
+
+def save_as_parquet_controller(
+    data: typing.Union[str, dict, typing.Iterable],
+    path: str,
+    file_name: str,
+    fields: list = None,
+    row_group_size: int = 100000,
+    compression: str = "zstd",
+    raise_errors: bool = False,
+) -> None:
+    """
+    Save data as GeoParquet to given file path
+
+    The properties are written as typed columns, e.g., 'id' as int64, 'captured_at' as a UTC
+    timestamp, 'compass_angle' as float64 and 'is_pano' as bool, and the geometries as WKB in
+    the 'geometry' column, described by the GeoParquet 'geo' metadata. The features are
+    streamed to the file a row group at a time
+
+    Requires the optional dependency pyarrow, installed with `pip install "mapillary[parquet]"`
+
+    :param data: The data to save as GeoParquet, either a GeoJSON string, a GeoJSON dictionary,
+        or an iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, typing.Iterable]
+
+    :param path: The path to save to
+    :type path: str
+
+    :param file_name: The file name to save as
+    :type file_name: str
+
+    :param fields: The property columns to write. Defaults to all the properties found in a
+        pre-pass over the data. Properties unknown to the SDK are then written as strings
+    :type fields: list
+
+    :param row_group_size: The number of rows per row group, defaults to 100000
+    :type row_group_size: int
+
+    :param compression: The compression codec, either 'zstd', 'snappy', 'gzip', 'brotli',
+        'lz4' or 'none', defaults to 'zstd'
+    :type compression: str
+
+    :raises MissingDependencyError: Raised when pyarrow is not installed
+
+    :param raise_errors: Whether to raise the errors met while writing, rather than printing
+        them. Defaults to False
+    :type raise_errors: bool
+
+    :return: None
+    :rtype: None
+    """
+
+    pa = import_optional(module="pyarrow", extra="parquet")
+    pq = import_optional(module="pyarrow.parquet", extra="parquet")
+
+    # Ensure that the geojson is parsed once, rather than for each pass
+    if isinstance(data, (str, bytes)):
+        data = codec.loads(data)
+
+    # Ensure that the file name is valid
+    # Set the file name according to the given value. Default is
+    # "mapillary_CURRENT_UNIX_TIMESTAMP_.parquet"
+    file_name = (
+        file_name
+        if (file_name is not None and check_file_name_validity(file_name))
+        else f"mapillary_{date_to_unix_timestamp('*')}_"
+    ) + ".parquet"
+
+    # A one-shot iterator can only be read once, so it is spooled while discovering the columns
+    spool = None
+
+    # The GeoParquet metadata of the geometry column
+    geometry_metadata = {"encoding": "WKB", "geometry_types": []}
+
+    try:
+        if fields is None:
+            if isinstance(data, typing.Iterator):
+                spool = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+                data = spool_features(features=data, spool=spool)
+
+            column_types, geometry_types = parquet_schema(iterate_features(data))
+            geometry_metadata["geometry_types"] = geometry_types
+        else:
+            column_types = {
+                key: PARQUET_COLUMN_TYPES.get(key, "string")
+                for key in fields
+                if key != "geometry"
+            }
+
+        arrow_types = {
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "bool": pa.bool_(),
+            "string": pa.string(),
+            "timestamp": pa.timestamp("ms", tz="UTC"),
+        }
+
+        schema = pa.schema(
+            [pa.field(key, arrow_types[kind]) for key, kind in column_types.items()]
+            + [pa.field("geometry", pa.binary())],
+            metadata={
+                "geo": codec.dumps(
+                    {
+                        "version": "1.0.0",
+                        "primary_column": "geometry",
+                        "columns": {"geometry": geometry_metadata},
+                    }
+                )
+            },
+        )
+
+        with pq.ParquetWriter(
+            os.path.join(path, file_name), schema=schema, compression=compression
+        ) as writer:
+
+            features = []
+
+            for feature in iterate_features(data):
+                features.append(feature)
+
+                # Write the features a row group at a time
+                if len(features) >= row_group_size:
+                    writer.write_table(
+                        parquet_table(pa, schema, column_types, features),
+                        row_group_size=row_group_size,
+                    )
+                    features = []
+
+            if features:
+                writer.write_table(
+                    parquet_table(pa, schema, column_types, features),
+                    row_group_size=row_group_size,
+                )
+
+    except Exception as e:
+        # As for the part files of a partitioned dataset
+        if raise_errors:
+            raise
+
+        # If there is an error, log it
+        print(f"An error occurred: {e}")
+
+    finally:
+        if spool is not None:
+            spool.close()
+
+    return None
+
+
+def parquet_schema(features: typing.Iterable) -> typing.Tuple[dict, list]:
+    """
+    Discovers the property columns and their types, and the geometry types, of features
+
+    :param features: An iterable of GeoJSON features
+    :type features: typing.Iterable
+
+    :return: The column types by property name, and the sorted list of geometry types
+    :rtype: typing.Tuple[dict, list]
+    """
+
+    column_types = {}
+    geometry_types = set()
+
+    for feature in features:
+        geometry_types.add(feature["geometry"]["type"])
+
+        for key, value in feature["properties"].items():
+            # Keep the first type found, or the known type of the property
+            if column_types.get(key) is None:
+                column_types[key] = PARQUET_COLUMN_TYPES.get(key, parquet_type(value))
+
+    # Properties that were always null are written as strings
+    return (
+        {key: kind or "string" for key, kind in column_types.items()},
+        sorted(geometry_types),
+    )
+
+
+def parquet_type(value: typing.Any) -> typing.Optional[str]:
+    """
+    Infers the column type of a property value
+
+    :param value: The property value
+    :type value: typing.Any
+
+    :return: The column type, or None for a null value
+    :rtype: typing.Optional[str]
+    """
+
+    if value is None:
+        return None
+
+    # bool is a subclass of int, so it is checked first
+    if isinstance(value, bool):
+        return "bool"
+
+    if isinstance(value, int):
+        return "int64"
+
+    if isinstance(value, float):
+        return "float64"
+
+    return "string"
+
+
+def parquet_table(pa, schema, column_types: dict, features: list):
+    """
+    Converts a chunk of features to an Arrow table
+
+    :param pa: The pyarrow module
+    :type pa: types.ModuleType
+
+    :param schema: The schema of the table
+    :type schema: pyarrow.Schema
+
+    :param column_types: The column types by property name
+    :type column_types: dict
+
+    :param features: The GeoJSON features
+    :type features: list
+
+    :return: The table
+    :rtype: pyarrow.Table
+    """
+
+    converters = {
+        "int64": int,
+        "float64": float,
+        "bool": bool,
+        "timestamp": lambda value: value
+        if isinstance(value, (int, float))
+        else date_to_unix_timestamp(value),
+        "string": lambda value: value
+        if isinstance(value, str)
+        else codec.dumps(value).decode("utf-8")
+        if isinstance(value, (dict, list))
+        else str(value),
+    }
+
+    columns = {
+        key: [
+            None
+            if feature["properties"].get(key) is None
+            else converters[kind](feature["properties"][key])
+            for feature in features
+        ]
+        for key, kind in column_types.items()
+    }
+
+    columns["geometry"] = geometries_to_wkb(
+        [feature["geometry"] for feature in features]
+    )
+
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def geojson_chunks(
+    data: typing.Union[str, dict, GeoJSON, typing.Iterable],
+    indent: int = None,
+    precision: int = None,
+    chunk_size: int = 10000,
+) -> typing.Iterator[str]:
+    """
+    Encodes a feature collection a chunk of features at a time, so that it can be written
+    without holding the whole encoded document in memory
+
+    The members of the collection come first, then the features, laid out as `json.dumps`
+    would with the same indentation
+
+    :param data: The data to encode, either a GeoJSON string, a GeoJSON dictionary, a GeoJSON
+        object, or an iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, GeoJSON, typing.Iterable]
+
+    :param indent: The indentation of the GeoJSON, or None to encode it compactly. Defaults to
+        None
+    :type indent: int
+
+    :param precision: The number of decimals the coordinates are rounded to. Defaults to None,
+        keeping every decimal
+    :type precision: int
+
+    :param chunk_size: The number of features per chunk, defaults to 10000
+    :type chunk_size: int
+
+    :return: The chunks of the encoded GeoJSON
+    :rtype: typing.Iterator[str]
+    """
+
+    # Ensure that the geojson is parsed once
+    if isinstance(data, (str, bytes)):
+        data = codec.loads(data)
+
+    if isinstance(data, GeoJSON):
+        data = data.to_dict()
+
+    # A single feature is small enough to be encoded at once
+    if isinstance(data, dict) and "features" not in data:
+        yield codec.dumps(data, precision=precision, indent=indent).decode("utf-8")
+        return
+
+    members = (
+        {key: value for key, value in data.items() if key != "features"}
+        if isinstance(data, dict)
+        else {"type": "FeatureCollection"}
+    )
+
+    newline = "" if indent is None else "\n"
+    colon = ":" if indent is None else ": "
+    pad = "" if indent is None else " " * indent
+
+    def encode(value: typing.Any, level: int) -> str:
+        # Nested values are indented by the levels they are nested in
+        return (
+            codec.dumps(value, precision=precision, indent=indent)
+            .decode("utf-8")
+            .replace("\n", "\n" + pad * level)
+        )
+
+    chunk = [
+        "{"
+        + "".join(
+            f"{newline}{pad}{encode(key, 1)}{colon}{encode(value, 1)},"
+            for key, value in members.items()
+        )
+        + f'{newline}{pad}"features"{colon}['
+    ]
+    count = 0
+
+    for feature in iterate_features(data):
+        chunk.append(f"{',' if count else ''}{newline}{pad * 2}{encode(feature, 2)}")
+        count += 1
+
+        # Hand over the features a chunk at a time
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+
+    # An empty list is closed on the same line, as by `json.dumps`
+    chunk.append(f"{newline}{pad}]{newline}}}" if count else f"]{newline}}}")
+
+    yield "".join(chunk)
+
+
+def save_as_geojson_controller(
+    data: typing.Union[str, dict, GeoJSON, typing.Iterable],
+    path: str,
+    file_name: str,
+    compression: str = None,
+    indent: int = 4,
+    precision: int = None,
+    chunk_size: int = 10000,
+    raise_errors: bool = False,
+) -> None:
     """
     Save data as GeoJSON to given file path
 
-    :param data: The data to save as GeoJSON
-    :type data: str
+    The GeoJSON is encoded and written a chunk of features at a time, see `geojson_chunks`
+
+    :param data: The data to save as GeoJSON, either a GeoJSON string, a GeoJSON dictionary, a
+        GeoJSON object, or an iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, GeoJSON, typing.Iterable]
 
     :param path: The path to save to
     :type path: str
@@ -123,13 +695,29 @@ def save_as_geojson_controller(data: str, path: str, file_name: str) -> None:
     :param file_name: The file name to save as
     :type file_name: str
 
+    :param compression: Either 'gzip' or 'zstd' to compress the file as it is written, adding
+        '.gz' or '.zst' to its name. Defaults to None, for no compression
+    :type compression: str
+
+    :param indent: The indentation of the GeoJSON, or None to write it compactly. Defaults to 4
+    :type indent: int
+
+    :param precision: The number of decimals the coordinates are rounded to. Defaults to None,
+        keeping every decimal
+    :type precision: int
+
+    :param chunk_size: The number of features written at once, defaults to 10000
+    :type chunk_size: int
+
+    :param raise_errors: Whether to raise the errors met while writing, rather than printing
+        them. Defaults to False
+    :type raise_errors: bool
+
     :return: None
     :rtype: None
     """
 
-    # Ensure that the geojson is a dictionary
-    if isinstance(data, str):
-        data = json.loads(data)
+    suffix = check_compression(compression)
 
     # Ensure that the file name is valid
     # Set the file name according to the given value. Default is
@@ -138,14 +726,484 @@ def save_as_geojson_controller(data: str, path: str, file_name: str) -> None:
         file_name
         if (file_name is not None and check_file_name_validity(file_name))
         else f"mapillary_{date_to_unix_timestamp('*')}_"
-    ) + ".geojson"
+    ) + f".geojson{suffix}"
 
     try:
-        # Context manager for writing to file
-        with open(os.path.join(path, file_name), "w") as file_path:
-            json.dump(data, file_path, indent=4)
+        # Context manager for writing to file, the GeoJSON is written as it is encoded
+        with open_output(
+            os.path.join(path, file_name), compression=compression
+        ) as file_path:
+            for chunk in geojson_chunks(
+                data, indent=indent, precision=precision, chunk_size=chunk_size
+            ):
+                file_path.write(chunk)
     except Exception as e:
+        # As for the part files of a partitioned dataset
+        if raise_errors:
+            raise
+
         # If there is an error, log it
         print(e)
 
     return None
+
+
+def save_as_geojsonl_controller(
+    data: typing.Union[str, dict, typing.Iterable],
+    path: str,
+    file_name: str,
+    append: bool = False,
+    chunk_size: int = 10000,
+    compression: str = None,
+    precision: int = None,
+    raise_errors: bool = False,
+) -> None:
+    """
+    Save data as newline-delimited GeoJSON (GeoJSONSeq) to given file path
+
+    Each feature is written compactly on its own line, as it comes from the data, so that the
+    file can be written incrementally, and read back a line at a time or split by byte offset
+
+    :param data: The data to save, either a GeoJSON string, a GeoJSON dictionary, or an
+        iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, typing.Iterable]
+
+    :param path: The path to save to
+    :type path: str
+
+    :param file_name: The file name to save as
+    :type file_name: str
+
+    :param append: If True, the features are added to the end of an existing file, e.g., to
+        resume a crawl. A partial last line left by an interrupted write is dropped first.
+        Defaults to False
+    :type append: bool
+
+    :param chunk_size: The number of lines written at once, defaults to 10000
+    :type chunk_size: int
+
+    :param compression: Either 'gzip' or 'zstd' to compress the file as it is written, adding
+        '.gz' or '.zst' to its name. Appending adds a new gzip member, or zstd frame, without
+        checking for a partial last line. Defaults to None, for no compression
+    :type compression: str
+
+    :param precision: The number of decimals the coordinates are rounded to. Defaults to None,
+        keeping every decimal
+    :type precision: int
+
+    :param raise_errors: Whether to raise the errors met while writing, rather than printing
+        them. Defaults to False
+    :type raise_errors: bool
+
+    :return: None
+    :rtype: None
+    """
+
+    suffix = check_compression(compression)
+
+    # Ensure that the file name is valid
+    # Set the file name according to the given value. Default is
+    # "mapillary_CURRENT_UNIX_TIMESTAMP_.geojsonl"
+    file_name = (
+        file_name
+        if (file_name is not None and check_file_name_validity(file_name))
+        else f"mapillary_{date_to_unix_timestamp('*')}_"
+    ) + f".geojsonl{suffix}"
+
+    file_path = os.path.join(path, file_name)
+
+    try:
+        # A compressed file cannot be truncated in place
+        if append and compression is None:
+            truncate_partial_line(file_path)
+
+        # Context manager for writing to file
+        with open_output(file_path, compression=compression, append=append) as file:
+            lines = []
+
+            for feature in iterate_features(data):
+                lines.append(
+                    codec.dumps(feature, precision=precision).decode("utf-8")
+                )
+
+                # Write the lines a chunk at a time
+                if len(lines) >= chunk_size:
+                    file.write("\n".join(lines) + "\n")
+                    lines = []
+
+            if lines:
+                file.write("\n".join(lines) + "\n")
+
+    except Exception as e:
+        # As for the part files of a partitioned dataset
+        if raise_errors:
+            raise
+
+        # If there is an error, log it
+        print(f"An error occurred: {e}")
+
+    return None
+
+
+def truncate_partial_line(file_path: str) -> None:
+    """
+    Drops the incomplete last line of a newline-delimited file, if any
+
+    :param file_path: The path of the file
+    :type file_path: str
+
+    :return: None
+    :rtype: None
+    """
+
+    if not os.path.exists(file_path):
+        return None
+
+    with open(file_path, "rb+") as file:
+        end = file.seek(0, os.SEEK_END)
+
+        # Walk back from the end, a block at a time, to the last newline
+        position = end
+        while position > 0:
+            block_start = max(0, position - 65536)
+            file.seek(block_start)
+            block = file.read(position - block_start)
+
+            index = block.rfind(b"\n")
+            if index != -1:
+                position = block_start + index + 1
+                break
+
+            position = block_start
+
+        if position != end:
+            file.truncate(position)
+
+    return None
+
+
+def save_to_store_controller(
+    data: typing.Union[str, dict, typing.Iterable],
+    path: str,
+    file_name: str,
+    layer: str = "image",
+    chunk_size: int = 10000,
+) -> None:
+    """
+    Upsert data into a local SQLite store at the given file path
+
+    Features already in the store are replaced by the ones with the same ID, so that the store
+    can be updated incrementally, see `mapillary.models.store.LocalStore`
+
+    :param data: The data to save, either a GeoJSON string, a GeoJSON dictionary, or an
+        iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, typing.Iterable]
+
+    :param path: The path to save to
+    :type path: str
+
+    :param file_name: The file name to save as
+    :type file_name: str
+
+    :param layer: The layer the features belong to, e.g., 'image', 'point', 'traffic_sign'.
+        Defaults to 'image'
+    :type layer: str
+
+    :param chunk_size: The number of features written per transaction, defaults to 10000
+    :type chunk_size: int
+
+    :return: None
+    :rtype: None
+    """
+
+    # Ensure that the file name is valid
+    # Set the file name according to the given value. Default is
+    # "mapillary_CURRENT_UNIX_TIMESTAMP_.sqlite"
+    file_name = (
+        file_name
+        if (file_name is not None and check_file_name_validity(file_name))
+        else f"mapillary_{date_to_unix_timestamp('*')}_"
+    ) + ".sqlite"
+
+    try:
+        with LocalStore(path=os.path.join(path, file_name)) as store:
+            store.upsert(data=data, layer=layer, chunk_size=chunk_size)
+
+    except Exception as e:
+        # If there is an error, log it
+        print(f"An error occurred: {e}")
+
+    return None
+
+
+# The partitioning schemes of `save_partitioned_controller`, and their directory columns
+PARTITION_COLUMNS = {"quadkey": "quadkey", "month": "captured_month"}
+
+# The partition of the features without a partition value, as named by Hive
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def save_partitioned_controller(
+    data: typing.Union[str, dict, typing.Iterable],
+    path: str,
+    file_name: str,
+    extension: str = "geojsonl",
+    partition_by: str = "quadkey",
+    zoom: int = 8,
+    workers: int = 4,
+    part_size: int = 100000,
+    buffer_size: int = 200000,
+    **options,
+) -> dict:
+    """
+    Save data as a dataset partitioned by quadkey or capture month, to given file path
+
+    The features are split into Hive-style partition directories, e.g., 'quadkey=0313102/' or
+    'captured_month=2021-03/', each holding one or more part files. The part files are written
+    concurrently, as soon as enough features of their partition are read, or when the features
+    read for all the partitions reach `buffer_size`, the largest partition first. At most
+    `workers` part files wait to be written, so that the features held in memory stay bounded
+    by `buffer_size` plus `workers` times `part_size`. A '_manifest.json' file lists the
+    partitions along with their number of features, bounds and files, so that readers can
+    prune the partitions they do not need. It is only written once every part file is, so that
+    it never lists a missing file
+
+    :param data: The data to save, either a GeoJSON string, a GeoJSON dictionary, or an
+        iterable (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, typing.Iterable]
+
+    :param path: The path to save to
+    :type path: str
+
+    :param file_name: The name of the dataset directory
+    :type file_name: str
+
+    :param extension: The format of the part files, either 'geojson', 'csv', 'parquet' or
+        'geojsonl'. Defaults to 'geojsonl'
+    :type extension: str
+
+    :param partition_by: Either 'quadkey', the quadkey of the tile holding the first position of
+        each feature, or 'month', the month of the 'captured_at' property. Defaults to
+        'quadkey'
+    :type partition_by: str
+
+    :param zoom: The zoom level of the quadkeys, defaults to 8
+    :type zoom: int
+
+    :param workers: The number of part files written at once, defaults to 4
+    :type workers: int
+
+    :param part_size: The maximum number of features per part file, defaults to 100000
+    :type part_size: int
+
+    :param buffer_size: The maximum number of features read, across all the partitions, before
+        some are written, defaults to 200000
+    :type buffer_size: int
+
+    :param options: The options of the format of the part files, e.g., 'fields' or
+        'compression', see `save_locally`
+    :type options: dict
+
+    :raises InvalidOptionError: Raised when the format or the partitioning is not supported
+    :raises Exception: Raised when a part file fails to be written, leaving no manifest
+
+    :return: The manifest of the dataset
+    :rtype: dict
+    """
+
+    # The formats that can be written as part files
+    controllers = {
+        "geojson": save_as_geojson_controller,
+        "csv": save_as_csv_controller,
+        "parquet": save_as_parquet_controller,
+        "geojsonl": save_as_geojsonl_controller,
+    }
+
+    if extension not in controllers:
+        raise InvalidOptionError(
+            param="extension", value=extension, options=list(controllers.keys())
+        )
+
+    if partition_by not in PARTITION_COLUMNS:
+        raise InvalidOptionError(
+            param="partition_by",
+            value=partition_by,
+            options=list(PARTITION_COLUMNS.keys()),
+        )
+
+    # The suffix added by the controllers to the part files
+    suffix = f".{extension}" + (
+        check_compression(options.get("compression")) if extension != "parquet" else ""
+    )
+
+    # Ensure that the directory name is valid
+    root = os.path.join(
+        path,
+        file_name
+        if (file_name is not None and check_file_name_validity(file_name))
+        else f"mapillary_{date_to_unix_timestamp('*')}_",
+    )
+
+    column = PARTITION_COLUMNS[partition_by]
+    partitions = {}
+
+    # The number of features read, and not yet submitted, across all the partitions
+    buffered = 0
+
+    def flush(partition: dict) -> None:
+        """Submits the features read for a partition, as its next part file"""
+
+        nonlocal buffered
+
+        part = f"part-{len(partition['files']):05d}"
+        partition["files"].append(part + suffix)
+
+        features, partition["features"] = partition["features"], []
+        buffered -= len(features)
+
+        futures.append(
+            executor.submit(
+                controllers[extension],
+                data={"type": "FeatureCollection", "features": features},
+                path=partition["directory"],
+                file_name=part,
+                raise_errors=True,
+                **options,
+            )
+        )
+
+        # Wait for the oldest part files, surfacing their errors, rather than queueing
+        # every feature read
+        while len(futures) > workers:
+            futures.popleft().result()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures: typing.Deque[Future] = collections.deque()
+
+        for feature in iterate_features(data):
+            value = partition_value(feature, partition_by=partition_by, zoom=zoom)
+
+            if value not in partitions:
+                directory = os.path.join(root, f"{column}={value}")
+                os.makedirs(directory, exist_ok=True)
+
+                partitions[value] = {
+                    "directory": directory,
+                    "count": 0,
+                    "bounds": None,
+                    "files": [],
+                    "features": [],
+                }
+
+            partition = partitions[value]
+            partition["count"] += 1
+            partition["bounds"] = merge_bounds(
+                partition["bounds"], geometry_bounds(feature.get("geometry"))
+            )
+            partition["features"].append(feature)
+            buffered += 1
+
+            if len(partition["features"]) >= part_size:
+                flush(partition)
+
+            elif buffered >= buffer_size:
+                flush(max(partitions.values(), key=lambda item: len(item["features"])))
+
+        for partition in partitions.values():
+            if partition["features"]:
+                flush(partition)
+
+        # Surface the errors of the writers
+        for future in futures:
+            future.result()
+
+    manifest = {
+        "format": extension,
+        "partition_by": partition_by,
+        "partition_column": column,
+        "zoom": zoom if partition_by == "quadkey" else None,
+        "count": sum(partition["count"] for partition in partitions.values()),
+        "bounds": None,
+        "partitions": [],
+    }
+
+    for value in sorted(partitions):
+        partition = partitions[value]
+        manifest["bounds"] = merge_bounds(manifest["bounds"], partition["bounds"])
+        manifest["partitions"].append(
+            {
+                "path": f"{column}={value}",
+                "value": value,
+                "count": partition["count"],
+                "bounds": partition["bounds"],
+                "files": partition["files"],
+            }
+        )
+
+    os.makedirs(root, exist_ok=True)
+
+    with open(os.path.join(root, "_manifest.json"), "wb") as file:
+        codec.dump(manifest, file, indent=4)
+
+    return manifest
+
+
+def partition_value(feature: dict, partition_by: str, zoom: int) -> str:
+    """
+    Computes the partition of a feature
+
+    :param feature: The GeoJSON feature
+    :type feature: dict
+
+    :param partition_by: Either 'quadkey' or 'month'
+    :type partition_by: str
+
+    :param zoom: The zoom level of the quadkeys
+    :type zoom: int
+
+    :return: The partition value, or the default partition when the feature has none
+    :rtype: str
+    """
+
+    if partition_by == "quadkey":
+        position = first_position(feature.get("geometry"))
+
+        if position is None:
+            return DEFAULT_PARTITION
+
+        return mercantile.quadkey(mercantile.tile(position[0], position[1], zoom))
+
+    captured_at = (feature.get("properties") or {}).get("captured_at")
+
+    if isinstance(captured_at, (int, float)):
+        # Timestamps are in milliseconds, and months in UTC
+        return datetime.datetime.fromtimestamp(
+            captured_at / 1000, tz=datetime.timezone.utc
+        ).strftime("%Y-%m")
+
+    # Dates, e.g., from the entity API, start with the month
+    if isinstance(captured_at, str) and re.match(r"^\d{4}-\d{2}", captured_at):
+        return captured_at[:7]
+
+    return DEFAULT_PARTITION
+
+
+def merge_bounds(
+    bounds: typing.Optional[list], other: typing.Optional[list]
+) -> typing.Optional[list]:
+    """
+    Merges two bounds, as [west, south, east, north], either of which may be None
+
+    :return: The bounds covering both
+    :rtype: typing.Optional[list]
+    """
+
+    if bounds is None or other is None:
+        return bounds or other
+
+    return [
+        min(bounds[0], other[0]),
+        min(bounds[1], other[1]),
+        max(bounds[2], other[2]),
+        max(bounds[3], other[3]),
+    ]
@@ -0,0 +1,165 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.controllers.store
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module implements the local stores of the Mapillary Python SDK, the querying of SQLite
+stores, as saved with `mapillary.interface.save_locally(..., extension='sqlite')`, and the
+downloading of MBTiles tile archives.
+
+For more information, please check out https://www.mapillary.com/developer/api-documentation/
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import os
+
+# Local imports
+
+# # Configs
+from mapillary.config.api.vector_tiles import VectorTiles
+
+# # Models
+from mapillary.models.exceptions import InvalidOptionError
+from mapillary.models.mbtiles import MBTilesArchive
+from mapillary.models.planner import TilePlanner
+from mapillary.models.store import LocalStore
+
+# # Utils
+from mapillary.utils.filter import bbox_filter_components, map_features_filter_components
+from mapillary.utils.format import merged_features_list_to_geojson
+from mapillary.utils.verify import (
+    image_bbox_check,
+    points_traffic_signs_check,
+    sequence_bbox_check,
+)
+
+
+def query_store_controller(
+    path: str, layer: str, bbox: dict, filter_values: list, filters: dict
+) -> str:
+    """
+    For getting the features of a local store that pass the filters of the given layer, as
+    `images_in_bbox` or `map_feature_points_in_bbox` would for the same arguments
+
+    :param path: The path of the SQLite store
+    :type path: str
+
+    :param layer: The layer of the features, either 'image', 'sequence', or the layer of map
+        features they were stored as, e.g., 'points', 'traffic_signs'
+    :type layer: str
+
+    :param bbox: A bounding box representation, or None to select the whole store
+    :type bbox: dict
+
+    :param filter_values: The values of the map features to select, see
+        `mapillary.interface.map_feature_points_in_bbox`
+    :type filter_values: list
+
+    :param filters: The filters of the layer, see `mapillary.utils.verify.image_bbox_check`,
+        `mapillary.utils.verify.sequence_bbox_check` and
+        `mapillary.utils.verify.points_traffic_signs_check`
+    :type filters: dict
+
+    :raises FileNotFoundError: Raised when there is no store at the given path
+
+    :return: GeoJSON
+    :rtype: str
+    """
+
+    # Querying a missing store would create an empty one
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No local store found at {path}")
+
+    if layer in ("image", "sequence"):
+        filters = (
+            image_bbox_check(filters)
+            if layer == "image"
+            else sequence_bbox_check(filters)
+        )
+
+        components = bbox_filter_components(
+            bounding_box=bbox, layer=layer, filters=filters
+        )
+
+        # The sequences intersecting the bounding box are found through the R-tree index
+        if layer == "sequence":
+            components.append({"filter": "features_in_bounding_box", "bbox": bbox})
+
+    else:
+        components = map_features_filter_components(
+            bbox=bbox,
+            filter_values=filter_values,
+            filters=points_traffic_signs_check(filters),
+        )
+
+    # Without a bounding box, the whole store is selected
+    if bbox is None:
+        components = [
+            component
+            for component in components
+            if component.get("filter") != "features_in_bounding_box"
+        ]
+
+    with LocalStore(path=path) as store:
+        return merged_features_list_to_geojson(
+            store.query(layer=layer, components=components)
+        )
+
+
+def download_tiles_controller(
+    bbox: dict, path: str, layer: str, zoom: int, workers: int
+) -> dict:
+    """
+    For downloading the vector tiles of a layer covering a bounding box into an MBTiles archive
+
+    :param bbox: A bounding box representation
+    :type bbox: dict
+
+    :param path: The path of the MBTiles archive, resumed if it exists
+    :type path: str
+
+    :param layer: Either 'image', 'sequence', 'overview', which share the coverage tiles,
+        'computed_image', 'points' or 'traffic_signs'
+    :type layer: str
+
+    :param zoom: The zoom level of the tiles
+    :type zoom: int
+
+    :param workers: The number of tiles downloaded at once
+    :type workers: int
+
+    :raises InvalidOptionError: Raised when an invalid layer is passed
+
+    :return: The number of tiles 'downloaded', 'skipped' and 'failed', see
+        `mapillary.models.mbtiles.MBTilesArchive.download`
+    :rtype: dict
+    """
+
+    # The URL builders of each layer
+    layers = {
+        "image": VectorTiles.get_image_layer,
+        "sequence": VectorTiles.get_sequence_layer,
+        "overview": VectorTiles.get_overview_layer,
+        "computed_image": VectorTiles.get_computed_image_layer,
+        "points": VectorTiles.get_map_feature_point,
+        "traffic_signs": VectorTiles.get_map_feature_traffic_sign,
+    }
+
+    if layer not in layers:
+        raise InvalidOptionError(
+            param="layer", value=layer, options=list(layers.keys())
+        )
+
+    # Every tile of the region is archived, so that empty tiles are known offline as well
+    urls = {
+        tile: layers[layer](x=tile.x, y=tile.y, z=tile.z)
+        for tile in TilePlanner.bbox_tiles(bbox=bbox, zoom=zoom)
+    }
+
+    with MBTilesArchive(path=path) as archive:
+        return archive.download(urls=urls, workers=workers)
@@ -13,17 +13,18 @@ https://www.mapillary.com/developer/api-documentation/
 - License: MIT LICENSE
 """
 # Package level imports
-from typing import Union
+from typing import Iterable, List, Union
 import requests
-import json
 import os
 
 # Local
+from mapillary.utils import codec
 from mapillary.utils.auth import auth, set_token
 
 # Models
 from mapillary.models.geojson import Coordinates, GeoJSON
 from mapillary.models.config import Config
+from mapillary.models.planner import QueryPlan
 
 # Exception classes
 from mapillary.models.exceptions import InvalidOptionError
@@ -33,6 +34,7 @@ import mapillary.controller.image as image
 import mapillary.controller.feature as feature
 import mapillary.controller.detection as detection
 import mapillary.controller.save as save
+import mapillary.controller.store as store
 
 
 def configure_mapillary_settings(**kwargs):
@@ -50,6 +52,11 @@ def configure_mapillary_settings(**kwargs):
         >>> import mapillary as mly
         >>> mly.interface.configure_mapillary_settings()
         >>> mly.interface.configure_mapillary_settings(use_strict=True)
+        >>> mly.interface.configure_mapillary_settings(
+        ...     offline=True,
+        ...     tile_archives=['region.mbtiles'],
+        ...     store_path='local_store.sqlite'
+        ... )
 
     :param kwargs: Keyword arguments for the configuration
     :type kwargs: dict
@@ -57,11 +64,52 @@ def configure_mapillary_settings(**kwargs):
     :param kwargs.use_strict: Whether to use strict mode or not
     :type kwargs.use_strict: bool
 
+    :param kwargs.cache_dir: The directory where persistent caches are stored
+    :type kwargs.cache_dir: str
+
+    :param kwargs.use_negative_cache: Whether to skip tiles known to be empty, and quarantine
+        failing tiles, defaults to True
+    :type kwargs.use_negative_cache: bool
+
+    :param kwargs.negative_cache_ttl: The number of seconds an empty tile is remembered for
+    :type kwargs.negative_cache_ttl: int
+
+    :param kwargs.quarantine_backoff: The number of seconds before a failing tile is retried
+    :type kwargs.quarantine_backoff: int
+
+    :param kwargs.use_tile_cache: Whether to keep the most recently decoded vector tiles in
+        memory, for repeated and overlapping queries. Defaults to True
+    :type kwargs.use_tile_cache: bool
+
+    :param kwargs.tile_cache_size: The maximum number of tiles kept in memory. Defaults to 512
+    :type kwargs.tile_cache_size: int
+
+    :param kwargs.tile_cache_ttl: The number of seconds a tile is kept in memory for. Defaults
+        to 600
+    :type kwargs.tile_cache_ttl: int
+
+    :param kwargs.tile_archives: The MBTiles archives, as downloaded with `download_tiles`,
+        that vector tiles are read from before being requested
+    :type kwargs.tile_archives: list
+
+    :param kwargs.store_path: The SQLite store, as saved with `save_locally`, that entities are
+        read from in offline mode
+    :type kwargs.store_path: str
+
+    :param kwargs.offline: Whether to serve every call from the local stores only, without
+        validating the access token nor making any request. Missing data raises an
+        OfflineError. Defaults to False
+    :type kwargs.offline: bool
+
+    :param kwargs.json_codec: The JSON backend, either 'orjson', 'json' for the standard
+        library, or 'auto' for orjson when it is installed. Defaults to 'auto'
+    :type kwargs.json_codec: str
+
     :return: None
     :rtype: None
     """
 
-    return Config(kwargs)
+    return Config(**kwargs)
 
 
 def set_access_token(token: str):
@@ -107,7 +155,8 @@ def get_image_close_to(latitude=-122.1504711, longitude=37.485073, **kwargs):
     :param kwargs.zoom: The zoom level of the tiles to obtain, defaults to 14
     :type kwargs.zoom: int
 
-    :param kwargs.radius: The radius of the images obtained from a center center
+    :param kwargs.radius: The radius of the images obtained from a center center, in meters.
+        Every tile the circle reaches into is searched, not only the tile containing the center
     :type kwargs.radius: float or int or double
 
     :param kwargs.image_type: The tile image_type to be obtained, either as 'flat', 'pano'
@@ -147,9 +196,94 @@ def get_image_close_to(latitude=-122.1504711, longitude=37.485073, **kwargs):
     )
 
 
+@auth()
+def get_images_close_to(coordinates, **kwargs) -> List[GeoJSON]:
+    """
+    Function that takes many longitude, latitude pairs at once and outputs the near images of
+    each, as `get_image_close_to` does for one. The points are grouped by tile, so that each
+    distinct tile is fetched once, however many points fall in or near it
+
+    :param coordinates: The (longitude, latitude) pairs, as a list of pairs or as a NumPy array
+        of shape (n, 2)
+    :type coordinates: list or numpy.ndarray
+
+    :param kwargs: The filters of `get_image_close_to`, i.e., 'zoom', 'radius', 'image_type',
+        'min_captured_at', 'max_captured_at' and 'organization_id'
+    :type kwargs: dict
+
+    :return: A GeoJSON for each point, in the order of the points
+    :rtype: list
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> mly.interface.get_images_close_to(
+        ...     coordinates=[[12.954940544167, 48.0537894275], [12.955, 48.054]], radius=50
+        ... )
+        ... [<mapillary.models.geojson.GeoJSON object at 0x...>, ...]
+    """
+
+    return image.get_images_close_to_controller(coordinates=coordinates, kwargs=kwargs)
+
+
+@auth()
+def nearest_images(
+    longitude: float,
+    latitude: float,
+    k: int = 10,
+    max_distance: float = 1000,
+    **filters: dict,
+) -> GeoJSON:
+    """
+    Function that finds the k images nearest to a point, sorted by distance. The tiles around
+    the point are searched outwards, and the search stops as soon as no tile left can hold a
+    closer image, so that most lookups only fetch one or two tiles
+
+    :param longitude: The longitude of the point
+    :type longitude: float
+
+    :param latitude: The latitude of the point
+    :type latitude: float
+
+    :param k: The number of images to return. Defaults to 10
+    :type k: int
+
+    :param max_distance: The maximum distance of the images from the point, in meters.
+        Defaults to 1000
+    :type max_distance: float
+
+    :param filters: The filters of `images_in_bbox`, i.e., 'max_captured_at',
+        'min_captured_at', 'image_type', 'compass_angle', 'sequence_id' and 'organization_id'
+    :type filters: dict
+
+    :return: The nearest images, the closest first, with their 'distance' in meters added to
+        their properties
+    :rtype: GeoJSON
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> mly.interface.nearest_images(
+        ...     longitude=12.954940544167, latitude=48.0537894275, k=5, max_distance=200,
+        ...     min_captured_at='2020-01-01', image_type='all'
+        ... )
+    """
+
+    return image.nearest_images_controller(
+        longitude=longitude,
+        latitude=latitude,
+        k=k,
+        max_distance=max_distance,
+        filters=filters,
+    )
+
+
 @auth()
 def get_image_looking_at(
     at: dict,
+    max_distance: float = None,
     **filters: dict,
 ) -> GeoJSON:
     """
@@ -168,6 +302,11 @@ def get_image_looking_at(
 
     :type at: dict
 
+    :param max_distance: The maximum distance of the images from the 'at' location, in meters.
+        Every tile within that distance is searched, not only the tile containing 'at'. Defaults
+        to None, for the radius if given, else the images of the tile containing 'at'
+    :type max_distance: float
+
     :param filters.min_captured_at: The minimum date to filter till
     :type filters.min_captured_at: str
 
@@ -195,7 +334,7 @@ def get_image_looking_at(
         ...             'lng': 12.955075073889,
         ...             'lat': 48.053805939722,
         ...         },
-        ...         radius = 5000,
+        ...         max_distance = 500,
         ...     )
         >>> data
         ... {'type': 'FeatureCollection', 'features': [{'type': 'Feature', 'geometry': {'type':
@@ -207,12 +346,14 @@ def get_image_looking_at(
     return image.get_image_looking_at_controller(
         at=at,
         filters=filters,
+        max_distance=max_distance,
     )
 
 
 @auth()
 def is_image_being_looked_at(
     at: Union[dict, Coordinates, list],
+    max_distance: float = None,
     **filters: dict,
 ) -> bool:
     """
@@ -233,6 +374,11 @@ def is_image_being_looked_at(
 
     :type at: Union[dict, mapillary.models.geojson.Coordinates, list]
 
+    :param max_distance: The maximum distance of the images from the 'at' location, in meters,
+        see `get_image_looking_at`. The closest tiles are fetched first, and the search stops at
+        the first image looking at 'at'
+    :type max_distance: float
+
     :return: True if the image is looked at, False otherwise
     :rtype: bool
 
@@ -257,7 +403,9 @@ def is_image_being_looked_at(
         ... True
     """
 
-    return image.is_image_being_looked_at_controller(at=at, filters=filters)
+    return image.is_image_being_looked_at_controller(
+        at=at, filters=filters, max_distance=max_distance
+    )
 
 
 @auth()
@@ -333,6 +481,120 @@ def get_detections_with_map_feature_id(
     )
 
 
+@auth()
+def get_detections_for_images(
+    image_ids: Iterable,
+    fields: list = [],
+    workers: int = 16,
+    decode: bool = False,
+    normalized: bool = True,
+) -> Iterable:
+    """
+    Extracting the detections of many images at once. The requests run concurrently, and the
+    detections are streamed back as they arrive, keyed by image ID. Unlike
+    `get_detections_with_image_id`, the IDs are not checked to be image IDs first
+
+    :param image_ids: The image IDs, e.g., a list, or a generator reading them from a file
+    :type image_ids: Iterable
+
+    :param fields: The fields possible for the detection endpoint. Please see
+        https://www.mapillary.com/developer/api-documentation for more information
+    :type fields: list
+
+    :param workers: The number of requests made at once. Defaults to 16
+    :type workers: int
+
+    :param decode: If True, the 'pixel_geometry' property of each detection is decoded into a
+        list of NumPy arrays, one per ring, see `mapillary.utils.format.decode_pixel_geometries`.
+        Defaults to False
+    :type decode: bool
+
+    :param normalized: Whether the decoded pixel geometries fall between 0 and 1, or are kept
+        in pixels. Defaults to True
+    :type normalized: bool
+
+    :return: A generator of (image ID, GeoJSON) pairs, in the order the requests complete.
+        The images whose request fails, or whose detections cannot be read, are logged and
+        skipped
+    :rtype: Iterable
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> for image_id, detections in mly.interface.get_detections_for_images(
+        ...     image_ids=['1933525276802129', '1933525276802130'],
+        ...     fields=['value', 'geometry'],
+        ...     decode=True,
+        ... ):
+        ...     print(image_id, len(detections.features))
+    """
+
+    return detection.get_detections_for_ids_controller(
+        ids=image_ids,
+        image=True,
+        fields=fields,
+        workers=workers,
+        decode=decode,
+        normalized=normalized,
+    )
+
+
+@auth()
+def get_detections_for_map_features(
+    map_feature_ids: Iterable,
+    fields: list = [],
+    workers: int = 16,
+    decode: bool = False,
+    normalized: bool = True,
+) -> Iterable:
+    """
+    Extracting the detections of many map features at once, see `get_detections_for_images`
+
+    :param map_feature_ids: The map feature IDs
+    :type map_feature_ids: Iterable
+
+    :param fields: The fields possible for the detection endpoint. Please see
+        https://www.mapillary.com/developer/api-documentation for more information
+    :type fields: list
+
+    :param workers: The number of requests made at once. Defaults to 16
+    :type workers: int
+
+    :param decode: If True, the 'pixel_geometry' property of each detection is decoded into a
+        list of NumPy arrays. Defaults to False
+    :type decode: bool
+
+    :param normalized: Whether the decoded pixel geometries fall between 0 and 1, or are kept
+        in pixels. Defaults to True
+    :type normalized: bool
+
+    :return: A generator of (map feature ID, GeoJSON) pairs, in the order the requests
+        complete. The map features whose request fails, or whose detections cannot be read,
+        are logged and skipped
+    :rtype: Iterable
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> detections = dict(
+        ...     mly.interface.get_detections_for_map_features(
+        ...         map_feature_ids=['1933525276802129'], workers=8
+        ...     )
+        ... )
+    """
+
+    return detection.get_detections_for_ids_controller(
+        ids=map_feature_ids,
+        image=False,
+        fields=fields,
+        workers=workers,
+        decode=decode,
+        normalized=normalized,
+    )
+
+
 @auth()
 def image_thumbnail(image_id: str, resolution: int = 1024) -> str:
     """
@@ -359,7 +621,13 @@ def image_thumbnail(image_id: str, resolution: int = 1024) -> str:
 
 
 @auth()
-def images_in_bbox(bbox: dict, **filters) -> str:
+def images_in_bbox(
+    bbox: dict,
+    explain: bool = False,
+    limit: int = None,
+    order: str = None,
+    **filters,
+) -> str:
     """
     Gets a complete list of images with custom filter within a BBox
 
@@ -389,6 +657,20 @@ def images_in_bbox(bbox: dict, **filters) -> str:
 
     :type filters: dict
 
+    :param explain: If True, the query is not run, and its plan is returned instead, see
+        `estimate_images_in_bbox`. Defaults to False
+    :type explain: bool
+
+    :param limit: The maximum number of images. The tiles are fetched a few at a time, and
+        the fetching stops as soon as enough images passed the filters. Defaults to None, for
+        every image
+    :type limit: int
+
+    :param order: Either 'center', for the closest images to the center of the bbox first, or
+        'newest', for the most recently captured images first. With 'newest', every tile is
+        still fetched. Defaults to None, for the order of the tiles
+    :type order: str
+
     :return: Output is a GeoJSON string that represents all the within a bbox after passing given
         filters
     :rtype: str
@@ -411,9 +693,64 @@ def images_in_bbox(bbox: dict, **filters) -> str:
         ...     sequence_id='SEQUENCE_ID',
         ...     organization_id='ORG_ID'
         ... )
+        >>> # A preview of the 500 images closest to the center of a large area
+        >>> mly.interface.images_in_bbox(
+        ...     bbox={'west': 12.8, 'south': 47.9, 'east': 13.2, 'north': 48.2},
+        ...     limit=500,
+        ...     order='center',
+        ... )
     """
 
+    if explain:
+        return estimate_images_in_bbox(bbox, **filters)
+
     return image.get_images_in_bbox_controller(
+        bounding_box=bbox,
+        layer="image",
+        zoom=14,
+        filters=filters,
+        limit=limit,
+        order=order,
+    )
+
+
+@auth()
+def estimate_images_in_bbox(bbox: dict, **filters) -> QueryPlan:
+    """
+    Estimates the cost of `images_in_bbox` without running it
+
+    Only the coarse coverage tiles used to prune the empty areas are fetched. The plan lists the
+    tiles that would be fetched, the tile counts per layer and zoom level, the expected number
+    of requests, the cache hits and misses, and the filters that would be applied
+
+    :param bbox: Bounding box coordinates, see `images_in_bbox`
+    :type bbox: dict
+
+    :param filters: Different filters that may be applied to the output, see `images_in_bbox`
+    :type filters: dict
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> plan = mly.interface.estimate_images_in_bbox(
+        ...     bbox={
+        ...         'west': 'BOUNDARY_FROM_WEST',
+        ...         'south': 'BOUNDARY_FROM_SOUTH',
+        ...         'east': 'BOUNDARY_FROM_EAST',
+        ...         'north': 'BOUNDARY_FROM_NORTH'
+        ...     },
+        ...     image_type='pano',
+        ... )
+        >>> plan.expected_requests
+        ... 1234
+        >>> plan.to_dict()
+    """
+
+    return image.estimate_images_in_bbox_controller(
         bounding_box=bbox, layer="image", zoom=14, filters=filters
     )
 
@@ -478,7 +815,11 @@ def sequences_in_bbox(bbox: dict, **filters) -> str:
 
 @auth()
 def map_feature_points_in_bbox(
-    bbox: dict, filter_values: list = None, **filters: dict
+    bbox: dict,
+    filter_values: list = None,
+    limit: int = None,
+    order: str = None,
+    **filters: dict,
 ) -> str:
     """
     Extracts map feature points within a bounding box (bbox)
@@ -514,6 +855,16 @@ def map_feature_points_in_bbox(
 
     :type filters: dict
 
+    :param limit: The maximum number of map features. The tiles are fetched a few at a time,
+        and the fetching stops as soon as enough map features passed the filters. Defaults to
+        None, for every map feature
+    :type limit: int
+
+    :param order: Either 'center', for the closest map features to the center of the bbox
+        first, or 'newest', for the most recently first seen map features first. With 'newest',
+        every tile is still fetched. Defaults to None, for the order of the tiles
+    :type order: str
+
     :return: GeoJSON Object
     :rtype: dict
 
@@ -535,13 +886,23 @@ def map_feature_points_in_bbox(
     """
 
     return feature.get_map_features_in_bbox_controller(
-        bbox=bbox, filters=filters, filter_values=filter_values, layer="points"
+        bbox=bbox,
+        filters=filters,
+        filter_values=filter_values,
+        layer="points",
+        limit=limit,
+        order=order,
     )
 
 
 @auth()
 def traffic_signs_in_bbox(
-    bbox: dict, filter_values: list = None, **filters: dict
+    bbox: dict,
+    filter_values: list = None,
+    explain: bool = False,
+    limit: int = None,
+    order: str = None,
+    **filters: dict,
 ) -> str:
     """
     Extracts traffic signs within a bounding box (bbox)
@@ -577,6 +938,20 @@ def traffic_signs_in_bbox(
 
     :type filters: dict
 
+    :param explain: If True, the query is not run, and its plan is returned instead, see
+        `estimate_traffic_signs_in_bbox`. Defaults to False
+    :type explain: bool
+
+    :param limit: The maximum number of map features. The tiles are fetched a few at a time,
+        and the fetching stops as soon as enough map features passed the filters. Defaults to
+        None, for every map feature
+    :type limit: int
+
+    :param order: Either 'center', for the closest map features to the center of the bbox
+        first, or 'newest', for the most recently first seen map features first. With 'newest',
+        every tile is still fetched. Defaults to None, for the order of the tiles
+    :type order: str
+
     :return: GeoJSON Object
     :rtype: dict
 
@@ -600,7 +975,59 @@ def traffic_signs_in_bbox(
         ... )
     """
 
+    if explain:
+        return estimate_traffic_signs_in_bbox(bbox, filter_values=filter_values, **filters)
+
     return feature.get_map_features_in_bbox_controller(
+        bbox=bbox,
+        filters=filters,
+        filter_values=filter_values,
+        layer="traffic_signs",
+        limit=limit,
+        order=order,
+    )
+
+
+@auth()
+def estimate_traffic_signs_in_bbox(
+    bbox: dict, filter_values: list = None, **filters: dict
+) -> QueryPlan:
+    """
+    Estimates the cost of `traffic_signs_in_bbox` without running it
+
+    Only the coarse coverage tiles used to prune the empty areas are fetched. The plan lists the
+    tiles that would be fetched, the tile counts per layer and zoom level, the expected number
+    of requests, the cache hits and misses, and the filters that would be applied
+
+    :param bbox: bbox coordinates as the argument, see `traffic_signs_in_bbox`
+    :type bbox: dict
+
+    :param filter_values: a list of filter values supported by the API
+    :type filter_values: list
+
+    :param filters: Chronological filters, see `traffic_signs_in_bbox`
+    :type filters: dict
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> plan = mly.interface.estimate_traffic_signs_in_bbox(
+        ...    bbox={
+        ...         'west': 'BOUNDARY_FROM_WEST',
+        ...         'south': 'BOUNDARY_FROM_SOUTH',
+        ...         'east': 'BOUNDARY_FROM_EAST',
+        ...         'north': 'BOUNDARY_FROM_NORTH'
+        ...    },
+        ...    existed_at='YYYY-MM-DD HH:MM:SS',
+        ... )
+        >>> print(plan)
+    """
+
+    return feature.estimate_map_features_in_bbox_controller(
         bbox=bbox, filters=filters, filter_values=filter_values, layer="traffic_signs"
     )
 
@@ -655,7 +1082,7 @@ def images_in_geojson(geojson: dict, **filters: dict):
 
 
 @auth()
-def images_in_shape(shape, **filters: dict):
+def images_in_shape(shape, explain: bool = False, **filters: dict):
     """
     Extracts all images within a shape or polygon.
 
@@ -709,6 +1136,10 @@ def images_in_shape(shape, **filters: dict):
     :param filters.organization_id: ID of the organization this image belongs to. It can be absent
     :type filters.organization_id: str
 
+    :param explain: If True, the query is not run, and its plan is returned instead, see
+        `estimate_images_in_shape`. Defaults to False
+    :type explain: bool
+
     :return: A GeoJSON object
     :rtype: mapillary.models.geojson.GeoJSON
 
@@ -721,9 +1152,125 @@ def images_in_shape(shape, **filters: dict):
         >>> open('output_geojson.geojson', mode='w').write(data.encode())
     """
 
+    if explain:
+        return estimate_images_in_shape(shape, **filters)
+
     return image.shape_features_controller(shape=shape, is_image=True, filters=filters)
 
 
+@auth()
+def estimate_images_in_shape(shape, **filters: dict) -> QueryPlan:
+    """
+    Estimates the cost of `images_in_shape` without running it
+
+    Only the coarse coverage tiles used to prune the empty areas are fetched. The plan lists the
+    tiles that would be fetched, the tile counts per layer and zoom level, the expected number
+    of requests, the cache hits and misses, and the filters that would be applied
+
+    :param shape: A shape that describes features, formatted as a geojson, see `images_in_shape`
+    :type shape: dict
+
+    :param filters: Different filters that may be applied to the output, see `images_in_shape`
+    :type filters: dict (kwargs)
+
+    :return: The query plan
+    :rtype: mapillary.models.planner.QueryPlan
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> import json
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> plan = mly.interface.estimate_images_in_shape(
+        ...     json.load(open('polygon.geojson', mode='r'))
+        ... )
+        >>> plan.to_dict()
+    """
+
+    return image.estimate_shape_features_controller(
+        shape=shape, is_image=True, filters=filters
+    )
+
+
+@auth()
+def images_in_regions(regions: list, **filters: dict) -> List[GeoJSON]:
+    """
+    Extracts the images within each of many regions at once, e.g., every municipality of a
+    county. The tiles the regions share are fetched once, rather than once for each region,
+    and the images of each tile are assigned to the regions they lie in
+
+    :param regions: The regions, each either a bbox, as for `images_in_bbox`, a GeoJSON Polygon
+        or MultiPolygon, a Feature or a FeatureCollection of those, as for `images_in_shape`, or
+        a shapely geometry
+    :type regions: list
+
+    :param filters: The filters of `images_in_bbox`, i.e., 'zoom', 'max_captured_at',
+        'min_captured_at', 'image_type', 'compass_angle', 'sequence_id' and 'organization_id'
+    :type filters: dict
+
+    :return: A GeoJSON of the images for each region, in the order of the regions
+    :rtype: list
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> import json
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> municipalities = json.load(open('municipalities.geojson', mode='r'))
+        >>> results = mly.interface.images_in_regions(
+        ...     regions=municipalities['features'], image_type='all'
+        ... )
+        >>> for municipality, data in zip(municipalities['features'], results):
+        ...     print(municipality['properties']['name'], len(data.features))
+    """
+
+    return image.get_images_in_regions_controller(regions=regions, filters=filters)
+
+
+@auth()
+def images_along_route(linestring, buffer_m: float = 50, **filters: dict) -> GeoJSON:
+    """
+    Extracts the images within a corridor along a route, i.e., within buffer_m meters of a
+    LineString, in the order the route passes them. Only the tiles the corridor reaches into
+    are fetched, rather than the tiles of the whole bounding box of the route
+
+    :param linestring: The route, as a GeoJSON LineString, a Feature or a FeatureCollection
+        holding one, or a list of [longitude, latitude] pairs
+    :type linestring: dict or list
+
+    :param buffer_m: The distance from the route to the edges of the corridor, in meters.
+        Defaults to 50
+    :type buffer_m: float
+
+    :param filters: The filters of `images_in_bbox`, i.e., 'zoom', 'max_captured_at',
+        'min_captured_at', 'image_type', 'compass_angle', 'sequence_id' and 'organization_id'
+    :type filters: dict
+
+    :return: The images along the route, with their 'distance' from the route and their
+        'position' along the route, in meters, added to their properties
+    :rtype: mapillary.models.geojson.GeoJSON
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> data = mly.interface.images_along_route(
+        ...     linestring=[[12.9549, 48.0537], [12.9612, 48.0561], [12.9703, 48.0549]],
+        ...     buffer_m=25,
+        ...     image_type='all',
+        ... )
+        >>> open('output_geojson.geojson', mode='w').write(data.encode())
+    """
+
+    if isinstance(linestring, str):
+        if "http" in linestring:
+            linestring = codec.loads(requests.get(linestring).content)
+
+    return image.images_along_route_controller(
+        linestring=linestring, buffer=buffer_m, filters=filters
+    )
+
+
 @auth()
 def map_features_in_geojson(geojson: dict, **filters: dict):
     """
@@ -776,7 +1323,7 @@ def map_features_in_geojson(geojson: dict, **filters: dict):
 
     if isinstance(geojson, str):
         if "http" in geojson:
-            geojson = json.loads(requests.get(geojson).content.decode("utf-8"))
+            geojson = codec.loads(requests.get(geojson).content)
 
     return image.geojson_features_controller(
         geojson=geojson, is_image=False, filters=filters
@@ -855,11 +1402,70 @@ def map_features_in_shape(shape: dict, **filters: dict):
 
     if isinstance(shape, str):
         if "http" in shape:
-            shape = json.loads(requests.get(shape).content.decode("utf-8"))
+            shape = codec.loads(requests.get(shape).content)
 
     return image.shape_features_controller(shape=shape, is_image=False, filters=filters)
 
 
+@auth()
+def map_features_along_route(
+    linestring,
+    buffer_m: float = 50,
+    feature_type: str = "point",
+    filter_values: list = None,
+    **filters: dict,
+) -> GeoJSON:
+    """
+    Extracts the map feature points or the traffic signs within a corridor along a route, in
+    the order the route passes them, see `images_along_route`
+
+    :param linestring: The route, as a GeoJSON LineString, a Feature or a FeatureCollection
+        holding one, or a list of [longitude, latitude] pairs
+    :type linestring: dict or list
+
+    :param buffer_m: The distance from the route to the edges of the corridor, in meters.
+        Defaults to 50
+    :type buffer_m: float
+
+    :param feature_type: Either 'point' or 'traffic_signs'. Defaults to 'point'
+    :type feature_type: str
+
+    :param filter_values: a list of filter values supported by the API, e.g.,
+        ['object--street-light']
+    :type filter_values: list
+
+    :param filters: The chronological filters of `map_feature_points_in_bbox`, i.e.,
+        'existed_at' and 'existed_before'
+    :type filters: dict
+
+    :return: The map features along the route, with their 'distance' from the route and their
+        'position' along the route, in meters, added to their properties
+    :rtype: mapillary.models.geojson.GeoJSON
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> data = mly.interface.map_features_along_route(
+        ...     linestring=[[12.9549, 48.0537], [12.9612, 48.0561], [12.9703, 48.0549]],
+        ...     buffer_m=25,
+        ...     filter_values=['object--street-light'],
+        ... )
+    """
+
+    if isinstance(linestring, str):
+        if "http" in linestring:
+            linestring = codec.loads(requests.get(linestring).content)
+
+    return feature.get_map_features_along_route_controller(
+        linestring=linestring,
+        buffer=buffer_m,
+        filter_values=filter_values,
+        filters=filters,
+        feature_type=feature_type,
+    )
+
+
 @auth()
 def feature_from_key(key: str, fields: list = []) -> str:
     """
@@ -967,17 +1573,21 @@ def image_from_key(key: str, fields: list = []) -> str:
 
 @auth()
 def save_locally(
-    geojson_data: str,
+    geojson_data: Union[str, dict, GeoJSON, Iterable],
     file_path: str = os.path.dirname(os.path.realpath(__file__)),
     file_name: str = None,
     extension: str = "geojson",
+    fields: list = None,
+    partition_by: str = None,
+    **options,
 ) -> None:
     """
     This function saves the geojson data locally as a file
     with the given file name, path, and format.
 
-    :param geojson_data: The GeoJSON data to be stored
-    :type geojson_data: str
+    :param geojson_data: The GeoJSON data to be stored, either as a string, a dictionary, a
+        GeoJSON object, or an iterable (e.g., a generator) of GeoJSON features
+    :type geojson_data: Union[str, dict, GeoJSON, Iterable]
 
     :param file_path: The path to save the data to. Defaults to the current directory path
     :type file_path: str
@@ -985,19 +1595,51 @@ def save_locally(
     :param file_name: The name of the file to be saved. Defaults to 'geojson'
     :type file_name: str
 
-    :param extension: The format to save the data as. Defaults to 'geojson'
+    :param extension: The format to save the data as. Defaults to 'geojson'. The text formats
+        are compressed as they are written when the extension ends with '.gz' or '.zst', e.g.,
+        'geojson.gz', 'csv.zst'
     :type extension: str
 
+    :param fields: The property columns to write for the CSV and Parquet formats, the other
+        formats raising an InvalidOptionError when given fields. Defaults to all the properties
+        found in the data
+    :type fields: list
+
+    :param partition_by: Either 'quadkey' or 'month' to save the data as a partitioned dataset,
+        in the directory `file_name`, rather than as a single file. The features are split into
+        Hive-style directories, e.g., 'quadkey=0313102/' or 'captured_month=2021-03/', whose
+        part files are written concurrently, and listed with their number of features and
+        bounds in a '_manifest.json' file. The partitioning takes the options 'zoom', the zoom
+        level of the quadkeys (defaults to 8), 'workers', the number of part files written at
+        once (defaults to 4), 'part_size', the maximum number of features per part file
+        (defaults to 100000), and 'buffer_size', the maximum number of features held across
+        the partitions before the largest is written (defaults to 200000). Defaults to None
+    :type partition_by: str
+
+    :param options: Options specific to the format. For 'parquet', 'row_group_size' (defaults
+        to 100000) and 'compression' (defaults to 'zstd'). For 'geojsonl', 'append' (defaults to
+        False) to add the features to an existing file. For 'sqlite', 'layer' (defaults to
+        'image') to name the layer the features are stored as. For 'geojson', 'csv' and
+        'geojsonl', 'compression', either 'gzip' or 'zstd' (requires zstandard,
+        `pip install "mapillary[zstd]"`), to compress the file as it is written. For 'geojson',
+        'indent' (defaults to 4), or None to write it compactly. For 'geojson' and 'geojsonl',
+        'precision', the number of decimals the coordinates are rounded to (defaults to None,
+        keeping every decimal)
+    :type options: dict
+
     Note::
 
         Allowed file format values at the moment are,
             - geojson
             - CSV
+            - parquet, as GeoParquet. Requires pyarrow, `pip install "mapillary[parquet]"`
+            - geojsonl, as newline-delimited GeoJSON (GeoJSONSeq), one feature per line
+            - sqlite, as a local store updated by feature ID, see `query_local_store`
 
     *TODO*: More file format will be supported further in developemtn
     *TODO*: Suggestions and help needed at mapillary/mapillary-python-sdk!
 
-    :return: None
+    :return: None, or the manifest of a partitioned dataset
     :rtype: None
 
     Usage::
@@ -1016,23 +1658,224 @@ def save_locally(
         ...     file_name='local_geometries',
         ...     extension='csv'
         ... )
+        >>> mly.interface.save_locally(
+        ...     geojson_data=geojson_data,
+        ...     file_path=os.path.dirname(os.path.realpath(__file__)),
+        ...     file_name='local_images',
+        ...     extension='parquet',
+        ...     row_group_size=50000,
+        ...     compression='snappy'
+        ... )
+        >>> mly.interface.save_locally(
+        ...     geojson_data=feature_generator,
+        ...     file_path=os.path.dirname(os.path.realpath(__file__)),
+        ...     file_name='crawl',
+        ...     extension='geojsonl',
+        ...     append=True
+        ... )
+        >>> mly.interface.save_locally(
+        ...     geojson_data=geojson_data,
+        ...     file_path=os.path.dirname(os.path.realpath(__file__)),
+        ...     file_name='local_store',
+        ...     extension='sqlite',
+        ...     layer='image'
+        ... )
+        >>> mly.interface.save_locally(
+        ...     geojson_data=geojson_data,
+        ...     file_path=os.path.dirname(os.path.realpath(__file__)),
+        ...     file_name='traffic_signs',
+        ...     extension='geojsonl.gz'
+        ... )
+        >>> mly.interface.save_locally(
+        ...     geojson_data=geojson_data,
+        ...     file_path=os.path.dirname(os.path.realpath(__file__)),
+        ...     file_name='images_by_month',
+        ...     extension='parquet',
+        ...     partition_by='month'
+        ... )
     """
 
+    # The controllers of the supported file formats
+    controllers = {
+        "geojson": save.save_as_geojson_controller,
+        "csv": save.save_as_csv_controller,
+        "parquet": save.save_as_parquet_controller,
+        "geojsonl": save.save_as_geojsonl_controller,
+        "sqlite": save.save_to_store_controller,
+    }
+
+    # The formats written as a text stream, which can be compressed as they are written
+    text_formats = ["geojson", "csv", "geojsonl"]
+
+    # The compression may be given through the extension, e.g., 'geojson.gz'
+    extension = extension.lower()
+    for suffix, compression in [
+        (".gz", "gzip"),
+        (".gzip", "gzip"),
+        (".zst", "zstd"),
+        (".zstd", "zstd"),
+    ]:
+        if extension.endswith(suffix) and extension[: -len(suffix)] in text_formats:
+            extension = extension[: -len(suffix)]
+            options["compression"] = compression
+            break
+
     # Check if a valid file format was provided
-    if extension.lower() not in ["geojson", "csv"]:
+    if extension not in controllers:
         # If not, raise an error
         raise InvalidOptionError(
             param="format",
             value=extension,
-            options=["geojson", "csv"],
+            options=list(controllers.keys()),
         )
 
-    return (
-        save.save_as_geojson_controller(
-            data=geojson_data, path=file_path, file_name=file_name
-        )
-        if extension.lower() == "geojson"
-        else save.save_as_csv_controller(
-            data=geojson_data, path=file_path, file_name=file_name
+    # Only the tabular formats take a list of columns
+    if fields is not None:
+        if extension not in ["csv", "parquet"]:
+            raise InvalidOptionError(
+                param="extension", value=extension, options=["csv", "parquet"]
+            )
+
+        options["fields"] = fields
+
+    # A partitioned dataset is written as part files of the format
+    if partition_by is not None:
+        return save.save_partitioned_controller(
+            data=geojson_data,
+            path=file_path,
+            file_name=file_name,
+            extension=extension,
+            partition_by=partition_by,
+            **options,
         )
+
+    return controllers[extension](
+        data=geojson_data, path=file_path, file_name=file_name, **options
+    )
+
+
+def query_local_store(
+    store_path: str,
+    layer: str = "image",
+    bbox: dict = None,
+    filter_values: list = None,
+    **filters: dict,
+) -> str:
+    """
+    Extracts the features of a local store, as saved with `save_locally(...,
+    extension='sqlite')`, that pass the given filters. The filters are the same as those of
+    `images_in_bbox`, `sequences_in_bbox` or `map_feature_points_in_bbox`, depending on the
+    layer, and run as indexed queries against the store
+
+    :param store_path: The path of the store
+    :type store_path: str
+
+    :param layer: The layer the features were stored as, either 'image', 'sequence', or a
+        layer of map features, e.g., 'points'. Defaults to 'image'
+    :type layer: str
+
+    :param bbox: A bounding box representation, defaults to the whole store
+    :type bbox: dict
+
+    :param filter_values: The values of the map features to select, for the map feature
+        layers
+    :type filter_values: list
+
+    :param filters: The filters of the layer, e.g., max_captured_at, min_captured_at,
+        image_type, compass_angle, organization_id, sequence_id for the images, and
+        existed_at, existed_before for the map features
+    :type filters: dict
+
+    :return: GeoJSON
+    :rtype: str
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.query_local_store(
+        ...     store_path='local_store.sqlite',
+        ...     layer='image',
+        ...     bbox={
+        ...         'west': 'BOUNDARY_FROM_WEST',
+        ...         'south': 'BOUNDARY_FROM_SOUTH',
+        ...         'east': 'BOUNDARY_FROM_EAST',
+        ...         'north': 'BOUNDARY_FROM_NORTH'
+        ...     },
+        ...     min_captured_at='YYYY-MM-DD HH:MM:SS',
+        ...     image_type='pano'
+        ... )
+    """
+
+    return store.query_store_controller(
+        path=store_path,
+        layer=layer,
+        bbox=bbox,
+        filter_values=filter_values,
+        filters=filters,
+    )
+
+
+@auth()
+def download_tiles(
+    bbox: dict,
+    file_path: str,
+    layer: str = "image",
+    zoom: int = 14,
+    workers: int = 8,
+) -> dict:
+    """
+    Downloads every vector tile of a layer covering a bounding box into an MBTiles archive.
+    The download runs in parallel, and can be resumed by calling the function again with the
+    same archive. Once the archive is listed in the `tile_archives` setting, its tiles are read
+    from disk rather than requested
+
+    :param bbox: Bounding box coordinates as the argument
+
+        Example::
+
+            >>> _ = {
+            ...     'west': 'BOUNDARY_FROM_WEST',
+            ...     'south': 'BOUNDARY_FROM_SOUTH',
+            ...     'east': 'BOUNDARY_FROM_EAST',
+            ...     'north': 'BOUNDARY_FROM_NORTH'
+            ... }
+
+    :type bbox: dict
+
+    :param file_path: The path of the MBTiles archive, e.g., 'region.mbtiles'
+    :type file_path: str
+
+    :param layer: Either 'image', 'sequence' or 'overview', which share the same coverage tiles,
+        'computed_image', 'points' or 'traffic_signs'. Defaults to 'image'
+    :type layer: str
+
+    :param zoom: The zoom level of the tiles, defaults to 14
+    :type zoom: int
+
+    :param workers: The number of tiles downloaded at once, defaults to 8
+    :type workers: int
+
+    :return: The number of tiles 'downloaded', 'skipped' as already in the archive, and
+        'failed', which are retried by the next call
+    :rtype: dict
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> mly.interface.set_access_token('MLY|XXX')
+        >>> mly.interface.download_tiles(
+        ...     bbox={
+        ...         'west': 'BOUNDARY_FROM_WEST',
+        ...         'south': 'BOUNDARY_FROM_SOUTH',
+        ...         'east': 'BOUNDARY_FROM_EAST',
+        ...         'north': 'BOUNDARY_FROM_NORTH'
+        ...     },
+        ...     file_path='region.mbtiles',
+        ...     layer='image'
+        ... )
+        >>> mly.interface.configure_mapillary_settings(tile_archives=['region.mbtiles'])
+    """
+
+    return store.download_tiles_controller(
+        bbox=bbox, path=file_path, layer=layer, zoom=zoom, workers=workers
     )
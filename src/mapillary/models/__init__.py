@@ -17,3 +17,5 @@ from . import geojson  # noqa: F401
 from . import api  # noqa: F401
 from . import logger  # noqa: F401
 from . import config # noqa: F401
+from . import cache  # noqa: F401
+from . import store  # noqa: F401
@@ -14,20 +14,22 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 """
 
 # Package Imports
+import os
 import typing
-import json
-import ast
 
 # Local imports
 
 # # Utilities
+from mapillary.utils import codec
 from mapillary.utils.format import detection_features_to_geojson
 
 # # Models
 from mapillary.models.client import Client
+from mapillary.models.config import Config
+from mapillary.models.store import LocalStore
 
 # # Exception Handling
-from mapillary.models.exceptions import InvalidImageKeyError
+from mapillary.models.exceptions import InvalidImageKeyError, OfflineError
 
 # # Config
 from mapillary.config.api.entities import Entities
@@ -45,7 +47,7 @@ class EntityAdapter(object):
     It performs parsing, handling of layers, properties, and fields to make it easier to
     write higher level logic for extracing information, and lets developers to focus only
     on writing the high level business logic without having to repeat the process of parsing
-    and using libraries such as `mercantile`, `ast`, and others to only then care about the
+    and using libraries such as `mercantile`, `json`, and others to only then care about the
     inputs and the outputs
 
     Usage::
@@ -82,29 +84,28 @@ class EntityAdapter(object):
         :rtype: dict
         """
 
+        # In offline mode, the image is read from the local store
+        if Config.offline:
+            return self.__fetch_local(identity=image_id, fields=fields, image=True)
+
         # Getting the results through the client, and return after decoding
         try:
-            return (
-                # Converts the dict to a GeoJSON format
-                # image_entity_to_geojson(
-                # ast converts the str dict to a dict object
-                ast.literal_eval(
-                    # The results returned here are the str dicts
-                    self.client.get(
-                        # Calling the endpoint with the parameters ...
-                        Entities.get_image(
-                            # ... image_id, for the needed image ...
-                            image_id=image_id,
-                            # ... the fields passed in in ...
-                            fields=fields
-                            # ... only if the fields are not empty ...
-                            if fields != []
-                            # ... if they are, get all the fields as a list instead
-                            else Entities.get_image_fields(),
-                        ),
-                        # After retrieval of response, only get the content, decode to utf-8
-                    ).content.decode("utf-8")
-                )
+            # The JSON response is decoded from its bytes, without an intermediate string
+            return codec.loads(
+                self.client.get(
+                    # Calling the endpoint with the parameters ...
+                    Entities.get_image(
+                        # ... image_id, for the needed image ...
+                        image_id=image_id,
+                        # ... the fields passed in in ...
+                        fields=fields
+                        # ... only if the fields are not empty ...
+                        if fields != []
+                        # ... if they are, get all the fields as a list instead
+                        else Entities.get_image_fields(),
+                    ),
+                    # After retrieval of response, only get the content
+                ).content
             )
         except HTTPError:
             # If given ID is an invalid image ID, let the user know
@@ -126,8 +127,12 @@ class EntityAdapter(object):
         :rtype: dict
         """
 
+        # In offline mode, the map feature is read from the local store
+        if Config.offline:
+            return self.__fetch_local(identity=map_feature_id, fields=fields, image=False)
+
         # Getting the results through the client, and return after decoding
-        return ast.literal_eval(
+        return codec.loads(
             self.client.get(
                 # Calling the endpoint with the parameters ...
                 Entities.get_map_feature(
@@ -140,10 +145,72 @@ class EntityAdapter(object):
                     # ... if they are, get all the fields as a list instead
                     else Entities.get_map_feature_fields(),
                 ),
-                # After retrieval of response, only get the content, decode to utf-8
-            ).content.decode("utf-8")
+                # After retrieval of response, only get the content
+            ).content
         )
 
+    @staticmethod
+    def __fetch_local(
+        identity: typing.Union[int, str], fields: list, image: bool
+    ) -> dict:
+        """
+        Reads an entity from the SQLite store of `Config.store_path`, in offline mode
+
+        :param identity: The ID of the image or map feature
+        :type identity: typing.Union[int, str]
+
+        :param fields: The fields to read, defaults to all the stored ones
+        :type fields: list
+
+        :param image: Whether the entity is expected to be an image, or else a map feature
+        :type image: bool
+
+        :raises InvalidImageKeyError: Raised when an image is expected, but the ID is not one
+        :raises OfflineError: Raised when the entity, or one of its fields, is not stored
+
+        :return: The entity, as returned by the API
+        :rtype: dict
+        """
+
+        kind = "image" if image else "map feature"
+
+        if Config.store_path is None or not os.path.isfile(Config.store_path):
+            raise OfflineError(f"{kind} {identity}, no store_path is configured")
+
+        with LocalStore(path=Config.store_path) as store:
+            found = store.get(identity)
+
+        if found is None:
+            raise OfflineError(f"{kind} {identity}")
+
+        layer, feature = found
+
+        # Images are stored under the 'image' layer, map features under any other one
+        if image != (layer == "image"):
+            if image:
+                raise InvalidImageKeyError(identity)
+
+            raise OfflineError(f"{kind} {identity}, stored as {layer}")
+
+        properties = feature.get("properties") or {}
+        entity = {"id": str(identity)}
+
+        # Without fields, every stored field is returned
+        for field in fields or ["geometry", *properties]:
+            if field == "id":
+                continue
+
+            if field == "geometry":
+                entity["geometry"] = feature["geometry"]
+
+            elif field in properties:
+                entity[field] = properties[field]
+
+            else:
+                raise OfflineError(f"the field {field} of {kind} {identity}")
+
+        return entity
+
     def fetch_detections(self, identity: int, id_type: bool = True, fields: list = []):
         """
         Fetches detections depending on the id, detections for either map_features or
@@ -193,9 +260,9 @@ class EntityAdapter(object):
                 else Entities.get_detection_with_map_feature_id_fields(),
             )
 
-        # Retrieve the relevant data with `url`, get content, decode to utf-8, return
+        # Retrieve the relevant data with `url`, decode the content, return
         return detection_features_to_geojson(
-            json.loads(self.client.get(url).content.decode("utf-8"))["data"]
+            codec.loads(self.client.get(url).content)["data"]
         )
 
     def is_image_id(self, identity: int, fields: list = None) -> bool:
@@ -16,12 +16,12 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 # Package imports
 import mercantile
 import typing
-from vt2geojson.tools import vt_bytes_to_geojson
 
 # Local imports
 
 # # Models
 from mapillary.models.client import Client
+from mapillary.models.api.vector_tiles import VectorTilesAdapter
 
 # # Exception Handling
 from mapillary.models.exceptions import InvalidOptionError, LiteralEnforcementException
@@ -66,6 +66,9 @@ class GeneralAdapter(object):
         # client object to deal with session and requests
         self.client = Client()
 
+        # vector tiles adapter, through which the tiles are fetched and decoded
+        self.vector_tiles = VectorTilesAdapter()
+
         # Setting the max zoom value
         self.__min_zoom = 0
 
@@ -240,21 +243,17 @@ class GeneralAdapter(object):
                 lng=longitude, lat=latitude, zoom=zoom
             )
 
-            return vt_bytes_to_geojson(
+            return self.vector_tiles.fetch_tile(
                 # Parameters appropriately
-                b_content=self.client.get(
-                    self.__preprocess_api_string(
-                        # Turn coordinates into a tile
-                        tile=mercantile.tile(lng=longitude, lat=latitude, zoom=zoom),
-                        # the layer to retrieve from
-                        layer=feature_type,
-                        # is the layer computed
-                        is_computed=is_computed,
-                    )
-                ).content,
-                x=tile.x,
-                y=tile.y,
-                z=tile.z,
+                url=self.__preprocess_api_string(
+                    # Turn coordinates into a tile
+                    tile=tile,
+                    # the layer to retrieve from
+                    layer=feature_type,
+                    # is the layer computed
+                    is_computed=is_computed,
+                ),
+                tile=tile,
                 layer=layer,
             )
         except HTTPError as e:
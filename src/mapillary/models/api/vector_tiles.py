@@ -16,8 +16,14 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 """
 
 # Package imports
+import logging
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
 from vt2geojson.tools import vt_bytes_to_geojson
+from google.protobuf.message import DecodeError
 import mercantile
+import requests
 
 # Local imports
 # # Config
@@ -26,11 +32,46 @@ from mapillary.config.api.vector_tiles import VectorTiles
 # # Client import
 from mapillary.models.client import Client
 
+# # Caches
+from mapillary.models.cache import NegativeTileCache, TileCache
+from mapillary.models.config import Config
+from mapillary.models.logger import Logger
+from mapillary.models.mbtiles import MBTilesArchive
+
 # # Exception handling
-from mapillary.models.exceptions import InvalidOptionError
+from mapillary.models.exceptions import (
+    InvalidOptionError,
+    OfflineError,
+    QuarantinedTileError,
+)
 
 # # Models
 from mapillary.models.geojson import GeoJSON
+from mapillary.models.planner import TilePlanner
+
+logger: logging.Logger = Logger.setup_logger(name="mapillary.models.api.vector_tiles")
+
+# The errors raised by vt2geojson, through mapbox_vector_tile and protobuf, on a corrupted tile
+DECODE_ERRORS = (DecodeError, ValueError, IndexError, AssertionError)
+
+
+def describe_failure(error: Exception) -> str:
+    """
+    Describes the failure of a tile by the type of the error, and its status code if any
+
+    The message of the error is left out, as the ones of requests hold the request URL, along
+    with the access token
+
+    :param error: The error raised while fetching or decoding the tile
+    :type error: Exception
+
+    :return: The description, e.g., 'HTTPError 503'
+    :rtype: str
+    """
+
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+
+    return type(error).__name__ + (f" {status_code}" if status_code is not None else "")
 
 
 class VectorTilesAdapter(object):
@@ -237,15 +278,16 @@ class VectorTilesAdapter(object):
             geojson={"type": "FeatureCollection", "features": []}
         )
 
-        # A list of tiles that are either confined within or intersect with the bbox
-        tiles = list(
-            mercantile.tiles(
-                west=coordinates[0],
-                south=coordinates[1],
-                east=coordinates[2],
-                north=coordinates[3],
-                zooms=zoom,
-            )
+        # A list of tiles that are either confined within or intersect with the bbox, leaving
+        # out the quadrants without coverage
+        tiles = TilePlanner(adapter=self).plan(
+            bbox={
+                "west": coordinates[0],
+                "south": coordinates[1],
+                "east": coordinates[2],
+                "north": coordinates[3],
+            },
+            zoom=zoom,
         )
 
         print(
@@ -280,6 +322,8 @@ class VectorTilesAdapter(object):
 
             geojson.append_features(result)
 
+        NegativeTileCache.flush_default()
+
         return geojson
 
     def fetch_map_features(
@@ -312,15 +356,16 @@ class VectorTilesAdapter(object):
             geojson={"type": "FeatureCollection", "features": []}
         )
 
-        # A list of tiles that are either confined within or intersect with the bbox
-        tiles = list(
-            mercantile.tiles(
-                west=coordinates[0],
-                south=coordinates[1],
-                east=coordinates[2],
-                north=coordinates[3],
-                zooms=zoom,
-            )
+        # A list of tiles that are either confined within or intersect with the bbox, leaving
+        # out the quadrants without coverage
+        tiles = TilePlanner(adapter=self).plan(
+            bbox={
+                "west": coordinates[0],
+                "south": coordinates[1],
+                "east": coordinates[2],
+                "north": coordinates[3],
+            },
+            zoom=zoom,
         )
 
         print(
@@ -340,8 +385,195 @@ class VectorTilesAdapter(object):
                 )["features"]
             )
 
+        NegativeTileCache.flush_default()
+
         return geojson
 
+    def fetch_tile(self, url: str, tile: mercantile.Tile, layer: str = None) -> dict:
+        """
+        Fetches a single vector tile and decodes it into a GeoJSON. All the tile requests of the
+        SDK go through this method.
+
+        Tiles found in the MBTiles archives of `Config.tile_archives` are read from disk. Tiles
+        fetched earlier in the session are served from the TileCache, when `Config.use_tile_cache`
+        is set. Otherwise, when `Config.use_negative_cache` is set, tiles known to be empty are not
+        requested, and an empty GeoJSON is returned straight away. Tiles that fail to be fetched
+        or decoded are placed in the quarantine queue of the NegativeTileCache before the error
+        is raised, and are not requested again until they are due for a retry. Until then, a
+        QuarantinedTileError is raised instead, rather than the tile being taken as empty.
+
+        :param url: The tile URL, see `mapillary.config.api.vector_tiles`
+        :type url: str
+
+        :param tile: The tile to fetch
+        :type tile: mercantile.Tile
+
+        :param layer: The layer to decode, or None to decode all the layers
+        :type layer: str
+
+        :raises HTTPError: Raised when the API responds with a client error, e.g., an invalid
+            access token
+        :raises OfflineError: Raised in offline mode when the tile is neither archived nor known
+            to be empty
+        :raises QuarantinedTileError: Raised when the tile failed earlier, and is not yet due for
+            a retry
+
+        :return: A GeoJSON with the features of the tile
+        :rtype: dict
+        """
+
+        empty_geojson = {"type": "FeatureCollection", "features": []}
+
+        # Tiles downloaded into an archive of `Config.tile_archives` are read from disk
+        content = MBTilesArchive.read_configured(url=url)
+
+        if content is not None:
+            return (
+                vt_bytes_to_geojson(
+                    b_content=content, x=tile.x, y=tile.y, z=tile.z, layer=layer
+                )
+                if content
+                else empty_geojson
+            )
+
+        cache = NegativeTileCache.get_default() if Config.use_negative_cache else None
+        key = NegativeTileCache.tile_key(url=url, layer=layer)
+
+        # Tiles decoded earlier in the session are kept in memory
+        decoded = TileCache.get_default() if Config.use_tile_cache else None
+
+        if decoded is not None:
+            geojson = decoded.get(key)
+
+            if geojson is not None:
+                return geojson
+
+        # Skip tiles that are known to be empty, or that are quarantined
+        if cache is not None and cache.should_skip(key):
+            if cache.is_quarantined(key):
+                # The content of a failing tile is unknown, and cannot be assumed empty offline
+                if Config.offline:
+                    raise OfflineError(url)
+
+                # A failing tile is not assumed empty, which would make the results incomplete
+                raise QuarantinedTileError(resource=url, retry_at=cache.retry_at(key))
+
+            return empty_geojson
+
+        try:
+            content = self.client.get(url).content
+
+        except OfflineError:
+            # The tile is neither archived nor known to be empty, which is not a failure
+            raise
+
+        except requests.HTTPError as error:
+            # Client errors, such as an invalid token, are not a problem with the tile
+            if (
+                cache is not None
+                and error.response is not None
+                and error.response.status_code >= 500
+            ):
+                logger.warning(f"Quarantining tile {tile}, {url}, {describe_failure(error)}")
+                cache.record_failure(key, error=describe_failure(error))
+            raise
+
+        except (requests.ConnectionError, requests.Timeout) as error:
+            if cache is not None:
+                logger.warning(f"Quarantining tile {tile}, {url}, {describe_failure(error)}")
+                cache.record_failure(key, error=describe_failure(error))
+            raise
+
+        try:
+            geojson = vt_bytes_to_geojson(
+                b_content=content, x=tile.x, y=tile.y, z=tile.z, layer=layer
+            )
+
+        except DECODE_ERRORS as error:
+            # A corrupted tile body, anything else is a bug
+            if cache is not None:
+                logger.warning(
+                    f"Quarantining undecodable tile {tile}, {url}, {describe_failure(error)}"
+                )
+                cache.record_failure(key, error=describe_failure(error))
+            raise
+
+        if cache is not None:
+            if geojson["features"]:
+                # A tile that came back successfully leaves the quarantine queue
+                if cache.is_quarantined(key):
+                    cache.clear(key)
+            else:
+                cache.record_empty(key)
+
+        if decoded is not None:
+            decoded.put(key, geojson)
+
+        return geojson
+
+    def fetch_tiles(
+        self,
+        urls: typing.Dict[mercantile.Tile, str],
+        layer: str = None,
+        workers: int = 8,
+    ) -> typing.Dict[mercantile.Tile, dict]:
+        """
+        Fetches several vector tiles concurrently, see `fetch_tile`
+
+        :param urls: The URL of each tile to fetch
+        :type urls: typing.Dict[mercantile.Tile, str]
+
+        :param layer: The layer to decode, or None to decode all the layers
+        :type layer: str
+
+        :param workers: The number of tiles fetched at once, defaults to 8
+        :type workers: int
+
+        :return: The GeoJSON of each tile, in the order of the given tiles
+        :rtype: typing.Dict[mercantile.Tile, dict]
+        """
+
+        # A single tile is not worth a thread pool
+        if len(urls) <= 1 or workers <= 1:
+            return {
+                tile: self.fetch_tile(url=url, tile=tile, layer=layer)
+                for tile, url in urls.items()
+            }
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+            futures = {
+                tile: executor.submit(self.fetch_tile, url=url, tile=tile, layer=layer)
+                for tile, url in urls.items()
+            }
+
+            return {tile: future.result() for tile, future in futures.items()}
+
+    def is_tile_cached(self, url: str, layer: str = None) -> bool:
+        """
+        Whether a tile would be served locally by `fetch_tile`, without making a request
+
+        :param url: The tile URL, see `mapillary.config.api.vector_tiles`
+        :type url: str
+
+        :param layer: The layer to decode, or None to decode all the layers
+        :type layer: str
+
+        :return: True if fetching the tile makes no request, else False
+        :rtype: bool
+        """
+
+        if MBTilesArchive.read_configured(url=url) is not None:
+            return True
+
+        key = NegativeTileCache.tile_key(url=url, layer=layer)
+
+        if Config.use_tile_cache and TileCache.get_default().get(key) is not None:
+            return True
+
+        return Config.use_negative_cache and NegativeTileCache.get_default().should_skip(
+            key
+        )
+
     @staticmethod
     def __check_parameters(
         longitude: float,
@@ -484,15 +716,8 @@ class VectorTilesAdapter(object):
 
         # No 'else' for InvalidOptionError, as checking done previously in __zoom_range_check
 
-        # Convert bytes to GeoJSON
-        return vt_bytes_to_geojson(
-            # Parameters, appropriately
-            b_content=self.client.get(url).content,
-            x=tile.x,
-            y=tile.y,
-            z=tile.z,
-            layer=layer,
-        )
+        # Fetch and convert bytes to GeoJSON
+        return self.fetch_tile(url=url, tile=tile, layer=layer)
 
     def __preprocess_computed_layer(self, layer: str, tile: mercantile.Tile, zoom: int):
         """
@@ -530,15 +755,8 @@ class VectorTilesAdapter(object):
 
         # No 'else' for InvalidOptionError, as checking done previously in __zoom_range_check
 
-        # Convert bytes to geojson
-        return vt_bytes_to_geojson(
-            # Parameters appropriately
-            b_content=self.client.get(url).content,
-            x=tile.x,
-            y=tile.y,
-            z=tile.z,
-            layer=layer,
-        )
+        # Fetch and convert bytes to geojson
+        return self.fetch_tile(url=url, tile=tile, layer=layer)
 
     def __preprocess_features(
         self, feature_type: str, tile: mercantile.Tile, zoom: int
@@ -582,12 +800,5 @@ class VectorTilesAdapter(object):
                 options=["point", "traffic_sign"],
             )
 
-        # Convert bytes to GeoJSON, and return
-        return vt_bytes_to_geojson(
-            # Parameters appropriately
-            b_content=self.client.get(url).content,
-            x=tile.x,
-            y=tile.y,
-            z=tile.z,
-            layer=None,
-        )
+        # Fetch and convert bytes to GeoJSON, and return
+        return self.fetch_tile(url=url, tile=tile, layer=None)
@@ -0,0 +1,612 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.models.cache
+~~~~~~~~~~~~~~~~~~~~~~
+
+This module contains the caches used by the Mapillary Python SDK to avoid repeating requests
+against the Mapillary API v4 that are already known to return nothing useful.
+
+The NegativeTileCache keeps a persistent record of vector tiles that came back empty, and of
+tiles whose requests failed. Known-empty tiles are skipped until their record expires, while
+failing tiles are placed in a quarantine queue and retried with an exponential backoff.
+
+The TileCache keeps the most recently decoded vector tiles in memory for the session, so that
+repeated and overlapping queries do not fetch and decode the same tiles again.
+
+For more information, please check out https://www.mapillary.com/developer/api-documentation/.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import atexit
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+import time
+import typing
+
+# Local imports
+
+# # Models
+from mapillary.models.config import Config
+from mapillary.models.logger import Logger
+
+# # Utils
+from mapillary.utils import codec
+
+logger: logging.Logger = Logger.setup_logger(name="mapillary.models.cache")
+
+# The access tokens of request URLs, e.g., in the messages of requests errors
+ACCESS_TOKEN_PATTERN = re.compile(r"(access_token=)[^&\s'\"]+")
+
+
+def redact_access_tokens(text: str) -> str:
+    """
+    Masks the access tokens found in a text, so that it can be logged or stored
+
+    Usage::
+
+        >>> redact_access_tokens('https://tiles.mapillary.com/?access_token=MLY|XXX&z=14')
+        ... 'https://tiles.mapillary.com/?access_token=REDACTED&z=14'
+
+    :param text: The text to redact
+    :type text: str
+
+    :return: The text, with the access tokens masked
+    :rtype: str
+    """
+
+    return ACCESS_TOKEN_PATTERN.sub(r"\1REDACTED", text)
+
+
+class NegativeTileCache:
+    """
+    A persistent cache of vector tiles that are either empty or failing
+
+    Each entry is keyed by the tile URL and the decoded layer, and is stored along with an expiry
+    timestamp. The cache is saved as a JSON file under `Config.cache_dir`.
+
+    Usage::
+
+        >>> from mapillary.models.cache import NegativeTileCache
+        >>> cache = NegativeTileCache.get_default()
+        >>> key = NegativeTileCache.tile_key(url='TILE_URL', layer='image')
+        >>> cache.record_empty(key)
+        >>> cache.should_skip(key)
+        ... True
+
+    :param path: The path of the JSON file backing the cache
+    :type path: str
+
+    :param ttl: The number of seconds a known-empty tile is skipped for
+    :type ttl: int
+    """
+
+    # The status values an entry can take
+    EMPTY = "empty"
+    FAILED = "failed"
+
+    # The file name of the default cache within `Config.cache_dir`
+    FILE_NAME = "negative_tiles.json"
+
+    # The shared instance returned by `get_default`
+    __default = None
+    __default_lock = threading.Lock()
+
+    def __init__(self, path: str, ttl: int = None) -> None:
+        """
+        Initializing NegativeTileCache constructor
+
+        :param path: The path of the JSON file backing the cache
+        :type path: str
+
+        :param ttl: The number of seconds a known-empty tile is skipped for, defaults to
+            `Config.negative_cache_ttl`
+        :type ttl: int
+        """
+
+        self.path = path
+        self.ttl = ttl if ttl is not None else Config.negative_cache_ttl
+
+        # Guards the entries, as tiles may be fetched from several threads
+        self.__lock = threading.RLock()
+
+        # Whether there are changes not yet written to disk
+        self.__dirty = False
+
+        self.__entries: typing.Dict[str, dict] = self.__load()
+
+    @staticmethod
+    def get_default() -> "NegativeTileCache":
+        """
+        Gets the cache shared by the whole session, stored under `Config.cache_dir`
+
+        :return: The shared NegativeTileCache
+        :rtype: mapillary.models.cache.NegativeTileCache
+        """
+
+        path = os.path.join(Config.cache_dir, NegativeTileCache.FILE_NAME)
+
+        with NegativeTileCache.__default_lock:
+            # Re-create the instance if the cache directory was re-configured
+            if (
+                NegativeTileCache.__default is None
+                or NegativeTileCache.__default.path != path
+            ):
+                if NegativeTileCache.__default is not None:
+                    NegativeTileCache.__default.flush()
+
+                NegativeTileCache.__default = NegativeTileCache(path=path)
+
+        return NegativeTileCache.__default
+
+    @staticmethod
+    def flush_default() -> None:
+        """
+        Writes the shared cache to disk, if it was used during the session
+
+        :return: None
+        :rtype: None
+        """
+
+        if NegativeTileCache.__default is not None:
+            NegativeTileCache.__default.flush()
+
+    @staticmethod
+    def tile_key(url: str, layer: str = None) -> str:
+        """
+        Builds the cache key of a tile
+
+        :param url: The tile URL, without the access token
+        :type url: str
+
+        :param layer: The layer decoded from the tile, if any
+        :type layer: str
+
+        :return: The cache key
+        :rtype: str
+        """
+
+        return f"{layer if layer is not None else '*'}|{url}"
+
+    def should_skip(self, key: str) -> bool:
+        """
+        Whether a tile is known to be empty, or is quarantined and not yet due for a retry
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: True if the tile should not be requested, else False
+        :rtype: bool
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                return False
+
+            if entry["status"] == NegativeTileCache.EMPTY:
+                # Drop the entry once it has expired, so that the tile gets requested again
+                if entry["expires_at"] <= time.time():
+                    del self.__entries[key]
+                    self.__dirty = True
+                    return False
+                return True
+
+            # A failed tile is skipped until its retry time has come
+            return entry["retry_at"] > time.time()
+
+    def is_empty(self, key: str) -> bool:
+        """
+        Whether a tile is currently recorded as empty
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: True if the tile is known to be empty, else False
+        :rtype: bool
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            return (
+                entry is not None
+                and entry["status"] == NegativeTileCache.EMPTY
+                and entry["expires_at"] > time.time()
+            )
+
+    def retry_at(self, key: str) -> typing.Optional[float]:
+        """
+        When a quarantined tile is due for a retry
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: The UNIX timestamp, in seconds, of the retry, or None if the tile is not
+            quarantined
+        :rtype: typing.Optional[float]
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None or entry["status"] != NegativeTileCache.FAILED:
+                return None
+
+            return entry["retry_at"]
+
+    def is_quarantined(self, key: str) -> bool:
+        """
+        Whether a tile is in the quarantine queue
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: True if the tile previously failed and has not succeeded since, else False
+        :rtype: bool
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            return entry is not None and entry["status"] == NegativeTileCache.FAILED
+
+    def record_empty(self, key: str) -> None:
+        """
+        Records a tile as empty until the TTL expires
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.__lock:
+            self.__entries[key] = {
+                "status": NegativeTileCache.EMPTY,
+                "expires_at": time.time() + self.ttl,
+            }
+            self.__dirty = True
+
+    def record_failure(self, key: str, error: str = "") -> None:
+        """
+        Places a tile in the quarantine queue. Every consecutive failure doubles the time until
+        the next retry, starting from `Config.quarantine_backoff`, and capped at the TTL
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :param error: A description of the failure
+        :type error: str
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            attempts = (
+                entry["attempts"] + 1
+                if entry is not None and entry["status"] == NegativeTileCache.FAILED
+                else 1
+            )
+
+            self.__entries[key] = {
+                "status": NegativeTileCache.FAILED,
+                "attempts": attempts,
+                "retry_at": time.time()
+                + min(Config.quarantine_backoff * 2 ** (attempts - 1), self.ttl),
+                # The error is stored on disk, and must not hold an access token
+                "error": redact_access_tokens(str(error)),
+            }
+            self.__dirty = True
+
+    def clear(self, key: str = None) -> None:
+        """
+        Removes a tile from the cache, or every tile if no key is given
+
+        :param key: The tile key, see `tile_key`
+        :type key: str
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.__lock:
+            if key is None:
+                self.__entries = {}
+                self.__dirty = True
+
+            elif self.__entries.pop(key, None) is not None:
+                self.__dirty = True
+
+    def quarantine(self, due_only: bool = False) -> typing.List[str]:
+        """
+        Lists the tiles in the quarantine queue, ordered by their retry time
+
+        :param due_only: Only list the tiles whose retry time has come, defaults to False
+        :type due_only: bool
+
+        :return: A list of tile keys
+        :rtype: list
+        """
+
+        now = time.time()
+
+        with self.__lock:
+            failed = [
+                (entry["retry_at"], key)
+                for key, entry in self.__entries.items()
+                if entry["status"] == NegativeTileCache.FAILED
+                and (not due_only or entry["retry_at"] <= now)
+            ]
+
+        return [key for _, key in sorted(failed)]
+
+    def flush(self) -> None:
+        """
+        Writes the cache to disk, if anything changed since the last write
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.__lock:
+            if not self.__dirty:
+                return
+
+            now = time.time()
+
+            # Expired empty tiles are not worth keeping around
+            entries = {
+                key: entry
+                for key, entry in self.__entries.items()
+                if entry["status"] == NegativeTileCache.FAILED
+                or entry["expires_at"] > now
+            }
+
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+                # Write to a temporary file first, so that an interrupted write does not
+                # corrupt the cache
+                temporary_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temporary_path, "wb") as cache_file:
+                    codec.dump(entries, cache_file)
+                os.replace(temporary_path, self.path)
+
+                self.__entries = entries
+                self.__dirty = False
+
+            except OSError as error:
+                logger.warning(f"Could not write the negative tile cache, {error}")
+
+    def __load(self) -> typing.Dict[str, dict]:
+        """
+        Reads the cache from disk
+
+        :return: The cache entries
+        :rtype: dict
+        """
+
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "rb") as cache_file:
+                entries = codec.loads(cache_file.read())
+
+        except (OSError, ValueError) as error:
+            logger.warning(
+                f"Could not read the negative tile cache at {self.path}, starting empty, "
+                f"{error}"
+            )
+            return {}
+
+        # Caches written by earlier versions may hold access tokens in their errors
+        for entry in entries.values():
+            if "error" in entry and redact_access_tokens(entry["error"]) != entry["error"]:
+                entry["error"] = redact_access_tokens(entry["error"])
+                self.__dirty = True
+
+        return entries
+
+    def __len__(self) -> int:
+        """Return the number of tiles in the cache"""
+
+        with self.__lock:
+            return len(self.__entries)
+
+    def __repr__(self) -> str:
+        """Return the formal string representation of the NegativeTileCache"""
+
+        return (
+            f"NegativeTileCache(path={self.path}, ttl={self.ttl}, entries={len(self)})"
+        )
+
+
+def copy_feature(feature: dict) -> dict:
+    """
+    Copies a GeoJSON feature along with its properties and geometry, sharing the coordinates
+
+    :param feature: The feature to copy
+    :type feature: dict
+
+    :return: The copied feature
+    :rtype: dict
+    """
+
+    copied = dict(feature)
+
+    for member in ("properties", "geometry"):
+        if isinstance(copied.get(member), dict):
+            copied[member] = dict(copied[member])
+
+    return copied
+
+
+class TileCache:
+    """
+    An in-memory cache of the most recently decoded vector tiles
+
+    Entries are keyed as in the NegativeTileCache, and are evicted once they are older than
+    the time to live, or when the cache is full, the least recently used first.
+
+    Usage::
+
+        >>> from mapillary.models.cache import TileCache
+        >>> cache = TileCache.get_default()
+        >>> key = NegativeTileCache.tile_key(url='TILE_URL', layer='image')
+        >>> cache.put(key, {'type': 'FeatureCollection', 'features': []})
+        >>> cache.get(key)
+        ... {'type': 'FeatureCollection', 'features': []}
+
+    :param size: The maximum number of tiles kept
+    :type size: int
+
+    :param ttl: The number of seconds a tile is kept for
+    :type ttl: int
+    """
+
+    # The shared instance returned by `get_default`
+    __default = None
+    __default_lock = threading.Lock()
+
+    def __init__(self, size: int = None, ttl: int = None) -> None:
+        """
+        Initializing TileCache constructor
+
+        :param size: The maximum number of tiles kept, defaults to `Config.tile_cache_size`
+        :type size: int
+
+        :param ttl: The number of seconds a tile is kept for, defaults to
+            `Config.tile_cache_ttl`
+        :type ttl: int
+        """
+
+        self.size = size if size is not None else Config.tile_cache_size
+        self.ttl = ttl if ttl is not None else Config.tile_cache_ttl
+
+        # Guards the entries, as tiles may be fetched from several threads
+        self.__lock = threading.Lock()
+
+        # The decoded tiles with their expiry timestamp, the least recently used first
+        self.__entries: "OrderedDict[str, typing.Tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def get_default() -> "TileCache":
+        """
+        Gets the cache shared by the whole session
+
+        :return: The shared TileCache
+        :rtype: mapillary.models.cache.TileCache
+        """
+
+        with TileCache.__default_lock:
+            # Re-create the instance if the cache was re-configured
+            if (
+                TileCache.__default is None
+                or TileCache.__default.size != Config.tile_cache_size
+                or TileCache.__default.ttl != Config.tile_cache_ttl
+            ):
+                TileCache.__default = TileCache()
+
+        return TileCache.__default
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        """
+        Gets a decoded tile
+
+        The features are copied along with their properties and geometry, so that callers can
+        filter and modify them freely. Only the coordinates are shared, and should not be
+        modified in place
+
+        :param key: The tile key, see `NegativeTileCache.tile_key`
+        :type key: str
+
+        :return: The GeoJSON of the tile, or None if it is not cached
+        :rtype: typing.Optional[dict]
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+            if entry is None:
+                return None
+
+            if entry[0] <= time.time():
+                del self.__entries[key]
+                return None
+
+            self.__entries.move_to_end(key)
+
+        return {
+            **entry[1],
+            "features": [copy_feature(feature) for feature in entry[1]["features"]],
+        }
+
+    def put(self, key: str, geojson: dict) -> None:
+        """
+        Keeps a decoded tile
+
+        :param key: The tile key, see `NegativeTileCache.tile_key`
+        :type key: str
+
+        :param geojson: The GeoJSON of the tile
+        :type geojson: dict
+
+        :return: None
+        :rtype: None
+        """
+
+        if self.size <= 0:
+            return
+
+        with self.__lock:
+            self.__entries[key] = (
+                time.time() + self.ttl,
+                {
+                    **geojson,
+                    "features": [copy_feature(feature) for feature in geojson["features"]],
+                },
+            )
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Empties the cache
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of tiles in the cache"""
+
+        with self.__lock:
+            return len(self.__entries)
+
+    def __repr__(self) -> str:
+        """Return the formal string representation of the TileCache"""
+
+        return f"TileCache(size={self.size}, ttl={self.ttl}, entries={len(self)})"
+
+
+# Write the shared cache to disk when the interpreter exits
+atexit.register(NegativeTileCache.flush_default)
@@ -26,16 +26,21 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 - License: MIT LICENSE
 """
 
-import json
 import logging
 import os
 import sys
+import threading
+import typing
+from concurrent.futures import Future
 from math import floor
 
 import requests
 
+# Config imports
+from mapillary.models.config import Config
+
 # Exception imports
-from mapillary.models.exceptions import InvalidTokenError
+from mapillary.models.exceptions import InvalidTokenError, OfflineError
 
 # Basic logger setup
 logger = logging.getLogger("mapillary.utils.client")
@@ -63,6 +68,11 @@ class Client:
 
     All requests for the Mapillary API v4 should go through this class
 
+    A client can be shared by many threads. Every thread sends its requests through its own
+    session, shared by all the clients of that thread so that connections are pooled, and the
+    authentication is attached to each request rather than to the session. The parameters
+    passed by the caller are never modified
+
     Usage::
 
         >>> client = Client(access_token='MLY|XXX')
@@ -72,16 +82,64 @@ class Client:
         ... })
         >>> # for tiles endpoint
         >>> client.get(endpoint='endpoint specific path', entity=False)
+
+    :param access_token: The access token used by this client, defaults to the token set for the
+        session with `set_token`
+    :type access_token: str
     """
 
     # User Access token will be set once and used throughout all requests
     # within the same session
     __access_token = ""
 
-    def __init__(self) -> None:
+    # Requests currently in flight, shared by all the clients so that concurrent identical
+    # requests are only sent once. See `get`
+    __in_flight: typing.Dict[tuple, Future] = {}
+    __in_flight_lock = threading.Lock()
+
+    # The sessions of each thread, see `session`
+    __local = threading.local()
+
+    def __init__(self, access_token: str = None) -> None:
+        """
+        Initializing Client constructor
+
+        :param access_token: The access token used by this client, defaults to the token set
+            for the session with `set_token`
+        :type access_token: str
+        """
+
+        self.__client_token = access_token
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The session of the calling thread, referenced across future API calls
+
+        requests.Session is not thread safe, so each thread gets its own session, shared by all
+        the clients of that thread
+
+        :return: The session of the calling thread
+        :rtype: requests.Session
+        """
+
+        session = getattr(Client.__local, "session", None)
+
+        if session is None:
+            session = requests.Session()
+            Client.__local.session = session
 
-        # Session object setup to be referenced across future API calls.
-        self.session = requests.Session()
+        return session
+
+    @property
+    def access_token(self) -> str:
+        """The access token of this client, or else the one set for the session"""
+
+        return (
+            self.__client_token
+            if self.__client_token is not None
+            else Client.__access_token
+        )
 
     @staticmethod
     def __check_token_validity(token):
@@ -91,7 +149,10 @@ class Client:
         )
 
         if res.status_code == 401:
-            res_content = json.loads(res.content)
+            # Imported here, as mapillary.utils imports the client itself
+            from mapillary.utils import codec
+
+            res_content = codec.loads(res.content)
             raise InvalidTokenError(
                 res_content["error"]["message"],
                 res_content["error"]["type"],
@@ -112,16 +173,19 @@ class Client:
     @staticmethod
     def set_token(access_token: str) -> None:
         """
-        Sets the access token
+        Sets the access token, validated against the API unless in offline mode
 
         :param access_token: The access token to be set
         """
 
-        Client.__check_token_validity(access_token)
+        if not Config.offline:
+            Client.__check_token_validity(access_token)
 
         Client.__access_token = access_token
 
-    def _initiate_request(self, url: str, method: str, params: dict = None):
+    def _initiate_request(
+        self, url: str, method: str, params: dict = None, headers: dict = None
+    ):
         """
         Private method - For internal use only.
         This method is responsible for making tailored API requests to the mapillary API v4.
@@ -135,9 +199,12 @@ class Client:
 
         :param params: Query parameters to be attached to the request - optional
         :type params: dict
+
+        :param headers: Headers to be attached to the request - optional
+        :type headers: dict
         """
 
-        request = requests.Request(method, url, params=params)
+        request = requests.Request(method, url, params=params, headers=headers)
 
         # create a prepared request with the request and the session info merged
         prepped_req = self.session.prepare_request(request)
@@ -177,14 +244,18 @@ class Client:
 
         return res
 
-    def get(self, url: str = None, params: dict = {}):
+    def get(self, url: str = None, params: dict = None):
         """
         Make GET requests to both mapillary main endpoints
 
+        When `Config.coalesce_requests` is set, concurrent requests for the same URL and
+        parameters share a single request in flight. The threads that join it get the same
+        response, or the same exception, as the thread that sent it
+
         :param url: The specific path of the request URL
         :type url: str
 
-        :param params: Query parameters to be attached to the URL (Dict)
+        :param params: Query parameters to be attached to the URL (Dict), left unmodified
         :type params: dict
         """
         # Check if an endpoint is specified.
@@ -192,15 +263,101 @@ class Client:
             logger.error("You need to specify an endpoint!")
             return
 
+        if not Config.coalesce_requests:
+            return self.__get(url=url, params=params)
+
+        key = Client.__request_key(
+            method="GET", url=url, params=params, access_token=self.access_token
+        )
+
+        with Client.__in_flight_lock:
+            future = Client.__in_flight.get(key)
+            is_leader = future is None
+
+            if is_leader:
+                future = Future()
+                Client.__in_flight[key] = future
+
+        # Another thread is already requesting the same resource, wait for its response
+        if not is_leader:
+            logger.debug(f"Joining the request in flight to {url}")
+            return future.result()
+
+        try:
+            res = self.__get(url=url, params=params)
+            future.set_result(res)
+            return res
+
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+
+        finally:
+            with Client.__in_flight_lock:
+                del Client.__in_flight[key]
+
+    def __get(self, url: str, params: dict):
+        """
+        Sends a GET request, authenticated depending on the requested endpoint
+
+        :param url: The specific path of the request URL
+        :type url: str
+
+        :param params: Query parameters to be attached to the URL (Dict)
+        :type params: dict
+
+        :raises OfflineError: Raised in offline mode, as no request can be made
+        """
+
+        # Nothing is requested in offline mode, the caller should have used a local store
+        if Config.offline:
+            raise OfflineError(url)
+
+        # Read the token once, so that the whole request uses the same one
+        access_token = self.access_token
+
+        # Copy the parameters, rather than adding the token to the caller's dictionary
+        params = dict(params or {})
+        headers = {}
+
         # Determine Authentication method based on the requested endpoint
         if "https://graph.mapillary.com" in url:
-            self.session.headers.update(
-                {"Authorization": f"OAuth {self.__access_token}"}
-            )
+            headers["Authorization"] = f"OAuth {access_token}"
         else:
-            params["access_token"] = params.get("access_token", self.__access_token)
+            params.setdefault("access_token", access_token)
 
-        return self._initiate_request(url=url, method="GET", params=params)
+        return self._initiate_request(
+            url=url, method="GET", params=params, headers=headers
+        )
+
+    @staticmethod
+    def __request_key(method: str, url: str, params: dict, access_token: str) -> tuple:
+        """
+        Builds the key identifying identical requests
+
+        :param method: The HTTP method
+        :type method: str
+
+        :param url: The request URL
+        :type url: str
+
+        :param params: The query parameters
+        :type params: dict
+
+        :param access_token: The access token the request is sent with
+        :type access_token: str
+
+        :return: The request key
+        :rtype: tuple
+        """
+
+        return (
+            method,
+            url,
+            access_token,
+            # Parameter values may be lists, e.g., the fields of an entity
+            tuple(sorted((key, repr(value)) for key, value in (params or {}).items())),
+        )
 
     @staticmethod
     def _pprint_request(prepped_req):
@@ -14,6 +14,9 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 - License: MIT License
 """
 
+import os
+
+from mapillary.models.exceptions import InvalidKwargError
 from mapillary.models.logger import Logger
 
 Logger.setup_logger(name="mapillary.models.config")
@@ -33,6 +36,78 @@ class Config:
     are sent to the functions in config.api calls. If set to False, the SDK will just log a warning.
     :type use_strict: bool
     :default use_strict: True
+
+    :param cache_dir: The directory where the SDK keeps its persistent caches
+    :type cache_dir: str
+    :default cache_dir: $MAPILLARY_CACHE_DIR, or ~/.cache/mapillary
+
+    :param use_negative_cache: If set to True, vector tiles known to be empty are not requested
+    again, and failing tiles are quarantined before being retried
+    :type use_negative_cache: bool
+    :default use_negative_cache: True
+
+    :param negative_cache_ttl: The number of seconds an empty tile is remembered for
+    :type negative_cache_ttl: int
+    :default negative_cache_ttl: 604800 (7 days)
+
+    :param quarantine_backoff: The number of seconds before a failing tile is first retried. The
+    delay doubles with every consecutive failure
+    :type quarantine_backoff: int
+    :default quarantine_backoff: 60
+
+    :param use_tile_pruning: If set to True, large bounding boxes are planned by checking the
+    coverage at coarser zoom levels first, and only fetching the covered tiles
+    :type use_tile_pruning: bool
+    :default use_tile_pruning: True
+
+    :param pruning_threshold: The number of tiles at the target zoom level under which a bounding
+    box is fetched without planning
+    :type pruning_threshold: int
+    :default pruning_threshold: 64
+
+    :param pruning_zooms: The coarse zoom levels the coverage is checked at. Zoom levels up to 5
+    use the 'overview' layer, the others the 'sequence' layer
+    :type pruning_zooms: tuple
+    :default pruning_zooms: (5, 8, 11)
+
+    :param use_tile_cache: If set to True, the most recently decoded vector tiles are kept in
+    memory, so that repeated and overlapping queries do not fetch them again
+    :type use_tile_cache: bool
+    :default use_tile_cache: True
+
+    :param tile_cache_size: The maximum number of decoded vector tiles kept in memory
+    :type tile_cache_size: int
+    :default tile_cache_size: 512
+
+    :param tile_cache_ttl: The number of seconds a decoded vector tile is kept in memory for
+    :type tile_cache_ttl: int
+    :default tile_cache_ttl: 600 (10 minutes)
+
+    :param coalesce_requests: If set to True, concurrent identical requests share a single
+    request in flight, see mapillary.models.client.Client.get
+    :type coalesce_requests: bool
+    :default coalesce_requests: True
+
+    :param tile_archives: The paths of MBTiles archives, as downloaded with
+    mapillary.interface.download_tiles, that vector tiles are read from before being requested
+    :type tile_archives: list
+    :default tile_archives: []
+
+    :param store_path: The path of a SQLite store, as saved with mapillary.interface.save_locally,
+    that entities are read from in offline mode
+    :type store_path: str
+    :default store_path: None
+
+    :param offline: If set to True, no request is made. The access token is not validated,
+    vector tiles are only read from `tile_archives` and the negative tile cache, entities from
+    `store_path`, and anything else raises an OfflineError
+    :type offline: bool
+    :default offline: $MAPILLARY_OFFLINE == "1", or False
+
+    :param json_codec: The JSON backend, either 'orjson', 'json' for the standard library, or
+    'auto' for orjson when it is installed, see mapillary.utils.codec
+    :type json_codec: str
+    :default json_codec: 'auto'
     """
 
     # Strict mode will raise exceptions when,
@@ -42,9 +117,62 @@ class Config:
 
     use_strict = True
 
-    def __init__(self, use_strict: bool = True) -> None:
+    # Persistent caches are stored in this directory
+    cache_dir = os.environ.get(
+        "MAPILLARY_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "mapillary"),
+    )
+
+    # Negative tile cache, see mapillary.models.cache.NegativeTileCache
+    use_negative_cache = True
+    negative_cache_ttl = 7 * 24 * 60 * 60
+    quarantine_backoff = 60
+
+    # Coverage pruning, see mapillary.models.planner.TilePlanner
+    use_tile_pruning = True
+    pruning_threshold = 64
+    pruning_zooms = (5, 8, 11)
+
+    # In-memory tile cache, see mapillary.models.cache.TileCache
+    use_tile_cache = True
+    tile_cache_size = 512
+    tile_cache_ttl = 10 * 60
+
+    # Single-flight requests, see mapillary.models.client.Client
+    coalesce_requests = True
+
+    # Offline tile archives, see mapillary.models.mbtiles.MBTilesArchive
+    tile_archives = []
+
+    # Offline mode, only the local stores are used
+    store_path = None
+    offline = os.environ.get("MAPILLARY_OFFLINE") == "1"
+
+    # JSON backend, see mapillary.utils.codec
+    json_codec = "auto"
+
+    def __init__(self, use_strict: bool = None, **kwargs) -> None:
         """
         Initialize the Config class
+
+        The settings are applied to the class itself, so that they hold for the whole session.
+        Only the settings that are given change, the others keep their current value
         """
 
-        self.use_strict = use_strict
+        if use_strict is not None:
+            Config.use_strict = use_strict
+
+        # Only settings that already exist may be configured
+        options = [
+            key
+            for key, value in vars(Config).items()
+            if not key.startswith("_") and not callable(value)
+        ]
+
+        for key, value in kwargs.items():
+            if key not in options:
+                raise InvalidKwargError(
+                    func="Config", key=key, value=value, options=options
+                )
+
+            setattr(Config, key, value)
@@ -14,6 +14,7 @@ For more information, please check out https://www.mapillary.com/developer/api-d
 """
 
 # Package imports
+import datetime
 import typing
 
 
@@ -387,3 +388,105 @@ class InvalidNumberOfArguments(MapillaryException):
             f"InvalidNumberOfArguments(number_of_params_passed={self.number_of_params_passed},"
             f"actual_allowed_params={self.actual_allowed_params}, param={self.param})"
         )
+
+
+class MissingDependencyError(MapillaryException):
+    """
+    Raised when a feature needs an optional dependency that is not installed
+
+    :var package: The name of the missing package
+    :type package: str
+
+    :var extra: The name of the extra of the SDK that installs the package
+    :type extra: str
+    """
+
+    def __init__(self, package: str, extra: str) -> None:
+        """
+        Initializing MissingDependencyError constructor
+
+        :param package: The name of the missing package
+        :type package: str
+
+        :param extra: The name of the extra of the SDK that installs the package
+        :type extra: str
+        """
+
+        self.package = package
+        self.extra = extra
+
+    def __str__(self):
+        return (
+            f'MissingDependencyError: The optional package, "{self.package}" is not installed. '
+            f'Install it with, pip install "mapillary[{self.extra}]"'
+        )
+
+    def __repr__(self):
+        return f"MissingDependencyError(package={self.package}, extra={self.extra})"
+
+
+class OfflineError(MapillaryException):
+    """
+    Raised in offline mode when a resource is not available from the local stores, i.e., the
+    MBTiles archives, the negative tile cache, and the SQLite store
+
+    :var resource: The resource that would have been requested
+    :type resource: str
+    """
+
+    def __init__(self, resource: str) -> None:
+        """
+        Initializing OfflineError constructor
+
+        :param resource: The resource that would have been requested
+        :type resource: str
+        """
+
+        self.resource = resource
+
+    def __str__(self):
+        return (
+            f'OfflineError: Offline mode is on, and "{self.resource}" is not available locally. '
+            "Download it beforehand, or turn offline mode off with "
+            "configure_mapillary_settings(offline=False)"
+        )
+
+    def __repr__(self):
+        return f"OfflineError(resource={self.resource})"
+
+
+class QuarantinedTileError(MapillaryException):
+    """
+    Raised when a vector tile failed to be fetched or decoded, and is in the quarantine queue of
+    the negative tile cache until it is due for a retry
+
+    :var resource: The URL of the tile
+    :type resource: str
+
+    :var retry_at: The UNIX timestamp, in seconds, from which the tile is requested again
+    :type retry_at: float
+    """
+
+    def __init__(self, resource: str, retry_at: float) -> None:
+        """
+        Initializing QuarantinedTileError constructor
+
+        :param resource: The URL of the tile
+        :type resource: str
+
+        :param retry_at: The UNIX timestamp, in seconds, from which the tile is requested again
+        :type retry_at: float
+        """
+
+        self.resource = resource
+        self.retry_at = retry_at
+
+    def __str__(self):
+        return (
+            f'QuarantinedTileError: The tile "{self.resource}" failed earlier, and is not '
+            f"requested again before {datetime.datetime.fromtimestamp(self.retry_at)}. Retry "
+            "then, or clear it with NegativeTileCache.get_default().clear()"
+        )
+
+    def __repr__(self):
+        return f"QuarantinedTileError(resource={self.resource}, retry_at={self.retry_at})"
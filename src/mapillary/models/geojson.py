@@ -14,9 +14,6 @@ https://www.mapillary.com/developer/api-documentation/.
 - License: MIT LICENSE
 """
 
-# Package
-import json
-
 # Local
 
 # # Exceptions
@@ -435,14 +432,21 @@ class GeoJSON:
             # Append it
             self.features.append(feature)
 
-    def encode(self) -> str:
+    def encode(self, precision: int = None) -> str:
         """
         Serializes the GeoJSON object
 
+        :param precision: The number of decimals the coordinates are rounded to. Defaults to
+            None, keeping every decimal
+        :type precision: int
+
         :return: Serialized GeoJSON
         """
 
-        return json.dumps(self.__dict__)
+        # Imported here, as mapillary.utils imports the GeoJSON models
+        from mapillary.utils import codec
+
+        return codec.dumps(self.to_dict(), precision=precision).decode("utf-8")
 
     def to_dict(self):
         """Return the dict format representation of the GeoJSON"""
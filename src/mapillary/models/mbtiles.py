@@ -0,0 +1,440 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.models.mbtiles
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module contains the MBTilesArchive, an offline archive of Mapillary vector tiles.
+
+A region is downloaded once, in parallel, into an MBTiles file. The download can be resumed,
+with the tiles already in the archive left out. Archives listed in `Config.tile_archives` are
+then read by `mapillary.models.api.vector_tiles.VectorTilesAdapter.fetch_tile` instead of
+requesting https://tiles.mapillary.com.
+
+For more information, please check out https://github.com/mapbox/mbtiles-spec.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import gzip
+import itertools
+import logging
+import os
+import re
+import sqlite3
+import threading
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mercantile
+import requests
+
+# Local imports
+
+# # Models
+from mapillary.models.client import Client
+from mapillary.models.config import Config
+from mapillary.models.logger import Logger
+
+logger: logging.Logger = Logger.setup_logger(name="mapillary.models.mbtiles")
+
+
+class MBTilesArchive:
+    """
+    An MBTiles archive of the vector tiles of a single Mapillary tileset
+
+    The tiles are stored gzip compressed, as the MBTiles specification requires for vector
+    tiles, with their rows in the TMS scheme. Tiles that came back empty are stored with empty
+    data, so that they can be told apart from the tiles that were never downloaded.
+
+    Usage::
+
+        >>> from mapillary.models.mbtiles import MBTilesArchive
+        >>> with MBTilesArchive(path='region.mbtiles') as archive:
+        ...     archive.download(urls={tile: VectorTiles.get_image_layer(
+        ...         x=tile.x, y=tile.y, z=tile.z) for tile in tiles})
+        >>> Config(tile_archives=['region.mbtiles'])
+
+    :param path: The path of the MBTiles file, created if it does not exist
+    :type path: str
+    """
+
+    # The tile URLs, as built by mapillary.config.api.vector_tiles.VectorTiles
+    URL_PATTERN = re.compile(r"/maps/vtp/(?P<tileset>[^/]+)/2/(\d+)/(\d+)/(\d+)/?$")
+
+    # The number of downloaded tiles written to the archive at once
+    WRITE_BATCH = 256
+
+    # The archives opened through `read_configured`, by path
+    __archives: typing.Dict[str, "MBTilesArchive"] = {}
+    __archives_lock = threading.Lock()
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializing MBTilesArchive constructor
+
+        :param path: The path of the MBTiles file, created if it does not exist
+        :type path: str
+        """
+
+        self.path = path
+
+        # The connection is shared by the threads using the archive, one statement at a time
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, "
+                "tile_row INTEGER, tile_data BLOB)"
+            )
+            self.__connection.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS tile_index "
+                "ON tiles (zoom_level, tile_column, tile_row)"
+            )
+
+    def __enter__(self) -> "MBTilesArchive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the archive"""
+
+        with self.__lock:
+            self.__connection.close()
+
+    @property
+    def metadata(self) -> dict:
+        """The metadata of the archive"""
+
+        with self.__lock:
+            return dict(self.__connection.execute("SELECT name, value FROM metadata"))
+
+    @property
+    def tileset(self) -> typing.Optional[str]:
+        """The Mapillary tileset of the archive, e.g., 'mly1_public'"""
+
+        return self.metadata.get("tileset")
+
+    @staticmethod
+    def parse_url(url: str) -> typing.Optional[typing.Tuple[str, mercantile.Tile]]:
+        """
+        Parses a tile URL into its tileset and tile
+
+        :param url: The tile URL, see `mapillary.config.api.vector_tiles`
+        :type url: str
+
+        :return: The tileset and the tile, or None if the URL is not a tile URL
+        :rtype: typing.Optional[typing.Tuple[str, mercantile.Tile]]
+        """
+
+        match = MBTilesArchive.URL_PATTERN.search(url.split("?")[0])
+
+        if match is None:
+            return None
+
+        z, x, y = (int(value) for value in match.groups()[1:])
+
+        return match.group("tileset"), mercantile.Tile(x=x, y=y, z=z)
+
+    def read_tile(self, tile: mercantile.Tile) -> typing.Optional[bytes]:
+        """
+        Reads a tile from the archive
+
+        :param tile: The tile to read
+        :type tile: mercantile.Tile
+
+        :return: The tile content, empty for an empty tile, or None if the tile is missing
+        :rtype: typing.Optional[bytes]
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT tile_data FROM tiles "
+                "WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (tile.z, tile.x, (1 << tile.z) - 1 - tile.y),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        content = bytes(row[0] or b"")
+
+        # The tiles written by other tools are not necessarily compressed
+        return gzip.decompress(content) if content[:2] == b"\x1f\x8b" else content
+
+    def tiles(self, zoom: int = None) -> typing.Set[mercantile.Tile]:
+        """
+        The tiles in the archive
+
+        :param zoom: The zoom level of the tiles, defaults to all the zoom levels
+        :type zoom: int
+
+        :return: The tiles
+        :rtype: typing.Set[mercantile.Tile]
+        """
+
+        sql = "SELECT zoom_level, tile_column, tile_row FROM tiles"
+        params = ()
+
+        if zoom is not None:
+            sql += " WHERE zoom_level = ?"
+            params = (zoom,)
+
+        with self.__lock:
+            rows = self.__connection.execute(sql, params).fetchall()
+
+        return {mercantile.Tile(x=x, y=(1 << z) - 1 - row, z=z) for z, x, row in rows}
+
+    def write_tiles(self, tiles: typing.Dict[mercantile.Tile, bytes]) -> None:
+        """
+        Writes tiles to the archive, in a single transaction
+
+        :param tiles: The content of each tile, empty for an empty tile
+        :type tiles: typing.Dict[mercantile.Tile, bytes]
+        """
+
+        rows = [
+            (
+                tile.z,
+                tile.x,
+                (1 << tile.z) - 1 - tile.y,
+                gzip.compress(content) if content else b"",
+            )
+            for tile, content in tiles.items()
+        ]
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", rows
+            )
+
+    def download(
+        self, urls: typing.Dict[mercantile.Tile, str], workers: int = 8
+    ) -> dict:
+        """
+        Downloads the given tiles into the archive, in parallel
+
+        The tiles already in the archive are not downloaded again, so that an interrupted
+        download can be resumed by calling the method again. Tiles that fail to download are
+        logged and left out, to be retried on the next call
+
+        :param urls: The URL of each tile, see `mapillary.config.api.vector_tiles`
+        :type urls: typing.Dict[mercantile.Tile, str]
+
+        :param workers: The number of tiles downloaded at once, defaults to 8
+        :type workers: int
+
+        :raises HTTPError: Raised when the API responds with a client error, e.g., an invalid
+            access token
+        :raises ValueError: Raised when the tiles belong to another tileset than the archive
+
+        :return: The number of tiles 'downloaded', 'skipped' as already in the archive, and
+            'failed'
+        :rtype: dict
+        """
+
+        summary = {"downloaded": 0, "skipped": 0, "failed": 0}
+
+        if not urls:
+            return summary
+
+        self.__set_tileset(urls)
+
+        existing = self.tiles()
+        pending = {tile: url for tile, url in urls.items() if tile not in existing}
+        summary["skipped"] = len(urls) - len(pending)
+
+        logger.info(
+            f"Downloading {len(pending)} tiles into {self.path}, "
+            f"{summary['skipped']} already downloaded"
+        )
+
+        client = Client()
+        batch = {}
+        pending = iter(pending.items())
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Only a few requests are queued ahead, so that the responses of a large region are
+            # not all held at once
+            futures = {
+                executor.submit(client.get, url): tile
+                for tile, url in itertools.islice(pending, workers * 2)
+            }
+
+            try:
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        tile = futures.pop(future)
+
+                        try:
+                            batch[tile] = future.result().content
+
+                        except requests.HTTPError as error:
+                            # Client errors, such as an invalid token, fail the whole download
+                            if error.response is None or error.response.status_code < 500:
+                                raise
+
+                            logger.warning(f"Failed to download tile {tile}, {error}")
+                            summary["failed"] += 1
+
+                        except (requests.ConnectionError, requests.Timeout) as error:
+                            logger.warning(f"Failed to download tile {tile}, {error}")
+                            summary["failed"] += 1
+
+                    # Write the tiles as they come, so that progress survives interruptions
+                    if len(batch) >= self.WRITE_BATCH:
+                        self.write_tiles(batch)
+                        summary["downloaded"] += len(batch)
+                        batch = {}
+
+                    for tile, url in itertools.islice(pending, len(done)):
+                        futures[executor.submit(client.get, url)] = tile
+
+            finally:
+                for future in futures:
+                    future.cancel()
+
+                if batch:
+                    self.write_tiles(batch)
+                    summary["downloaded"] += len(batch)
+
+                self.__update_metadata()
+
+        return summary
+
+    def __set_tileset(self, urls: typing.Dict[mercantile.Tile, str]) -> None:
+        """
+        Records the tileset of the archive, checking that all the tiles belong to it
+
+        :param urls: The URL of each tile
+        :type urls: typing.Dict[mercantile.Tile, str]
+
+        :raises ValueError: Raised when the tiles belong to another tileset than the archive
+        """
+
+        tilesets = set()
+        for url in urls.values():
+            parsed = MBTilesArchive.parse_url(url)
+
+            if parsed is None:
+                raise ValueError(f"Not a vector tile URL, {url}")
+
+            tilesets.add(parsed[0])
+
+        tileset = self.tileset
+
+        if len(tilesets) > 1 or (tileset is not None and tilesets != {tileset}):
+            raise ValueError(
+                f"The archive {self.path} holds the tileset {tileset}, "
+                f"cannot add tiles of {', '.join(sorted(tilesets))}"
+            )
+
+        if tileset is None:
+            tileset = tilesets.pop()
+
+            with self.__lock, self.__connection:
+                self.__connection.executemany(
+                    "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+                    [
+                        ("name", tileset),
+                        ("tileset", tileset),
+                        ("format", "pbf"),
+                        ("type", "overlay"),
+                    ],
+                )
+
+    def __update_metadata(self) -> None:
+        """Updates the zoom levels and bounds of the archive in its metadata"""
+
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT zoom_level, MIN(tile_column), MAX(tile_column), "
+                "MIN(tile_row), MAX(tile_row) FROM tiles GROUP BY zoom_level"
+            ).fetchall()
+
+        if not rows:
+            return
+
+        # The bounds of the deepest zoom level are the tightest
+        z, min_x, max_x, min_row, max_row = max(rows)
+        west, _, _, north = mercantile.bounds(min_x, (1 << z) - 1 - max_row, z)
+        _, south, east, _ = mercantile.bounds(max_x, (1 << z) - 1 - min_row, z)
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?)",
+                [
+                    ("minzoom", str(min(row[0] for row in rows))),
+                    ("maxzoom", str(z)),
+                    ("bounds", f"{west},{south},{east},{north}"),
+                ],
+            )
+
+    @classmethod
+    def read_configured(cls, url: str) -> typing.Optional[bytes]:
+        """
+        Reads a tile from the archives listed in `Config.tile_archives`
+
+        :param url: The tile URL, see `mapillary.config.api.vector_tiles`
+        :type url: str
+
+        :return: The tile content, empty for an empty tile, or None if no archive has the tile
+        :rtype: typing.Optional[bytes]
+        """
+
+        if not Config.tile_archives:
+            return None
+
+        parsed = MBTilesArchive.parse_url(url)
+
+        if parsed is None:
+            return None
+
+        tileset, tile = parsed
+
+        for path in Config.tile_archives:
+            archive = cls.__open(path)
+
+            if archive is None or archive.tileset != tileset:
+                continue
+
+            content = archive.read_tile(tile)
+
+            if content is not None:
+                return content
+
+        return None
+
+    @classmethod
+    def __open(cls, path: str) -> typing.Optional["MBTilesArchive"]:
+        """
+        Opens an archive once, and shares it afterwards
+
+        :param path: The path of the MBTiles file
+        :type path: str
+
+        :return: The archive, or None if there is no archive at the path
+        :rtype: typing.Optional[MBTilesArchive]
+        """
+
+        with cls.__archives_lock:
+            if path not in cls.__archives:
+                # Opening a missing archive would create an empty one
+                if not os.path.isfile(path):
+                    logger.warning(f"No tile archive found at {path}")
+                    return None
+
+                cls.__archives[path] = cls(path=path)
+
+            return cls.__archives[path]
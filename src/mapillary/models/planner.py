@@ -0,0 +1,1128 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.models.planner
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+This module contains the tile planner of the Mapillary Python SDK, which decides what vector
+tiles need to be requested to cover a bounding box.
+
+Large bounding boxes are mostly empty, so instead of requesting every tile at the target zoom
+level, the planner first checks the coverage layers at coarser zoom levels, the 'overview'
+layer for the zoom levels 0 - 5, and the 'sequence' layer for the zoom levels 6 - 14. It then
+only descends into the quadrants that have imagery. The number of tiles requested at the target
+zoom level then scales with the covered area, rather than with the area of the bounding box.
+
+The planner can also explain a query without running it, as a QueryPlan listing the planned
+tiles, the expected requests, the cache hits and the filters to be applied.
+
+The tiles planned are then fetched a batch at a time, by `scheduled_features` for a bounding
+box, stopping early once a limit is met, and by `features_along_route` for the corridor of a
+route.
+
+For more information, please check out https://www.mapillary.com/developer/api-documentation/.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import heapq
+import itertools
+import logging
+import math
+import typing
+
+import haversine
+import mercantile
+import numpy
+
+# Local imports
+
+# # Config
+from mapillary.config.api.vector_tiles import VectorTiles
+
+# # Models
+from mapillary.models.cache import NegativeTileCache
+from mapillary.models.config import Config
+from mapillary.models.exceptions import InvalidOptionError
+from mapillary.models.logger import Logger
+
+# # Utils
+from mapillary.utils import spatial
+from mapillary.utils.filter import pipeline
+
+logger: logging.Logger = Logger.setup_logger(name="mapillary.models.planner")
+
+# The number of tiles held in memory at once by the batch queries
+BATCH_TILES = 64
+
+# The number of tiles fetched at once by the queries with a limit, which may stop early
+LIMIT_BATCH_TILES = 8
+
+# The orders the results of the bounding box queries can be sorted in
+ORDERS = ["center", "newest"]
+
+
+class TilePlanner:
+    """
+    Plans the vector tiles to fetch for a bounding box, pruning the quadrants without coverage
+
+    Usage::
+
+        >>> from mapillary.models.api.vector_tiles import VectorTilesAdapter
+        >>> from mapillary.models.planner import TilePlanner
+        >>> planner = TilePlanner(adapter=VectorTilesAdapter())
+        >>> tiles = planner.plan(
+        ...     bbox={'west': -125, 'south': 32, 'east': -114, 'north': 42}, zoom=14
+        ... )
+
+    :param adapter: The adapter used to fetch the coverage tiles, an object with a `fetch_tile`
+        method, such as mapillary.models.api.vector_tiles.VectorTilesAdapter
+    :type adapter: mapillary.models.api.vector_tiles.VectorTilesAdapter
+
+    :param zooms: The coarse zoom levels to check the coverage at, defaults to
+        `Config.pruning_zooms`
+    :type zooms: list
+
+    :param threshold: The number of tiles at the target zoom level under which no pruning is
+        done, defaults to `Config.pruning_threshold`
+    :type threshold: int
+    """
+
+    # The mean radius of the Earth in meters, as used by the haversine package
+    EARTH_RADIUS = spatial.EARTH_RADIUS
+
+    # The latitude bounds of the Web Mercator tiles
+    MAX_LATITUDE = spatial.MAX_LATITUDE
+
+    def __init__(
+        self,
+        adapter,
+        zooms: typing.List[int] = None,
+        threshold: int = None,
+    ) -> None:
+        """
+        Initializing TilePlanner constructor
+
+        :param adapter: The adapter used to fetch the coverage tiles
+        :type adapter: mapillary.models.api.vector_tiles.VectorTilesAdapter
+
+        :param zooms: The coarse zoom levels to check the coverage at
+        :type zooms: list
+
+        :param threshold: The number of tiles under which no pruning is done
+        :type threshold: int
+        """
+
+        self.adapter = adapter
+        self.zooms = sorted(zooms if zooms is not None else Config.pruning_zooms)
+        self.threshold = (
+            threshold if threshold is not None else Config.pruning_threshold
+        )
+
+        # The coverage tiles checked by the last call to `plan`
+        self.coverage_tiles: typing.List[dict] = []
+
+    @property
+    def coverage_requests(self) -> int:
+        """The number of coverage tiles checked by the last call to `plan`"""
+
+        return len(self.coverage_tiles)
+
+    @staticmethod
+    def count_tiles(bbox: dict, zoom: int) -> int:
+        """
+        Counts the tiles within or intersecting a bounding box, without listing them
+
+        :param bbox: The bounding box, with the keys 'west', 'south', 'east', 'north'
+        :type bbox: dict
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The number of tiles
+        :rtype: int
+        """
+
+        # Bounding boxes crossing the antimeridian are split by mercantile
+        if bbox["west"] > bbox["east"]:
+            return sum(
+                1
+                for _ in mercantile.tiles(
+                    bbox["west"], bbox["south"], bbox["east"], bbox["north"], zoom
+                )
+            )
+
+        upper_left = mercantile.tile(bbox["west"], bbox["north"], zoom)
+        lower_right = mercantile.tile(bbox["east"], bbox["south"], zoom)
+
+        return (lower_right.x - upper_left.x + 1) * (lower_right.y - upper_left.y + 1)
+
+    @staticmethod
+    def bbox_tiles(bbox: dict, zoom: int) -> typing.List[mercantile.Tile]:
+        """
+        Lists every tile within or intersecting a bounding box
+
+        :param bbox: The bounding box, with the keys 'west', 'south', 'east', 'north'
+        :type bbox: dict
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The list of tiles
+        :rtype: list
+        """
+
+        return list(
+            mercantile.tiles(
+                west=bbox["west"],
+                south=bbox["south"],
+                east=bbox["east"],
+                north=bbox["north"],
+                zooms=zoom,
+            )
+        )
+
+    @staticmethod
+    def radius_bbox(longitude: float, latitude: float, radius: float) -> dict:
+        """
+        Computes the bounding box of a circle
+
+        :param longitude: The longitude of the center
+        :type longitude: float
+
+        :param latitude: The latitude of the center
+        :type latitude: float
+
+        :param radius: The radius of the circle, in meters
+        :type radius: float
+
+        :return: The bounding box, with the keys 'west', 'south', 'east', 'north', clipped to
+            the Web Mercator bounds
+        :rtype: dict
+        """
+
+        angle = radius / TilePlanner.EARTH_RADIUS
+        cosine = math.cos(math.radians(latitude))
+
+        # The circle spans every longitude when it reaches over a pole
+        longitude_delta = (
+            math.degrees(math.asin(math.sin(angle) / cosine))
+            if angle < math.pi / 2 and math.sin(angle) < cosine
+            else 180.0
+        )
+
+        return {
+            "west": max(longitude - longitude_delta, -180.0),
+            "south": max(latitude - math.degrees(angle), -TilePlanner.MAX_LATITUDE),
+            "east": min(longitude + longitude_delta, 180.0),
+            "north": min(latitude + math.degrees(angle), TilePlanner.MAX_LATITUDE),
+        }
+
+    @staticmethod
+    def tile_distance(longitude: float, latitude: float, tile: mercantile.Tile) -> float:
+        """
+        Computes the distance from a point to the closest point of a tile
+
+        :param longitude: The longitude of the point
+        :type longitude: float
+
+        :param latitude: The latitude of the point
+        :type latitude: float
+
+        :param tile: The tile
+        :type tile: mercantile.Tile
+
+        :return: The haversine distance, in meters, 0 when the point is within the tile
+        :rtype: float
+        """
+
+        bounds = mercantile.bounds(tile)
+
+        return haversine.haversine(
+            (latitude, longitude),
+            (
+                min(max(latitude, bounds.south), bounds.north),
+                min(max(longitude, bounds.west), bounds.east),
+            ),
+            unit="m",
+        )
+
+    @staticmethod
+    def radius_tiles(
+        longitude: float, latitude: float, radius: float, zoom: int
+    ) -> typing.List[mercantile.Tile]:
+        """
+        Lists the tiles intersecting a circle, leaving out the corner tiles of its bounding box
+        that the circle does not reach
+
+        :param longitude: The longitude of the center
+        :type longitude: float
+
+        :param latitude: The latitude of the center
+        :type latitude: float
+
+        :param radius: The radius of the circle, in meters
+        :type radius: float
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The tiles, the closest to the center first
+        :rtype: list
+        """
+
+        distances = {
+            tile: TilePlanner.tile_distance(longitude, latitude, tile)
+            for tile in TilePlanner.bbox_tiles(
+                bbox=TilePlanner.radius_bbox(longitude, latitude, radius), zoom=zoom
+            )
+        }
+
+        return sorted(
+            (tile for tile, distance in distances.items() if distance <= radius),
+            key=distances.get,
+        )
+
+    @staticmethod
+    def corridor_tiles(
+        route: numpy.ndarray, buffer: float, zoom: int
+    ) -> typing.List[mercantile.Tile]:
+        """
+        Lists the tiles that a corridor, i.e., a route buffered on both sides, reaches into,
+        rather than every tile of the bounding box of the route
+
+        A tile is kept when its center is within the buffer, plus half the diagonal of the
+        tile, of the route. This keeps every tile the corridor reaches, and a few tiles along
+        its edges
+
+        :param route: The (longitude, latitude) pairs of the route, of shape (m, 2), with m > 1
+        :type route: numpy.ndarray
+
+        :param buffer: The distance from the route to the edges of the corridor, in meters
+        :type buffer: float
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The tiles, in the order the route goes through them
+        :rtype: list
+        """
+
+        # The tiles of the bounding boxes of the buffered segments
+        candidates = set()
+        for start, end in zip(route[:-1], route[1:]):
+            boxes = [
+                TilePlanner.radius_bbox(longitude, latitude, buffer)
+                for longitude, latitude in (start, end)
+            ]
+            candidates.update(
+                TilePlanner.bbox_tiles(
+                    bbox={
+                        "west": min(box["west"] for box in boxes),
+                        "south": min(box["south"] for box in boxes),
+                        "east": max(box["east"] for box in boxes),
+                        "north": max(box["north"] for box in boxes),
+                    },
+                    zoom=zoom,
+                )
+            )
+
+        tiles = sorted(candidates)
+        bounds = numpy.array([mercantile.bounds(tile) for tile in tiles]).reshape(-1, 4)
+        centers = numpy.column_stack(
+            [
+                (bounds[:, 0] + bounds[:, 2]) / 2,
+                (bounds[:, 1] + bounds[:, 3]) / 2,
+            ]
+        )
+
+        distances, positions = spatial.route_distances(coordinates=centers, route=route)
+        reaches = distances <= buffer + spatial.haversine_distances(
+            centers[:, 0], centers[:, 1], bounds[:, 2:]
+        )
+
+        return [
+            tiles[index]
+            for index in numpy.flatnonzero(reaches)[
+                numpy.argsort(positions[reaches], kind="stable")
+            ]
+        ]
+
+    @staticmethod
+    def points_tiles(
+        longitudes: numpy.ndarray,
+        latitudes: numpy.ndarray,
+        radius: typing.Optional[float],
+        zoom: int,
+    ) -> typing.Dict[mercantile.Tile, numpy.ndarray]:
+        """
+        Groups points by the tiles that their circles intersect, as `radius_tiles` does for a
+        single point, with the tile math done on the arrays of coordinates at once
+
+        :param longitudes: The longitudes of the points
+        :type longitudes: numpy.ndarray
+
+        :param latitudes: The latitudes of the points
+        :type latitudes: numpy.ndarray
+
+        :param radius: The radius of the circles, in meters. When None, each point only goes
+            to the tile containing it
+        :type radius: typing.Optional[float]
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The indices of the points whose circles intersect each tile, in order
+        :rtype: typing.Dict[mercantile.Tile, numpy.ndarray]
+        """
+
+        longitudes = numpy.asarray(longitudes, dtype=numpy.float64)
+        latitudes = numpy.asarray(latitudes, dtype=numpy.float64)
+
+        if radius is None:
+            x, y = spatial.tile_indices(longitudes, latitudes, zoom)
+            pairs = [(numpy.arange(len(longitudes)), x, y)]
+
+        else:
+            angle = radius / TilePlanner.EARTH_RADIUS
+            ratio = math.sin(angle) / numpy.cos(numpy.radians(latitudes))
+
+            # The circles span every longitude when they reach over a pole
+            longitude_delta = numpy.where(
+                (angle < math.pi / 2) & (ratio < 1),
+                numpy.degrees(numpy.arcsin(numpy.clip(ratio, 0.0, 1.0))),
+                180.0,
+            )
+
+            west, north = spatial.tile_indices(
+                numpy.clip(longitudes - longitude_delta, -180.0, 180.0),
+                latitudes + math.degrees(angle),
+                zoom,
+            )
+            east, south = spatial.tile_indices(
+                numpy.clip(longitudes + longitude_delta, -180.0, 180.0),
+                latitudes - math.degrees(angle),
+                zoom,
+            )
+
+            count = 2 ** zoom
+            pairs = []
+            for dx in range(int((east - west).max(initial=0)) + 1):
+                for dy in range(int((south - north).max(initial=0)) + 1):
+                    indices = numpy.flatnonzero(
+                        (west + dx <= east) & (north + dy <= south)
+                    )
+                    x, y = west[indices] + dx, north[indices] + dy
+
+                    # Leaving out the corner tiles of the bounding boxes, out of the circles
+                    closest = spatial.haversine_distances(
+                        longitudes[indices],
+                        latitudes[indices],
+                        numpy.column_stack(
+                            [
+                                numpy.clip(
+                                    longitudes[indices],
+                                    x / count * 360.0 - 180.0,
+                                    (x + 1) / count * 360.0 - 180.0,
+                                ),
+                                numpy.clip(
+                                    latitudes[indices],
+                                    numpy.degrees(
+                                        numpy.arctan(
+                                            numpy.sinh(math.pi * (1 - 2 * (y + 1) / count))
+                                        )
+                                    ),
+                                    numpy.degrees(
+                                        numpy.arctan(numpy.sinh(math.pi * (1 - 2 * y / count)))
+                                    ),
+                                ),
+                            ]
+                        ),
+                    )
+                    reached = closest <= radius
+
+                    pairs.append((indices[reached], x[reached], y[reached]))
+
+        indices, x, y = (numpy.concatenate(arrays) for arrays in zip(*pairs))
+
+        # Sorting the pairs by tile, then by point, to split them in groups
+        order = numpy.lexsort((indices, y, x))
+        indices, x, y = indices[order], x[order], y[order]
+        starts = numpy.flatnonzero(
+            numpy.r_[True, (x[1:] != x[:-1]) | (y[1:] != y[:-1])]
+        )
+
+        return {
+            mercantile.Tile(x=int(x[start]), y=int(y[start]), z=zoom): group
+            for start, group in zip(starts, numpy.split(indices, starts[1:]))
+        }
+
+    def plan(self, bbox: dict, zoom: int = 14) -> typing.List[mercantile.Tile]:
+        """
+        Lists the tiles at the target zoom level that intersect the bounding box and lie
+        within a quadrant with coverage
+
+        :param bbox: The bounding box, with the keys 'west', 'south', 'east', 'north'
+        :type bbox: dict
+
+        :param zoom: The target zoom level, defaults to 14
+        :type zoom: int
+
+        :return: The list of tiles to fetch
+        :rtype: list
+        """
+
+        self.coverage_tiles = []
+
+        levels = [level for level in self.zooms if level < zoom]
+
+        # Small areas are cheaper to fetch than to plan, as is anything read offline
+        if (
+            not Config.use_tile_pruning
+            or Config.offline
+            or not levels
+            or TilePlanner.count_tiles(bbox, zoom) <= self.threshold
+        ):
+            return TilePlanner.bbox_tiles(bbox, zoom)
+
+        # Start from every coarse tile intersecting the bounding box ...
+        candidates = TilePlanner.bbox_tiles(bbox, levels[0])
+
+        for index, level in enumerate(levels):
+
+            # ... keep only the tiles that have coverage ...
+            covered = [tile for tile in candidates if self.__has_coverage(tile)]
+
+            # ... and descend into them, up to the next level
+            next_level = levels[index + 1] if index + 1 < len(levels) else zoom
+            candidates = [
+                child
+                for tile in covered
+                for child in TilePlanner.__children_in_bbox(tile, bbox, next_level)
+            ]
+
+            logger.debug(
+                f"[TilePlanner] zoom {level}: {len(covered)} covered tiles, "
+                f"{len(candidates)} candidates at zoom {next_level}"
+            )
+
+        logger.info(
+            f"[TilePlanner] Planned {len(candidates)} of "
+            f"{TilePlanner.count_tiles(bbox, zoom)} tiles at zoom {zoom}, "
+            f"using {self.coverage_requests} coverage requests"
+        )
+
+        return candidates
+
+    def explain(
+        self,
+        query: str,
+        bbox: dict,
+        zoom: int,
+        layer: str,
+        get_url: typing.Callable,
+        decoded_layer: str = None,
+        filters: list = None,
+    ) -> "QueryPlan":
+        """
+        Plans a query without fetching the tiles at the target zoom level, describing what
+        running it would cost
+
+        The coverage tiles needed for pruning are fetched, as the plan depends on them.
+
+        :param query: The name of the query being planned, e.g., 'images_in_bbox'
+        :type query: str
+
+        :param bbox: The bounding box, with the keys 'west', 'south', 'east', 'north'
+        :type bbox: dict
+
+        :param zoom: The target zoom level
+        :type zoom: int
+
+        :param layer: The name of the layer fetched at the target zoom level
+        :type layer: str
+
+        :param get_url: Builds the URL of a tile from its x, y, z, see
+            `mapillary.config.api.vector_tiles.VectorTiles`
+        :type get_url: typing.Callable
+
+        :param decoded_layer: The layer decoded from the tiles, or None for all the layers
+        :type decoded_layer: str
+
+        :param filters: The filter components the features are passed through, see
+            `mapillary.utils.filter.pipeline`
+        :type filters: list
+
+        :return: The query plan
+        :rtype: mapillary.models.planner.QueryPlan
+        """
+
+        tiles = []
+
+        for tile in self.plan(bbox=bbox, zoom=zoom):
+            url = get_url(x=tile.x, y=tile.y, z=tile.z)
+            tiles.append(
+                {
+                    "layer": layer,
+                    "z": tile.z,
+                    "x": tile.x,
+                    "y": tile.y,
+                    "url": url,
+                    "cached": self.adapter.is_tile_cached(url=url, layer=decoded_layer),
+                }
+            )
+
+        # Whether the coverage tiles will be requested again when the query runs
+        coverage = [
+            {
+                **tile,
+                "cached": self.adapter.is_tile_cached(
+                    url=tile["url"], layer=tile["layer"]
+                ),
+            }
+            for tile in self.coverage_tiles
+        ]
+
+        return QueryPlan(
+            query=query,
+            bbox=bbox,
+            zoom=zoom,
+            tiles=tiles,
+            coverage=coverage,
+            filters=[component for component in filters or [] if component],
+        )
+
+    @staticmethod
+    def coverage_layer(zoom: int) -> typing.Tuple[str, str]:
+        """
+        Gets the coverage layer available at a zoom level
+
+        :param zoom: The zoom level
+        :type zoom: int
+
+        :return: The layer name, and the URL builder for that layer
+        :rtype: tuple
+        """
+
+        if zoom <= 5:
+            return "overview", VectorTiles.get_overview_layer
+
+        return "sequence", VectorTiles.get_sequence_layer
+
+    def __has_coverage(self, tile: mercantile.Tile) -> bool:
+        """
+        Whether a coarse tile has any imagery
+
+        :param tile: The coarse tile
+        :type tile: mercantile.Tile
+
+        :return: True if the tile has coverage, else False
+        :rtype: bool
+        """
+
+        layer, get_url = TilePlanner.coverage_layer(tile.z)
+        url = get_url(x=tile.x, y=tile.y, z=tile.z)
+
+        try:
+            has_coverage = bool(
+                self.adapter.fetch_tile(url=url, tile=tile, layer=layer)["features"]
+            )
+
+        except Exception:
+            # A coverage tile that failed, and was quarantined, must not prune what lies below
+            # it, while any other error is raised
+            if not (
+                Config.use_negative_cache
+                and NegativeTileCache.get_default().is_quarantined(
+                    NegativeTileCache.tile_key(url=url, layer=layer)
+                )
+            ):
+                raise
+
+            has_coverage = True
+
+        self.coverage_tiles.append(
+            {
+                "layer": layer,
+                "z": tile.z,
+                "x": tile.x,
+                "y": tile.y,
+                "url": url,
+                "covered": has_coverage,
+            }
+        )
+
+        return has_coverage
+
+    @staticmethod
+    def __children_in_bbox(
+        tile: mercantile.Tile, bbox: dict, zoom: int
+    ) -> typing.List[mercantile.Tile]:
+        """
+        Lists the descendants of a tile at a zoom level that intersect a bounding box
+
+        :param tile: The parent tile
+        :type tile: mercantile.Tile
+
+        :param bbox: The bounding box, with the keys 'west', 'south', 'east', 'north'
+        :type bbox: dict
+
+        :param zoom: The zoom level of the descendants
+        :type zoom: int
+
+        :return: The list of descendants
+        :rtype: list
+        """
+
+        bounds = mercantile.bounds(tile)
+
+        # Intersect the tile bounds with the bounding box
+        west, east = max(bounds.west, bbox["west"]), min(bounds.east, bbox["east"])
+        south, north = max(bounds.south, bbox["south"]), min(
+            bounds.north, bbox["north"]
+        )
+
+        # Bounding boxes crossing the antimeridian are not intersected
+        if bbox["west"] > bbox["east"]:
+            west, east = bounds.west, bounds.east
+
+        if west >= east or south >= north:
+            return []
+
+        # Keep the tiles touching the intersection from the outside within the parent
+        return [
+            child
+            for child in mercantile.tiles(west, south, east, north, zoom)
+            if mercantile.parent(child, zoom=tile.z) == tile
+        ]
+
+
+class QueryPlan:
+    """
+    The plan of a query against the vector tiles, as returned by `TilePlanner.explain`
+
+    Usage::
+
+        >>> import mapillary as mly
+        >>> plan = mly.interface.estimate_images_in_bbox(
+        ...     bbox={'west': -125, 'south': 32, 'east': -114, 'north': 42}
+        ... )
+        >>> plan.expected_requests
+        ... 1234
+        >>> plan.to_dict()
+
+    :param query: The name of the query
+    :type query: str
+
+    :param bbox: The bounding box queried
+    :type bbox: dict
+
+    :param zoom: The target zoom level
+    :type zoom: int
+
+    :param tiles: The planned tiles at the target zoom level
+    :type tiles: list
+
+    :param coverage: The coverage tiles checked while planning
+    :type coverage: list
+
+    :param filters: The filter components the features are passed through
+    :type filters: list
+    """
+
+    def __init__(
+        self,
+        query: str,
+        bbox: dict,
+        zoom: int,
+        tiles: typing.List[dict],
+        coverage: typing.List[dict],
+        filters: typing.List[dict],
+    ) -> None:
+        """
+        Initializing QueryPlan constructor
+
+        :param query: The name of the query
+        :type query: str
+
+        :param bbox: The bounding box queried
+        :type bbox: dict
+
+        :param zoom: The target zoom level
+        :type zoom: int
+
+        :param tiles: The planned tiles at the target zoom level
+        :type tiles: list
+
+        :param coverage: The coverage tiles checked while planning
+        :type coverage: list
+
+        :param filters: The filter components the features are passed through
+        :type filters: list
+        """
+
+        self.query = query
+        self.bbox = bbox
+        self.zoom = zoom
+        self.tiles = tiles
+        self.coverage = coverage
+        self.filters = filters
+
+    @property
+    def tile_counts(self) -> typing.Dict[str, typing.Dict[int, int]]:
+        """The number of tiles per layer and zoom level, coverage tiles included"""
+
+        counts: typing.Dict[str, typing.Dict[int, int]] = {}
+
+        for tile in self.coverage + self.tiles:
+            zooms = counts.setdefault(tile["layer"], {})
+            zooms[tile["z"]] = zooms.get(tile["z"], 0) + 1
+
+        return counts
+
+    @property
+    def cache_hits(self) -> int:
+        """The number of tiles served locally, without a request"""
+
+        return sum(1 for tile in self.coverage + self.tiles if tile["cached"])
+
+    @property
+    def cache_misses(self) -> int:
+        """The number of tiles that have to be requested"""
+
+        return len(self.coverage) + len(self.tiles) - self.cache_hits
+
+    @property
+    def expected_requests(self) -> int:
+        """The number of requests expected when running the query"""
+
+        # Every tile that misses the cache costs exactly one request
+        return self.cache_misses
+
+    def to_dict(self) -> dict:
+        """
+        Return the dictionary representation of the QueryPlan
+
+        :return: The plan as a JSON serializable dictionary
+        :rtype: dict
+        """
+
+        return {
+            "query": self.query,
+            "bbox": self.bbox,
+            "zoom": self.zoom,
+            "tile_counts": self.tile_counts,
+            "expected_requests": self.expected_requests,
+            "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+            "filters": [
+                {key: QueryPlan.__describe(value) for key, value in component.items()}
+                for component in self.filters
+            ],
+            "coverage": self.coverage,
+            "tiles": self.tiles,
+        }
+
+    @staticmethod
+    def __describe(value: typing.Any) -> typing.Any:
+        """
+        Describes a filter argument in a JSON serializable way
+
+        :param value: The filter argument
+        :type value: typing.Any
+
+        :return: The value itself, or a short description of it
+        :rtype: typing.Any
+        """
+
+        if value is None or isinstance(
+            value, (str, int, float, bool, list, tuple, dict)
+        ):
+            return value
+
+        # Shapely geometries, such as the boundary of a shape, are summarized by their bounds
+        if hasattr(value, "geom_type") and hasattr(value, "bounds"):
+            return f"{value.geom_type}(bounds={value.bounds})"
+
+        return repr(value)
+
+    def __str__(self) -> str:
+        """Return the string representation of the QueryPlan"""
+
+        counts = ", ".join(
+            f"{layer} z{zoom}: {count}"
+            for layer, zooms in self.tile_counts.items()
+            for zoom, count in sorted(zooms.items())
+        )
+        filters = ", ".join(component["filter"] for component in self.filters)
+
+        return (
+            f"{self.query}: {len(self.tiles)} tiles at zoom {self.zoom}, "
+            f"{len(self.coverage)} coverage tiles ({counts}), "
+            f"{self.expected_requests} expected requests, "
+            f"{self.cache_hits} cache hits, {self.cache_misses} cache misses, "
+            f"filters: [{filters}]"
+        )
+
+    def __repr__(self) -> str:
+        """Return the formal string representation of the QueryPlan"""
+
+        return (
+            f"QueryPlan(query={self.query}, tiles={len(self.tiles)}, "
+            f"expected_requests={self.expected_requests})"
+        )
+
+
+def scheduled_features(
+    adapter,
+    tiles: typing.List[mercantile.Tile],
+    get_url,
+    layer: str,
+    components: list,
+    bounding_box: dict,
+    limit: int = None,
+    order: str = None,
+    time_property: str = "captured_at",
+) -> list:
+    """
+    Fetches and filters the point features of the tiles of a bounding box, a batch of tiles at
+    a time, and stops fetching as soon as the limit is met
+
+    - With no order, the tiles are fetched in the planned order, until `limit` features passed
+      the filters
+    - With the 'center' order, the tiles are fetched the closest to the center of the bounding
+      box first, until no tile left can hold a feature closer than the `limit` closest found
+    - With the 'newest' order, every tile is fetched, as any tile may hold the newest features,
+      but only the `limit` newest features are kept
+
+    :param adapter: The adapter through which the tiles are fetched
+    :type adapter: mapillary.models.api.vector_tiles.VectorTilesAdapter
+
+    :param tiles: The tiles, as planned by `mapillary.models.planner.TilePlanner.plan`
+    :type tiles: typing.List[mercantile.Tile]
+
+    :param get_url: The URL builder of the tiles, see `mapillary.config.api.vector_tiles`
+    :type get_url: callable
+
+    :param layer: The layer to decode, or None to decode all the layers
+    :type layer: str
+
+    :param components: The components to pass to `mapillary.utils.filter.pipeline`
+    :type components: list
+
+    :param bounding_box: The bounding box, with the keys 'west', 'south', 'east', 'north'
+    :type bounding_box: dict
+
+    :param limit: The maximum number of features. Defaults to None, for every feature
+    :type limit: int
+
+    :param order: Either None, 'center' or 'newest'. Defaults to None
+    :type order: str
+
+    :param time_property: The property the 'newest' order sorts by, defaults to 'captured_at'
+    :type time_property: str
+
+    :raises InvalidOptionError: Raised when the limit is not positive, or the order is unknown
+
+    :return: The features, each once, in the given order
+    :rtype: list
+    """
+
+    if limit is not None and limit < 1:
+        raise InvalidOptionError(
+            param="limit", value=limit, options=["a positive integer"]
+        )
+
+    if order not in [None, *ORDERS]:
+        raise InvalidOptionError(param="order", value=order, options=ORDERS)
+
+    if order == "center":
+        longitude = (bounding_box["west"] + bounding_box["east"]) / 2
+        latitude = (bounding_box["south"] + bounding_box["north"]) / 2
+
+        # The closest tiles to the center first
+        schedule = sorted(
+            (TilePlanner.tile_distance(longitude, latitude, tile), index, tile)
+            for index, tile in enumerate(tiles)
+        )
+    else:
+        schedule = [(0.0, index, tile) for index, tile in enumerate(tiles)]
+
+    # Smaller batches waste fewer requests when the fetching stops early
+    size = BATCH_TILES if limit is None or order == "newest" else LIMIT_BATCH_TILES
+
+    # The features kept, as a heap on their rank, the worst ranked first, when ordered
+    kept = []
+    seen = set()
+    counter = itertools.count()
+
+    def full() -> bool:
+        return limit is not None and len(kept) >= limit
+
+    # The points in the buffer of a tile are found in its neighbours as well, while the parts
+    # of a line clipped by each tile share its ID
+    def key(feature: dict) -> typing.Hashable:
+        if feature["geometry"]["type"] == "Point":
+            return feature["properties"].get("id", id(feature))
+
+        return id(feature)
+
+    for start in range(0, len(schedule), size):
+        batch = schedule[start:start + size]
+
+        if order is None and full():
+            break
+
+        # No tile left can hold a feature closer to the center than the ones kept
+        if order == "center" and full() and batch[0][0] > -kept[0][0]:
+            break
+
+        fetched = adapter.fetch_tiles(
+            urls={tile: get_url(x=tile.x, y=tile.y, z=tile.z) for _, _, tile in batch},
+            layer=layer,
+        )
+
+        for _, _, tile in batch:
+            features = [
+                feature
+                for feature in pipeline(data=fetched[tile], components=components)
+                if key(feature) not in seen
+            ]
+            seen.update(key(feature) for feature in features)
+
+            if order is None:
+                kept.extend(features)
+                continue
+
+            if not features:
+                continue
+
+            ranks = (
+                -spatial.haversine_distances(
+                    longitude, latitude, spatial.coordinates_array(features)
+                )
+                if order == "center"
+                else [feature["properties"].get(time_property, 0) for feature in features]
+            )
+
+            for rank, feature in zip(ranks, features):
+                # The earlier features come first among the equally ranked ones
+                entry = (float(rank), -next(counter), feature)
+
+                if not full():
+                    heapq.heappush(kept, entry)
+                elif entry[0] > kept[0][0]:
+                    heapq.heapreplace(kept, entry)
+
+    # Persist the tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    if order is None:
+        return kept[:limit]
+
+    return [
+        feature
+        for _, _, feature in sorted(kept, key=lambda entry: (-entry[0], -entry[1]))
+    ]
+
+
+def features_along_route(
+    adapter,
+    route: numpy.ndarray,
+    buffer: float,
+    zoom: int,
+    get_url,
+    layer: str,
+    components: list,
+) -> list:
+    """
+    Fetches the features within a corridor along a route
+
+    :param adapter: The adapter through which the tiles are fetched
+    :type adapter: mapillary.models.api.vector_tiles.VectorTilesAdapter
+
+    :param route: The (longitude, latitude) pairs of the route, of shape (m, 2)
+    :type route: numpy.ndarray
+
+    :param buffer: The distance from the route to the edges of the corridor, in meters
+    :type buffer: float
+
+    :param zoom: The zoom level of the tiles
+    :type zoom: int
+
+    :param get_url: The URL builder of the tiles, see `mapillary.config.api.vector_tiles`
+    :type get_url: callable
+
+    :param layer: The layer to decode, or None to decode all the layers
+    :type layer: str
+
+    :param components: The components to pass to `mapillary.utils.filter.pipeline`
+    :type components: list
+
+    :return: The features within the corridor, each once, in the order of the route, with
+        their 'distance' from the route and their 'position' along the route added to their
+        properties
+    :rtype: list
+    """
+
+    tiles = TilePlanner.corridor_tiles(route=route, buffer=buffer, zoom=zoom)
+
+    # The features found, by ID, as the features in the buffer of a tile are found in its
+    # neighbours as well
+    found = {}
+
+    # The tiles are fetched a batch at a time, to hold only a few of them in memory
+    for start in range(0, len(tiles), BATCH_TILES):
+        batch = adapter.fetch_tiles(
+            urls={
+                tile: get_url(x=tile.x, y=tile.y, z=tile.z)
+                for tile in tiles[start:start + BATCH_TILES]
+            },
+            layer=layer,
+        )
+
+        for geojson in batch.values():
+            features = [
+                feature
+                for feature in (
+                    pipeline(data=geojson, components=components)
+                    if geojson["features"]
+                    else []
+                )
+                if feature["properties"].get("id", id(feature)) not in found
+            ]
+
+            if not features:
+                continue
+
+            distances, positions = spatial.route_distances(
+                coordinates=spatial.coordinates_array(features), route=route
+            )
+
+            for index in numpy.flatnonzero(distances <= buffer):
+                feature = features[index]
+                found[feature["properties"].get("id", id(feature))] = (
+                    float(positions[index]),
+                    float(distances[index]),
+                    feature,
+                )
+
+    # Persist the tiles found to be empty or failing
+    NegativeTileCache.flush_default()
+
+    return [
+        # The cached features are copied rather than modified
+        {
+            **feature,
+            "properties": {
+                **feature["properties"],
+                "distance": distance,
+                "position": position,
+            },
+        }
+        for position, distance, feature in sorted(
+            found.values(), key=lambda entry: entry[:2]
+        )
+    ]
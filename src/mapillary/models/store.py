@@ -0,0 +1,562 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.models.store
+~~~~~~~~~~~~~~~~~~~~~~
+
+This module contains the LocalStore, a local SQLite database of features fetched through the
+Mapillary Python SDK.
+
+Features are upserted by their layer and ID, so that repeated crawls of the same area update the
+store incrementally rather than duplicating it. Their bounds are kept in an R-tree index, and the
+properties the filters select on (captured_at, sequence_id, value, ...) in indexed columns, so
+that the filters of `mapillary.utils.filter.pipeline` run as indexed queries against the store.
+
+For more information, please check out https://www.mapillary.com/developer/api-documentation/.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import logging
+import math
+import sqlite3
+import threading
+import typing
+
+import haversine
+
+# Local imports
+
+# # Models
+from mapillary.models.logger import Logger
+
+# # Utils
+from mapillary.utils import codec
+from mapillary.utils.filter import pipeline
+from mapillary.utils.format import geometry_bounds, iterate_features
+from mapillary.utils.time import date_to_unix_timestamp
+
+logger: logging.Logger = Logger.setup_logger(name="mapillary.models.store")
+
+
+class LocalStore:
+    """
+    A local SQLite store of features, indexed for the filters of the SDK
+
+    Each feature is stored whole, along with the layer it belongs to, its bounds in an R-tree
+    index, and the properties used by the filters in their own indexed columns. The IDs are
+    stored as text, and are unique within a layer, as the numeric image IDs and the string
+    sequence IDs may be stored side by side.
+
+    Usage::
+
+        >>> from mapillary.models.store import LocalStore
+        >>> with LocalStore(path='images.sqlite') as store:
+        ...     store.upsert(data=geojson, layer='image')
+        ...     store.query(
+        ...         layer='image',
+        ...         components=[
+        ...             {'filter': 'features_in_bounding_box', 'bbox': bbox},
+        ...             {'filter': 'min_captured_at', 'min_timestamp': '2020-01-01'},
+        ...         ],
+        ...     )
+
+    :param path: The path of the SQLite database, created if it does not exist
+    :type path: str
+    """
+
+    # The properties stored in their own columns, and their SQLite types
+    COLUMNS = {
+        "captured_at": "INTEGER",
+        "first_seen_at": "INTEGER",
+        "sequence_id": "TEXT",
+        "organization_id": "INTEGER",
+        "value": "TEXT",
+        "is_pano": "INTEGER",
+        "compass_angle": "REAL",
+    }
+
+    # The columns with an index of their own
+    INDEXES = ("captured_at", "first_seen_at", "sequence_id", "value")
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializing LocalStore constructor
+
+        :param path: The path of the SQLite database, created if it does not exist
+        :type path: str
+        """
+
+        self.path = path
+
+        # The connection is shared by the threads using the store, one statement at a time
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+
+        self.__create_schema()
+
+    def __enter__(self) -> "LocalStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the database"""
+
+        with self.__lock:
+            self.__connection.close()
+
+    def __create_schema(self) -> None:
+        """Creates the tables and indexes of the store, if they do not exist yet"""
+
+        columns = "".join(
+            f"{column} {column_type}, " for column, column_type in self.COLUMNS.items()
+        )
+
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS features ("
+                # The row ID, also keying the R-tree, which only takes integers
+                "key INTEGER PRIMARY KEY, "
+                "id TEXT NOT NULL, "
+                "layer TEXT NOT NULL, "
+                f"{columns}"
+                # The position of point features, checked exactly after the R-tree lookup
+                "x REAL, y REAL, "
+                "feature TEXT NOT NULL, "
+                # Also serves as the index of the layer
+                "UNIQUE (layer, id))"
+            )
+
+            # The R-tree stores 32-bit floats, rounded outwards, so it is only a prefilter
+            self.__connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS features_rtree "
+                "USING rtree(key, min_x, max_x, min_y, max_y)"
+            )
+
+            for column in self.INDEXES:
+                self.__connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS features_{column} ON features ({column})"
+                )
+
+    def upsert(
+        self,
+        data: typing.Union[str, dict, typing.Iterable],
+        layer: str = "image",
+        chunk_size: int = 10000,
+    ) -> int:
+        """
+        Inserts the given features, replacing the stored features of the layer with the same ID
+
+        :param data: The features, either as a GeoJSON string, a GeoJSON dictionary, or an
+            iterable (e.g., a generator) of GeoJSON features
+        :type data: typing.Union[str, dict, typing.Iterable]
+
+        :param layer: The layer the features belong to, e.g., 'image', 'sequence', 'point',
+            'traffic_sign'. Defaults to 'image'
+        :type layer: str
+
+        :param chunk_size: The number of features written per transaction, defaults to 10000
+        :type chunk_size: int
+
+        :return: The number of features written
+        :rtype: int
+        """
+
+        count = 0
+        rows, bounds = [], []
+
+        for feature in iterate_features(data):
+            row = LocalStore.__feature_row(feature, layer)
+
+            if row is None:
+                continue
+
+            rows.append(row[0])
+            bounds.append(row[1])
+
+            if len(rows) >= chunk_size:
+                count += self.__write(rows, bounds)
+                rows, bounds = [], []
+
+        if rows:
+            count += self.__write(rows, bounds)
+
+        return count
+
+    def __write(self, rows: list, bounds: list) -> int:
+        """
+        Writes a chunk of features in a single transaction
+
+        :param rows: The rows of the features table
+        :type rows: list
+
+        :param bounds: The rows of the R-tree index
+        :type bounds: list
+
+        :return: The number of features written
+        :rtype: int
+        """
+
+        columns = ["id", "layer", *self.COLUMNS, "x", "y", "feature"]
+
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                f"INSERT INTO features ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)}) "
+                "ON CONFLICT(layer, id) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in columns[2:]),
+                rows,
+            )
+
+            # An updated feature keeps its key, so its bounds are replaced in place
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO features_rtree "
+                "SELECT key, ?, ?, ?, ? FROM features WHERE layer = ? AND id = ?",
+                bounds,
+            )
+
+        return len(rows)
+
+    @staticmethod
+    def __feature_row(feature: dict, layer: str) -> typing.Optional[tuple]:
+        """
+        Converts a feature to its row in the features table, and in the R-tree index
+
+        :param feature: The GeoJSON feature
+        :type feature: dict
+
+        :param layer: The layer of the feature
+        :type layer: str
+
+        :return: The two rows, or None if the feature has no ID or no geometry
+        :rtype: typing.Optional[tuple]
+        """
+
+        properties = feature.get("properties") or {}
+        feature_id = feature.get("id", properties.get("id"))
+
+        if feature_id is None or feature_id == "":
+            logger.warning("Skipping feature without an ID")
+            return None
+
+        # The numeric IDs are stored as text, as the string IDs of the sequences are
+        feature_id = str(feature_id)
+
+        geometry = feature.get("geometry") or {}
+        bounds = geometry_bounds(geometry)
+
+        if bounds is None:
+            logger.warning(f"Skipping feature {feature_id} without a geometry")
+            return None
+
+        is_point = geometry.get("type") == "Point"
+
+        values = []
+        for column in LocalStore.COLUMNS:
+            value = properties.get(column)
+
+            # Booleans are stored as integers, the other values as they are
+            values.append(
+                value if not isinstance(value, (dict, list)) else codec.dumps(value).decode("utf-8")
+            )
+
+        return (
+            (
+                feature_id,
+                layer,
+                *values,
+                bounds[0] if is_point else None,
+                bounds[1] if is_point else None,
+                codec.dumps(feature).decode("utf-8"),
+            ),
+            (bounds[0], bounds[2], bounds[1], bounds[3], layer, feature_id),
+        )
+
+    def count(self, layer: str = None) -> int:
+        """
+        Counts the stored features
+
+        :param layer: The layer to count the features of, defaults to all the layers
+        :type layer: str
+
+        :return: The number of features
+        :rtype: int
+        """
+
+        with self.__lock:
+            if layer is None:
+                cursor = self.__connection.execute("SELECT COUNT(*) FROM features")
+            else:
+                cursor = self.__connection.execute(
+                    "SELECT COUNT(*) FROM features WHERE layer = ?", (layer,)
+                )
+
+            return cursor.fetchone()[0]
+
+    def get(
+        self, feature_id: typing.Union[int, str], layer: str = None
+    ) -> typing.Optional[tuple]:
+        """
+        Gets a stored feature by its ID
+
+        :param feature_id: The ID of the feature
+        :type feature_id: typing.Union[int, str]
+
+        :param layer: The layer of the feature, defaults to the first layer storing the ID
+        :type layer: str
+
+        :return: The layer of the feature and the feature, or None if it is not stored
+        :rtype: typing.Optional[tuple]
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT layer, feature FROM features "
+                "WHERE id = ? AND (? IS NULL OR layer = ?) ORDER BY key LIMIT 1",
+                (str(feature_id), layer, layer),
+            ).fetchone()
+
+        return None if row is None else (row[0], codec.loads(row[1]))
+
+    def delete(self, ids: list, layer: str = None) -> int:
+        """
+        Deletes the features with the given IDs
+
+        :param ids: The IDs of the features
+        :type ids: list
+
+        :param layer: The layer to delete the features from, defaults to all the layers
+        :type layer: str
+
+        :return: The number of features deleted
+        :rtype: int
+        """
+
+        where = "id IN (SELECT value FROM json_each(?)) AND (? IS NULL OR layer = ?)"
+        params = (
+            codec.dumps([str(feature_id) for feature_id in ids]).decode("utf-8"),
+            layer,
+            layer,
+        )
+
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                f"DELETE FROM features_rtree WHERE key IN (SELECT key FROM features WHERE {where})",
+                params,
+            )
+            return self.__connection.execute(
+                f"DELETE FROM features WHERE {where}", params
+            ).rowcount
+
+    def query(self, layer: str = None, components: list = None) -> list:
+        """
+        Selects the stored features passing the given filters
+
+        The filters are the components of `mapillary.utils.filter.pipeline`, and select the
+        same features. The ones on the indexed columns and on the bounds run as SQL, while
+        the geometric ones ('haversine_dist', 'in_shape') use the R-tree to narrow down the
+        features before being applied exactly, as 'hits_by_look_at' is, by the pipeline
+
+        :param layer: The layer to select the features of, defaults to all the layers
+        :type layer: str
+
+        :param components: The filters to apply, as given to `pipeline`
+        :type components: list
+
+        :return: The filtered feature list
+        :rtype: list
+        """
+
+        clauses, params, remaining = [], [], []
+
+        if layer is not None:
+            clauses.append("f.layer = ?")
+            params.append(layer)
+
+        for component in components or []:
+
+            # If component is simply empty, continue to next iteration
+            if component == {}:
+                continue
+
+            translated = self.__translate(
+                component["filter"], list(component.values())[1:]
+            )
+
+            if translated is None:
+                remaining.append(component)
+                continue
+
+            clause, clause_params, is_exact = translated
+            clauses.append(clause)
+            params.extend(clause_params)
+
+            # Geometric filters are only narrowed down, and applied exactly afterwards
+            if not is_exact:
+                remaining.append(component)
+
+        sql = "SELECT f.feature FROM features AS f"
+
+        if any("r." in clause for clause in clauses):
+            sql += " JOIN features_rtree AS r ON r.key = f.key"
+
+        if clauses:
+            sql += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+
+        logger.debug(f"Querying the local store, {sql}, {params}")
+
+        with self.__lock:
+            features = [
+                codec.loads(row[0]) for row in self.__connection.execute(sql, params)
+            ]
+
+        if remaining:
+            features = pipeline(data={"features": features}, components=remaining)
+
+        return features
+
+    @staticmethod
+    def __translate(name: str, args: list) -> typing.Optional[tuple]:
+        """
+        Translates a filter of `pipeline` to an SQL clause
+
+        :param name: The name of the filter
+        :type name: str
+
+        :param args: The arguments of the filter, in the order of its parameters
+        :type args: list
+
+        :return: The clause, its parameters and whether it is exact, or None if the filter
+            can only be applied by the pipeline
+        :rtype: typing.Optional[tuple]
+        """
+
+        if name == "max_captured_at":
+            return "f.captured_at <= ?", [date_to_unix_timestamp(args[0])], True
+
+        if name == "min_captured_at":
+            return "f.captured_at >= ?", [date_to_unix_timestamp(args[0])], True
+
+        if name == "existed_at":
+            return "f.first_seen_at > ?", [date_to_unix_timestamp(args[0])], True
+
+        if name == "existed_before":
+            return "f.first_seen_at <= ?", [date_to_unix_timestamp(args[0])], True
+
+        if name == "image_type":
+            # As in the pipeline, anything but 'pano' selects the flat images
+            return "f.is_pano = ?", [1 if args[0] == "pano" else 0], True
+
+        if name == "organization_id":
+            return LocalStore.__in_clause("f.organization_id", args[0])
+
+        if name == "sequence_id":
+            return LocalStore.__in_clause("f.sequence_id", args[0])
+
+        if name == "filter_values":
+            column = args[1] if len(args) > 1 else "value"
+
+            return LocalStore.__in_clause(
+                (
+                    f"f.{column}"
+                    if column in LocalStore.COLUMNS
+                    else f"json_extract(f.feature, '$.properties.\"{column}\"')"
+                ),
+                args[0],
+            )
+
+        if name == "compass_angle":
+            angles = args[0] if args else (0.0, 360.0)
+
+            # The same checks as the pipeline
+            if len(angles) != 2:
+                raise ValueError("Angles must be a tuple of length 2")
+            if angles[0] > angles[1]:
+                raise ValueError("First angle must be less than second angle")
+            if angles[0] < 0.0 or angles[1] > 360.0:
+                raise ValueError("Angles must be between 0 and 360")
+
+            return "f.compass_angle BETWEEN ? AND ?", list(angles), True
+
+        if name == "features_in_bounding_box":
+            bbox = args[0]
+            clause, params = LocalStore.__bounds_clause(
+                bbox["west"], bbox["south"], bbox["east"], bbox["north"]
+            )
+
+            # The bounding box filter is strict, and checks the position of points exactly
+            return (
+                f"{clause} AND (f.x IS NULL OR "
+                "(f.x > ? AND f.x < ? AND f.y > ? AND f.y < ?))",
+                params + [bbox["west"], bbox["east"], bbox["south"], bbox["north"]],
+                True,
+            )
+
+        if name == "haversine_dist":
+            radius, coords = args[0], args[1]
+            unit = args[2] if len(args) > 2 else "m"
+
+            # The length of a degree of latitude, in the unit of the radius, with a margin
+            degree = haversine.haversine((0, 0), (1, 0), unit=unit) * 0.99
+            latitude_delta = radius / degree
+            longitude_delta = latitude_delta / max(
+                math.cos(math.radians(min(abs(coords[1]) + latitude_delta, 90.0))),
+                1e-6,
+            )
+
+            clause, params = LocalStore.__bounds_clause(
+                coords[0] - longitude_delta,
+                coords[1] - latitude_delta,
+                coords[0] + longitude_delta,
+                coords[1] + latitude_delta,
+            )
+            return clause, params, False
+
+        if name == "in_shape":
+            clause, params = LocalStore.__bounds_clause(*args[0].bounds)
+            return clause, params, False
+
+        return None
+
+    @staticmethod
+    def __in_clause(column: str, values) -> tuple:
+        """
+        Builds a clause selecting the features whose column is one of the values
+
+        :param column: The column, or SQL expression
+        :type column: str
+
+        :param values: The values, or a single value
+        :type values: typing.Union[list, str, int]
+
+        :return: The clause, its parameters and whether it is exact
+        :rtype: tuple
+        """
+
+        if isinstance(values, (str, int)):
+            values = [values]
+
+        return (
+            f"{column} IN (SELECT value FROM json_each(?))",
+            [codec.dumps(list(values)).decode("utf-8")],
+            True,
+        )
+
+    @staticmethod
+    def __bounds_clause(west: float, south: float, east: float, north: float) -> tuple:
+        """
+        Builds a clause selecting, through the R-tree, the features intersecting the bounds
+
+        :return: The clause and its parameters
+        :rtype: tuple
+        """
+
+        return (
+            "r.min_x <= ? AND r.max_x >= ? AND r.min_y <= ? AND r.max_y >= ?",
+            [east, west, north, south],
+        )
@@ -12,8 +12,11 @@ This package contains all the internal utilities used within the Mapillary pytho
 """
 
 from . import auth  # noqa: F401
+from . import codec  # noqa: F401
+from . import dependency  # noqa: F401
 from . import extract  # noqa: F401
 from . import filter  # noqa: F401
 from . import format  # noqa: F401
+from . import spatial  # noqa: F401
 from . import time  # noqa: F401
 from . import verify  # noqa: F401
@@ -18,6 +18,7 @@ from functools import wraps
 
 # Local imports
 from mapillary.models.client import Client
+from mapillary.models.config import Config
 from mapillary.models.exceptions import AuthError
 
 
@@ -51,7 +52,8 @@ def auth():
             :return: Return the specified function with args, kwargs
             """
 
-            if Client.get_token() == "":
+            # The local stores of the offline mode need no access token
+            if Client.get_token() == "" and not Config.offline:
                 # If empty, raise exception
                 raise AuthError("Function called without setting the access token")
 
@@ -0,0 +1,264 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.utils.codec
+=====================
+
+This module deals with the JSON encoding and decoding of the SDK. Every API response, cache
+entry, local store and saved file goes through it, so that the same backend is used everywhere.
+
+The backend is orjson when it is installed, through `pip install "mapillary[json]"`, and the
+standard library otherwise, see `mapillary.models.config.Config.json_codec`. Both backends
+produce the same compact UTF-8 bytes.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import io
+import json
+import typing
+
+# Local imports
+# # Models
+from mapillary.models.config import Config
+from mapillary.models.exceptions import InvalidOptionError
+
+# # Utils
+from mapillary.utils.dependency import import_optional
+
+# The backends that can be configured, 'auto' being orjson when installed
+BACKENDS = ["auto", "orjson", "json"]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def backend() -> str:
+    """
+    Gives the JSON backend in use, as configured through `Config.json_codec`
+
+    :raises InvalidOptionError: Raised when an unknown backend is configured
+
+    :raises MissingDependencyError: Raised when orjson is configured, but not installed
+
+    :return: Either 'orjson' or 'json'
+    :rtype: str
+    """
+
+    if Config.json_codec not in BACKENDS:
+        raise InvalidOptionError(
+            param="json_codec", value=Config.json_codec, options=BACKENDS
+        )
+
+    if Config.json_codec == "json" or (Config.json_codec == "auto" and orjson is None):
+        return "json"
+
+    # Raises the missing extra when orjson was explicitly configured
+    if orjson is None:
+        import_optional(module="orjson", extra="json")
+
+    return "orjson"
+
+
+def default(obj: typing.Any) -> typing.Any:
+    """
+    Converts the objects that JSON does not support natively, i.e., the GeoJSON models of the
+    SDK, NumPy values and sets
+
+    :param obj: The object to convert
+    :type obj: typing.Any
+
+    :raises TypeError: Raised when the object can not be converted
+
+    :return: A JSON serializable representation of the object
+    :rtype: typing.Any
+    """
+
+    # The models of mapillary.models.geojson
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+
+    # NumPy arrays and scalars
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def round_coordinates(obj: typing.Any, precision: int) -> typing.Any:
+    """
+    Rounds the coordinates of GeoJSON geometries to the given number of decimals, leaving every
+    other number untouched
+
+    Usage::
+
+        >>> round_coordinates({'type': 'Point', 'coordinates': [12.3456789, 45.6789012]}, 5)
+        {'type': 'Point', 'coordinates': [12.34568, 45.6789]}
+
+    :param obj: A GeoJSON, as dictionaries and lists, or models of mapillary.models.geojson
+    :type obj: typing.Any
+
+    :param precision: The number of decimals to keep. 6 decimals are about 10 centimeters
+    :type precision: int
+
+    :return: A copy of the object, with the coordinates rounded
+    :rtype: typing.Any
+    """
+
+    def round_numbers(value: typing.Any) -> typing.Any:
+        if isinstance(value, float):
+            return round(value, precision)
+
+        if isinstance(value, (list, tuple)):
+            return [round_numbers(item) for item in value]
+
+        return value
+
+    if isinstance(obj, dict):
+        return {
+            key: (
+                round_numbers(value)
+                if key == "coordinates"
+                else round_coordinates(value, precision)
+            )
+            for key, value in obj.items()
+        }
+
+    if isinstance(obj, (list, tuple)):
+        return [round_coordinates(item, precision) for item in obj]
+
+    if hasattr(obj, "to_dict"):
+        return round_coordinates(obj.to_dict(), precision)
+
+    return obj
+
+
+def json_options(indent: int = None) -> dict:
+    """
+    Gives the options of the standard library encoder, matching the output of orjson
+
+    :param indent: The indentation of the output. Defaults to None, for a compact output
+    :type indent: int
+
+    :return: The keyword arguments of `json.dump` and `json.dumps`
+    :rtype: dict
+    """
+
+    return {
+        "default": default,
+        "ensure_ascii": False,
+        "indent": indent,
+        "separators": (",", ":") if indent is None else (",", ": "),
+    }
+
+
+def dumps(
+    obj: typing.Any, precision: typing.Optional[int] = None, indent: int = None
+) -> bytes:
+    """
+    Encodes an object as compact JSON
+
+    Usage::
+
+        >>> dumps({'type': 'Point', 'coordinates': [12.3456789, 45.6789012]}, precision=5)
+        b'{"type":"Point","coordinates":[12.34568,45.6789]}'
+
+    :param obj: The object to encode, which may contain models of mapillary.models.geojson
+    :type obj: typing.Any
+
+    :param precision: The number of decimals the coordinates are rounded to, see
+        `round_coordinates`. Defaults to None, keeping every decimal
+    :type precision: typing.Optional[int]
+
+    :param indent: The indentation of the output. Defaults to None, for a compact output
+    :type indent: int
+
+    :return: The UTF-8 encoded JSON
+    :rtype: bytes
+    """
+
+    if precision is not None:
+        obj = round_coordinates(obj, precision)
+
+    # orjson only indents by 2 spaces
+    if backend() == "orjson" and indent in (None, 2):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=default, option=option)
+
+    return json.dumps(obj, **json_options(indent)).encode("utf-8")
+
+
+def loads(data: typing.Union[bytes, bytearray, memoryview, str]) -> typing.Any:
+    """
+    Decodes JSON, without decoding bytes to a string first when orjson is in use
+
+    :param data: The JSON to decode
+    :type data: typing.Union[bytes, bytearray, memoryview, str]
+
+    :return: The decoded object
+    :rtype: typing.Any
+    """
+
+    if backend() == "orjson":
+        return orjson.loads(data)
+
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+
+    return json.loads(data)
+
+
+def dump(
+    obj: typing.Any,
+    file: typing.IO,
+    precision: typing.Optional[int] = None,
+    indent: int = None,
+) -> None:
+    """
+    Encodes an object as JSON into a file, see `dumps`
+
+    Text files are written as the standard library encodes, without holding the encoded object
+    in memory, unless orjson is in use. Large feature collections are better written a chunk
+    at a time, see `mapillary.controller.save.geojson_chunks`
+
+    :param obj: The object to encode
+    :type obj: typing.Any
+
+    :param file: A file or buffer, opened either in binary or in text mode
+    :type file: typing.IO
+
+    :param precision: The number of decimals the coordinates are rounded to
+    :type precision: typing.Optional[int]
+
+    :param indent: The indentation of the output. Defaults to None, for a compact output
+    :type indent: int
+
+    :return: None
+    :rtype: None
+    """
+
+    # Text files, e.g., opened with open(..., 'w') or gzip.open(..., 'wt')
+    # The standard library encoder is also used for the indentations orjson does not support
+    if isinstance(file, io.TextIOBase) and (backend() == "json" or indent not in (None, 2)):
+        if precision is not None:
+            obj = round_coordinates(obj, precision)
+
+        json.dump(obj, file, **json_options(indent))
+
+    elif isinstance(file, io.TextIOBase):
+        file.write(dumps(obj, precision=precision, indent=indent).decode("utf-8"))
+
+    else:
+        file.write(dumps(obj, precision=precision, indent=indent))
@@ -0,0 +1,45 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.utils.dependency
+==========================
+
+This module deals with the optional dependencies of the SDK, which are only imported by the
+functionalities that need them. They are installed through the extras of the package, e.g.,
+`pip install "mapillary[parquet]"`.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import importlib
+import types
+
+# Local imports
+# # Exceptions
+from mapillary.models.exceptions import MissingDependencyError
+
+
+def import_optional(module: str, extra: str) -> types.ModuleType:
+    """
+    Imports an optional dependency
+
+    :param module: The name of the module to import, e.g., 'pyarrow.parquet'
+    :type module: str
+
+    :param extra: The extra of the SDK that installs the module, e.g., 'parquet'
+    :type extra: str
+
+    :raises MissingDependencyError: Raised when the module is not installed
+
+    :return: The imported module
+    :rtype: types.ModuleType
+    """
+
+    try:
+        return importlib.import_module(module)
+
+    except ImportError:
+        raise MissingDependencyError(package=module.split(".")[0], extra=extra)
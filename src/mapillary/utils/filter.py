@@ -14,9 +14,11 @@ This module contains the filter utilies for high level filtering logic
 import logging
 
 import haversine
+import numpy
 from geojson import Point, Feature
 
 # Local imports
+from mapillary.utils.spatial import coordinates_array, looking_at
 from mapillary.utils.time import date_to_unix_timestamp
 from shapely.geometry import shape
 
@@ -541,10 +543,24 @@ def hits_by_look_at(data: list, at: dict) -> list:
     :rtype: list
     """
 
-    # Converting the `at` into a Feature object from TurfPy
-    at_feature = Feature(geometry=Point((at["lng"], at["lat"])))
+    if not data:
+        return []
+
+    # The bearings to `at` are computed for all the features at once, see `is_looking_at`
+    hits = looking_at(
+        coordinates=coordinates_array(data),
+        compass_angles=numpy.array(
+            [feature["properties"].get("compass_angle", -1) for feature in data],
+            dtype=numpy.float64,
+        ),
+        panoramas=numpy.array(
+            [bool(feature["properties"].get("is_pano")) for feature in data]
+        ),
+        longitude=at["lng"],
+        latitude=at["lat"],
+    )
 
-    return list(filter(lambda image: by_look_at_feature(image, at_feature), data))
+    return [feature for feature, hit in zip(data, hits) if hit]
 
 
 def in_shape(data: list, boundary) -> list:
@@ -577,3 +593,199 @@ def in_shape(data: list, boundary) -> list:
 
     # Return output
     return output
+
+
+def bbox_filter_components(bounding_box: dict, layer: str, filters: dict) -> list:
+    """
+    Builds the filter components applied to the images or sequences within a bounding box
+
+    :param bounding_box: A bounding box representation
+    :type bounding_box: dict
+
+    :param layer: Either 'image', 'sequence', 'overview'
+    :type layer: str
+
+    :param filters: The checked filters, see `mapillary.utils.verify.image_bbox_check`
+    :type filters: dict
+
+    :return: The components to pass to `mapillary.utils.filter.pipeline`
+    :rtype: list
+    """
+
+    return [
+        {"filter": "features_in_bounding_box", "bbox": bounding_box}
+        if layer == "image"
+        else {},
+        {
+            "filter": "max_captured_at",
+            "max_timestamp": filters.get("max_captured_at"),
+        }
+        if filters["max_captured_at"] is not None
+        else {},
+        {
+            "filter": "min_captured_at",
+            "min_timestamp": filters.get("min_captured_at"),
+        }
+        if filters["min_captured_at"] is not None
+        else {},
+        {"filter": "image_type", "type": filters.get("image_type")}
+        if filters["image_type"] is not None and filters["image_type"] != "all"
+        else {},
+        {
+            "filter": "organization_id",
+            "organization_ids": filters.get("organization_id"),
+        }
+        if filters["organization_id"] is not None
+        else {},
+        {"filter": "sequence_id", "ids": filters.get("sequence_id")}
+        if layer == "image" and filters["sequence_id"] is not None
+        else {},
+        {"filter": "compass_angle", "angles": filters.get("compass_angle")}
+        if layer == "image" and filters["compass_angle"] is not None
+        else {},
+    ]
+
+
+def close_to_filter_components(kwargs: dict) -> list:
+    """
+    Builds the filter components applied to the images close to a point, leaving out the
+    radius, which depends on the point
+
+    :param kwargs: The checked kwargs, see `mapillary.utils.verify.image_check`
+    :type kwargs: dict
+
+    :return: The components to pass to `mapillary.utils.filter.pipeline`
+    :rtype: list
+    """
+
+    return [
+        # Filter using kwargs.min_captured_at
+        {
+            "filter": "min_captured_at",
+            "min_timestamp": kwargs["min_captured_at"],
+        }
+        if "min_captured_at" in kwargs
+        else {},
+        # Filter using kwargs.max_captured_at
+        {
+            "filter": "max_captured_at",
+            "max_timestamp": kwargs["max_captured_at"],
+        }
+        if "max_captured_at" in kwargs
+        else {},
+        # Filter using kwargs.image_type, keeping both types for 'all'
+        {"filter": "image_type", "type": kwargs["image_type"]}
+        if kwargs.get("image_type") is not None and kwargs["image_type"] != "all"
+        else {},
+        # Filter using kwargs.organization_id
+        {
+            "filter": "organization_id",
+            "organization_ids": kwargs["organization_id"],
+        }
+        if "organization_id" in kwargs
+        else {},
+    ]
+
+
+def shape_filter_components(boundary, filters: dict) -> list:
+    """
+    Builds the filter components applied to the features within a shape
+
+    :param boundary: The shape as a shapely geometry
+    :type boundary: shapely.geometry.base.BaseGeometry
+
+    :param filters: Different filters that may be applied to the output
+    :type filters: dict
+
+    :return: The components to pass to `mapillary.utils.filter.pipeline`
+    :rtype: list
+    """
+
+    return [
+        # Get only features within the given boundary
+        {"filter": "in_shape", "boundary": boundary},
+        # Filter using filters.min_captured_at
+        {
+            "filter": "min_captured_at",
+            "min_timestamp": filters["min_captured_at"],
+        }
+        if "min_captured_at" in filters
+        else {},
+        # Filter using filters.max_captured_at
+        {
+            "filter": "max_captured_at",
+            "max_timestamp": filters["max_captured_at"],
+        }
+        if "max_captured_at" in filters
+        else {},
+        # Filter using filters.image_type, keeping both types for 'all'
+        {"filter": "image_type", "type": filters["image_type"]}
+        if filters.get("image_type") is not None and filters["image_type"] != "all"
+        else {},
+        # Filter using filters.organization_id
+        {
+            "filter": "organization_id",
+            "organization_ids": filters["organization_id"],
+        }
+        if "organization_id" in filters
+        else {},
+        # Filter using filters.sequence_id
+        {"filter": "sequence_id", "ids": filters.get("sequence_id")}
+        if "sequence_id" in filters
+        else {},
+        # Filter using filters.compass_angle
+        {
+            "filter": "compass_angle",
+            "angles": filters.get("compass_angle"),
+        }
+        if "compass_angle" in filters
+        else {},
+    ]
+
+
+def map_features_filter_components(
+    bbox: dict, filter_values: list, filters: dict
+) -> list:
+    """
+    Builds the filter components applied to the map features within a bounding box
+
+    :param bbox: Bounding box coordinates as argument
+    :type bbox: dict
+
+    :param filter_values: a list of filter values supported by the API.
+    :type filter_values: list
+
+    :param filters: The checked chronological filters, see
+        `mapillary.utils.verify.points_traffic_signs_check`
+    :type filters: dict
+
+    :return: The components to pass to `mapillary.utils.filter.pipeline`
+    :rtype: list
+    """
+
+    return [
+        # Skip filtering based on filter_values if they're not specified by the user
+        {
+            "filter": "filter_values",
+            "values": filter_values,
+            "property": "value",
+        }
+        if filter_values is not None
+        else {},
+        # Check if the features actually lie within the bbox
+        {"filter": "features_in_bounding_box", "bbox": bbox},
+        # Checks if the feature existed after a given date
+        {
+            "filter": "existed_at",
+            "existed_at": filters["existed_at"],
+        }
+        if filters["existed_at"] is not None
+        else {},
+        # Filter out all the features after a given timestamp
+        {
+            "filter": "existed_before",
+            "existed_before": filters["existed_before"],
+        }
+        if filters["existed_before"] is not None
+        else {},
+    ]
@@ -13,16 +13,25 @@ This module deals with converting data to and from different file formats.
 
 # Package imports
 import base64
-import json
+import functools
+import re
 import typing
 import mapbox_vector_tile
+import numpy
+import shapely
+import shapely.geometry
 from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, ROUND_HALF_EVEN
 from typing import Union
 
 # Local imports
 # # Models
 from mapillary.models.geojson import Coordinates, GeoJSON
 
+# # Utils
+from mapillary.utils import codec
+
 
 def feature_to_geojson(json_data: dict) -> dict:
     """
@@ -183,7 +192,9 @@ def merged_features_list_to_geojson(features_list: list) -> str:
     :rtype: str
     """
 
-    return json.dumps({"type": "FeatureCollection", "features": features_list})
+    return codec.dumps({"type": "FeatureCollection", "features": features_list}).decode(
+        "utf-8"
+    )
 
 
 def detection_features_to_geojson(feature_list: list) -> dict:
@@ -320,18 +331,227 @@ def flatten_geojson(geojson: dict) -> list:
     *TODO*: Further testing needed with different geometries, e.g., Polygon, etc.
     """
 
-    for feature in geojson["features"]:
-        # Check if the geometry is a Point
+    # The features are copied, rather than modified in place
+    return [flatten_feature(feature) for feature in geojson["features"]]
+
+
+def flatten_feature(feature: dict) -> dict:
+    """
+    Flattens a single GeoJSON feature, see `flatten_geojson`. The feature itself is left
+    unmodified
+
+    :param feature: The GeoJSON feature to flatten
+    :type feature: dict
+
+    :return: The flattened feature
+    :rtype: dict
+    """
+
+    flattened = {"geometry": feature["geometry"], **feature["properties"]}
+
+    # Check if the geometry is a Point
+    if feature["geometry"]["type"] == "Point":
+        # Add longitude and latitude properties to the feature
+        flattened["longitude"] = feature["geometry"]["coordinates"][0]
+        flattened["latitude"] = feature["geometry"]["coordinates"][1]
+
+    return flattened
+
+
+def iterate_features(data: typing.Union[str, dict, GeoJSON, typing.Iterable]) -> typing.Iterator:
+    """
+    Iterates over the features of any supported feature source, without copying them
+
+    :param data: Either a GeoJSON string, a GeoJSON dictionary, a GeoJSON object, or an iterable
+        (e.g., a generator) of GeoJSON features
+    :type data: typing.Union[str, dict, GeoJSON, typing.Iterable]
+
+    :return: An iterator over the GeoJSON features, as dictionaries
+    :rtype: typing.Iterator
+    """
+
+    # A serialized GeoJSON
+    if isinstance(data, (str, bytes)):
+        data = codec.loads(data)
+
+    # A GeoJSON object
+    if isinstance(data, GeoJSON):
+        data = data.to_dict()
+
+    # A feature collection, or a single feature
+    if isinstance(data, dict):
+        return iter(data["features"] if "features" in data else [data])
+
+    # Any other iterable of features
+    return iter(data)
+
+
+def features_schema(features: typing.Iterable) -> list:
+    """
+    Discovers the columns of flattened features, in the order they are first seen, see
+    `flatten_feature`
+
+    :param features: An iterable of GeoJSON features
+    :type features: typing.Iterable
+
+    :return: The union of the keys of all the flattened features
+    :rtype: list
+    """
+
+    # A dictionary keeps the insertion order, unlike a set
+    columns = {"geometry": None}
+
+    for feature in features:
+        columns.update(dict.fromkeys(feature["properties"]))
+
         if feature["geometry"]["type"] == "Point":
-            # Add longitude and latitude properties to the feature
-            feature["properties"]["longitude"] = feature["geometry"]["coordinates"][0]
-            feature["properties"]["latitude"] = feature["geometry"]["coordinates"][1]
+            columns.update(dict.fromkeys(["longitude", "latitude"]))
+
+    return list(columns)
+
+
+def wkt_number(value: typing.Union[int, float]) -> str:
+    """
+    Formats a coordinate the way shapely writes it in WKT, i.e., with at most 16 decimals,
+    12 rather than 12.0, and 1e-7 rather than 1e-07
+
+    :param value: The coordinate
+    :type value: typing.Union[int, float]
+
+    :return: The formatted coordinate
+    :rtype: str
+    """
+
+    value = float(value)
+
+    # Whole numbers are written in full, without a decimal part
+    if value.is_integer() and abs(value) <= 1e16:
+        return str(int(value))
+
+    text = repr(value)
+
+    # Exponents are written without leading zeros
+    if "e" in text:
+        return re.sub(r"e([+-])0*(\d)", r"e\1\2", text)
+
+    # The shortest representation, rounded to at most 16 decimals
+    if len(text) - text.index(".") - 1 > 16:
+        return (
+            format(Decimal(text).quantize(Decimal("1e-16"), rounding=ROUND_HALF_EVEN), "f")
+            .rstrip("0")
+            .rstrip(".")
+        )
+
+    return text
+
+
+def geometry_to_wkt(geometry: dict) -> str:
+    """
+    Converts a GeoJSON geometry to well-known text (WKT)
+
+    Points, which make up most of the features of the SDK, are formatted directly, without
+    building shapely objects. Other geometries are converted through shapely
+
+    :param geometry: The GeoJSON geometry
+    :type geometry: dict
+
+    :return: The geometry in WKT
+    :rtype: str
+    """
+
+    coordinates = geometry.get("coordinates")
+
+    if geometry["type"] == "Point" and coordinates and len(coordinates) in (2, 3):
+        return (
+            f"POINT{' Z' if len(coordinates) == 3 else ''} "
+            f"({' '.join(wkt_number(value) for value in coordinates)})"
+        )
+
+    return shapely.geometry.shape(geometry).wkt
+
+
+def geometries_to_wkb(geometries: list) -> list:
+    """
+    Converts GeoJSON geometries to well-known binary (WKB)
+
+    When all the geometries are 2D points, they are converted at once, as a single array of
+    coordinates
+
+    :param geometries: The GeoJSON geometries
+    :type geometries: list
+
+    :return: The geometries in WKB
+    :rtype: list
+    """
+
+    if all(
+        geometry["type"] == "Point" and len(geometry["coordinates"]) == 2
+        for geometry in geometries
+    ):
+        points = shapely.points(
+            numpy.asarray(
+                [geometry["coordinates"] for geometry in geometries], dtype=float
+            ).reshape(-1, 2)
+        )
+    else:
+        points = [shapely.geometry.shape(geometry) for geometry in geometries]
+
+    return list(shapely.to_wkb(points))
+
+
+def geometry_bounds(geometry: dict) -> typing.Optional[list]:
+    """
+    Computes the bounds of a GeoJSON geometry, from its coordinates
 
-    # Return the flattened geojson
-    return [
-        {"geometry": _feature["geometry"], **_feature["properties"]}
-        for _feature in geojson["features"]
-    ]
+    :param geometry: The GeoJSON geometry
+    :type geometry: dict
+
+    :return: The bounds, as [west, south, east, north], or None for an empty geometry
+    :rtype: typing.Optional[list]
+    """
+
+    coordinates = (geometry or {}).get("coordinates")
+
+    # Points, which make up most of the features of the SDK, need no walk
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [coordinates[0], coordinates[1], coordinates[0], coordinates[1]]
+
+    west = south = float("inf")
+    east = north = float("-inf")
+
+    # Walk down the nested coordinates, to their positions
+    stack = [coordinates] if coordinates else []
+    while stack:
+        item = stack.pop()
+
+        if item and isinstance(item[0], (int, float)):
+            west, east = min(west, item[0]), max(east, item[0])
+            south, north = min(south, item[1]), max(north, item[1])
+        else:
+            stack.extend(item)
+
+    return None if west == float("inf") else [west, south, east, north]
+
+
+def first_position(geometry: dict) -> typing.Optional[list]:
+    """
+    Gives the first position of a GeoJSON geometry, e.g., the start of a line, or the first
+    vertex of the exterior ring of a polygon
+
+    :param geometry: The GeoJSON geometry
+    :type geometry: dict
+
+    :return: The position, as [longitude, latitude], or None for an empty geometry
+    :rtype: typing.Optional[list]
+    """
+
+    coordinates = (geometry or {}).get("coordinates")
+
+    # Walk down the first of the nested coordinates, to a position
+    while coordinates and not isinstance(coordinates[0], (int, float)):
+        coordinates = coordinates[0]
+
+    return list(coordinates[:2]) if coordinates else None
 
 
 def geojson_to_polygon(geojson: dict) -> GeoJSON:
@@ -649,6 +869,144 @@ def decode_pixel_geometry_in_geojson(
     return GeoJSON(geojson=data)
 
 
+def pixel_geometry_to_arrays(
+    base64_string: str, normalized: bool = True, width: int = 4096, height: int = 4096
+) -> typing.List[numpy.ndarray]:
+    """
+    Decodes the pixel geometry of a detection into NumPy arrays, one per ring, or line, of the
+    geometries it contains
+
+    Usage::
+
+        >>> pixel_geometry_to_arrays('Gh4KBm1weS1vchIPGAMiCwnEJdAUEgwbABwPKIAgeAI=')
+        [array([[0.58642578, 0.67773438],
+               [0.58789062, 0.68115234],
+               [0.58789062, 0.67773438],
+               [0.58642578, 0.67773438]])]
+
+    :param base64_string: The pixel geometry encoded as a vector tile
+    :type base64_string: str
+
+    :param normalized: If True, the coordinates are divided by the width and the height, to
+        fall between 0 and 1. Else, they are kept in pixels. Defaults to True
+    :type normalized: bool
+
+    :param width: The width of the pixel geometry, defaults to 4096
+    :type width: int
+
+    :param height: The height of the pixel geometry, defaults to 4096
+    :type height: int
+
+    :return: The arrays of (x, y) coordinates, of shape (n, 2), in the order of the features
+        of the tile. The exterior ring of a polygon comes before its holes
+    :rtype: typing.List[numpy.ndarray]
+    """
+
+    # The number of nested lists above the coordinate pairs of each geometry type
+    depths = {
+        "Point": 0,
+        "MultiPoint": 1,
+        "LineString": 1,
+        "MultiLineString": 2,
+        "Polygon": 2,
+        "MultiPolygon": 3,
+    }
+
+    scale = numpy.array([width, height], dtype=numpy.float64)
+
+    def rings(coordinates: list, depth: int) -> typing.Iterator[list]:
+        if depth <= 1:
+            yield [coordinates] if depth == 0 else coordinates
+            return
+
+        for part in coordinates:
+            yield from rings(part, depth - 1)
+
+    arrays = []
+
+    for layer in mapbox_vector_tile.decode(base64.b64decode(base64_string)).values():
+        for feature in layer["features"]:
+            geometry = feature["geometry"]
+
+            for ring in rings(geometry["coordinates"], depths[geometry["type"]]):
+                array = numpy.asarray(ring, dtype=numpy.float64).reshape(-1, 2)
+                arrays.append(array / scale if normalized else array)
+
+    return arrays
+
+
+def decode_pixel_geometries(
+    detections: typing.Union[dict, GeoJSON, typing.Iterable[str]],
+    normalized: bool = True,
+    width: int = 4096,
+    height: int = 4096,
+    workers: int = None,
+) -> typing.List[typing.List[numpy.ndarray]]:
+    """
+    Decodes the pixel geometries of a whole collection of detections at once, see
+    `pixel_geometry_to_arrays`
+
+    Usage::
+
+        >>> detections = mly.interface.get_detections_with_image_id(image_id=1933525276802129)
+        >>> for detection, arrays in zip(
+        ...     detections.to_dict()['features'], decode_pixel_geometries(detections, workers=4)
+        ... ):
+        ...     print(detection['properties']['value'], arrays[0].shape)
+
+    :param detections: The detections, as a GeoJSON whose features have a 'pixel_geometry'
+        property, or an iterable of the encoded pixel geometries
+    :type detections: typing.Union[dict, GeoJSON, typing.Iterable[str]]
+
+    :param normalized: If True, the coordinates fall between 0 and 1, else they are kept in
+        pixels. Defaults to True
+    :type normalized: bool
+
+    :param width: The width of the pixel geometries, defaults to 4096
+    :type width: int
+
+    :param height: The height of the pixel geometries, defaults to 4096
+    :type height: int
+
+    :param workers: The number of processes the detections are decoded across. Defaults to
+        None, decoding them in the current process
+    :type workers: int
+
+    :return: The arrays of each detection, in the order of the detections. A detection without
+        a pixel geometry has no array
+    :rtype: typing.List[typing.List[numpy.ndarray]]
+    """
+
+    if isinstance(detections, (dict, GeoJSON)):
+        detections = [
+            feature["properties"].get("pixel_geometry")
+            for feature in iterate_features(detections)
+        ]
+
+    detections = list(detections)
+
+    decode = functools.partial(
+        pixel_geometry_to_arrays, normalized=normalized, width=width, height=height
+    )
+
+    # The detections without a pixel geometry are not sent to the workers
+    encoded = [detection for detection in detections if detection]
+
+    if workers is not None and workers > 1 and len(encoded) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            decoded = iter(
+                executor.map(
+                    decode,
+                    encoded,
+                    chunksize=max(1, len(encoded) // (workers * 4)),
+                )
+            )
+
+            return [next(decoded) if detection else [] for detection in detections]
+
+    return [decode(detection) if detection else [] for detection in detections]
+
+
 def coord_or_list_to_dict(data: Union[Coordinates, list, dict]) -> dict:
     """
     Converts a Coordinates object or a coordinates list to a dictionary
@@ -0,0 +1,376 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+mapillary.utils.spatial
+=======================
+
+This module contains the vectorized spatial computations of the SDK, which work on NumPy arrays
+of coordinates rather than on one feature at a time.
+
+- Copyright: (c) 2021 Facebook
+- License: MIT LICENSE
+"""
+
+# Package imports
+import math
+import typing
+
+import numpy
+
+# Local imports
+from mapillary.models.exceptions import InvalidOptionError
+
+# The mean radius of the Earth in meters, as used by the haversine package
+EARTH_RADIUS = 6371008.8
+
+# The latitude bounds of the Web Mercator tiles
+MAX_LATITUDE = 85.0511287798066
+
+# The largest number of point to segment distances computed at once
+CHUNK_SIZE = 1 << 20
+
+
+def coordinates_array(features: typing.Iterable[dict]) -> numpy.ndarray:
+    """
+    Gathers the coordinates of point features into an array
+
+    :param features: The GeoJSON point features
+    :type features: typing.Iterable[dict]
+
+    :return: The (longitude, latitude) pairs, of shape (n, 2)
+    :rtype: numpy.ndarray
+    """
+
+    return numpy.array(
+        [feature["geometry"]["coordinates"][:2] for feature in features],
+        dtype=numpy.float64,
+    ).reshape(-1, 2)
+
+
+def haversine_distances(
+    longitude: typing.Union[float, numpy.ndarray],
+    latitude: typing.Union[float, numpy.ndarray],
+    coordinates: numpy.ndarray,
+) -> numpy.ndarray:
+    """
+    Computes the haversine distances from one point, or from as many points, to the given
+    coordinates
+
+    Usage::
+
+        >>> haversine_distances(13.0, 48.0, numpy.array([[13.0, 48.001], [13.001, 48.0]]))
+        array([111.19508023,  74.40403146])
+
+    :param longitude: The longitude of the point, or an array of longitudes
+    :type longitude: typing.Union[float, numpy.ndarray]
+
+    :param latitude: The latitude of the point, or an array of latitudes
+    :type latitude: typing.Union[float, numpy.ndarray]
+
+    :param coordinates: The (longitude, latitude) pairs, of shape (n, 2)
+    :type coordinates: numpy.ndarray
+
+    :return: The distances, in meters, of shape (n,)
+    :rtype: numpy.ndarray
+    """
+
+    longitudes = numpy.radians(coordinates[:, 0])
+    latitudes = numpy.radians(coordinates[:, 1])
+    longitude, latitude = numpy.radians(longitude), numpy.radians(latitude)
+
+    a = (
+        numpy.sin((latitudes - latitude) / 2) ** 2
+        + numpy.cos(latitude)
+        * numpy.cos(latitudes)
+        * numpy.sin((longitudes - longitude) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(numpy.clip(a, 0.0, 1.0)))
+
+
+def tile_indices(
+    longitudes: numpy.ndarray, latitudes: numpy.ndarray, zoom: int
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Computes the x and y indices of the Web Mercator tiles containing points, as
+    `mercantile.tile` does for a single point
+
+    Usage::
+
+        >>> tile_indices(numpy.array([12.95]), numpy.array([48.05]), 14)
+        (array([8781]), array([5691]))
+
+    :param longitudes: The longitudes of the points
+    :type longitudes: numpy.ndarray
+
+    :param latitudes: The latitudes of the points
+    :type latitudes: numpy.ndarray
+
+    :param zoom: The zoom level of the tiles
+    :type zoom: int
+
+    :return: The x and the y indices of the tiles, of the same shape as the points
+    :rtype: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    """
+
+    count = 2 ** zoom
+
+    # The points past the Web Mercator latitudes fall in the edge tiles
+    sine = numpy.sin(
+        numpy.radians(
+            numpy.clip(
+                numpy.asarray(latitudes, dtype=numpy.float64), -MAX_LATITUDE, MAX_LATITUDE
+            )
+        )
+    )
+
+    x = (numpy.asarray(longitudes, dtype=numpy.float64) + 180.0) / 360.0
+    y = 0.5 - 0.25 * numpy.log((1.0 + sine) / (1.0 - sine)) / numpy.pi
+
+    return (
+        numpy.clip(numpy.floor(x * count), 0, count - 1).astype(numpy.int64),
+        numpy.clip(numpy.floor(y * count), 0, count - 1).astype(numpy.int64),
+    )
+
+
+def route_distances(
+    coordinates: numpy.ndarray, route: numpy.ndarray
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Computes the distances from points to a route, and how far along the route each point
+    lies, i.e., the length of the route up to the closest point of the route
+
+    The segments of the route are projected on a plane tangent at each point, which is exact
+    enough for the segments close to the point, the only ones that matter
+
+    Usage::
+
+        >>> route_distances(
+        ...     numpy.array([[13.0005, 48.0001]]), numpy.array([[13.0, 48.0], [13.001, 48.0]])
+        ... )
+        (array([11.11950802]), array([37.20201573]))
+
+    :param coordinates: The (longitude, latitude) pairs of the points, of shape (n, 2)
+    :type coordinates: numpy.ndarray
+
+    :param route: The (longitude, latitude) pairs of the route, of shape (m, 2), with m > 1
+    :type route: numpy.ndarray
+
+    :return: The distances to the route, and the positions along the route, in meters, both of
+        shape (n,)
+    :rtype: typing.Tuple[numpy.ndarray, numpy.ndarray]
+    """
+
+    starts, ends = route[:-1], route[1:]
+
+    # The length of the route up to the start of each segment
+    lengths = haversine_distances(starts[:, 0], starts[:, 1], ends)
+    offsets = numpy.concatenate([[0.0], numpy.cumsum(lengths)[:-1]])
+
+    distances = numpy.empty(len(coordinates))
+    positions = numpy.empty(len(coordinates))
+
+    # Bounding the size of the point to segment matrices
+    step = max(1, CHUNK_SIZE // len(starts))
+    for chunk in range(0, len(coordinates), step):
+        points = coordinates[chunk:chunk + step]
+        scale = numpy.cos(numpy.radians(points[:, 1]))[:, None]
+
+        def project(ends: numpy.ndarray) -> typing.Tuple[numpy.ndarray, numpy.ndarray]:
+            # Across the antimeridian, the longitudes are taken the short way
+            longitudes = (ends[:, 0][None, :] - points[:, 0][:, None] + 180.0) % 360.0 - 180.0
+
+            return (
+                numpy.radians(longitudes) * scale * EARTH_RADIUS,
+                numpy.radians(ends[:, 1][None, :] - points[:, 1][:, None]) * EARTH_RADIUS,
+            )
+
+        (ax, ay), (bx, by) = project(starts), project(ends)
+        dx, dy = bx - ax, by - ay
+        squared = dx ** 2 + dy ** 2
+
+        # The fraction of each segment at which it is the closest to the point
+        fraction = numpy.clip(
+            numpy.divide(
+                -(ax * dx + ay * dy),
+                squared,
+                out=numpy.zeros_like(squared),
+                where=squared > 0,
+            ),
+            0.0,
+            1.0,
+        )
+        segment_distances = numpy.hypot(ax + fraction * dx, ay + fraction * dy)
+
+        rows = numpy.arange(len(points))
+        closest = numpy.argmin(segment_distances, axis=1)
+
+        distances[chunk:chunk + step] = segment_distances[rows, closest]
+        positions[chunk:chunk + step] = (
+            offsets[closest] + fraction[rows, closest] * lengths[closest]
+        )
+
+    return distances, positions
+
+
+def route_coordinates(
+    linestring: typing.Union[dict, list, numpy.ndarray]
+) -> numpy.ndarray:
+    """
+    Gathers the coordinates of a route
+
+    :param linestring: The route, as a GeoJSON LineString, a Feature or a FeatureCollection
+        holding one, or a list of [longitude, latitude] pairs
+    :type linestring: typing.Union[dict, list, numpy.ndarray]
+
+    :raises InvalidOptionError: Raised when the route is not a LineString of two points or more
+
+    :return: The (longitude, latitude) pairs of the route, of shape (m, 2)
+    :rtype: numpy.ndarray
+    """
+
+    # The models of mapillary.models.geojson
+    if hasattr(linestring, "to_dict"):
+        linestring = linestring.to_dict()
+
+    if isinstance(linestring, dict) and linestring.get("type") == "FeatureCollection":
+        linestring = (linestring.get("features") or [{}])[0]
+
+    if isinstance(linestring, dict) and linestring.get("type") == "Feature":
+        linestring = linestring.get("geometry") or {}
+
+    if isinstance(linestring, dict):
+        if linestring.get("type") != "LineString":
+            raise InvalidOptionError(
+                param="linestring",
+                value=linestring.get("type"),
+                options=["LineString"],
+            )
+
+        linestring = linestring["coordinates"]
+
+    route = numpy.asarray(linestring, dtype=numpy.float64)
+
+    if route.ndim != 2 or route.shape[0] < 2 or route.shape[1] < 2:
+        raise InvalidOptionError(
+            param="linestring",
+            value=f"an array of shape {route.shape}",
+            options=["two [longitude, latitude] pairs or more"],
+        )
+
+    return route[:, :2]
+
+
+def bearings(
+    coordinates: numpy.ndarray, longitude: float, latitude: float
+) -> numpy.ndarray:
+    """
+    Computes the initial bearings from points to a target, as `turfpy.measurement.bearing`
+    does for one point
+
+    Usage::
+
+        >>> bearings(numpy.array([[13.0, 48.0], [13.0, 48.002]]), 13.0, 48.001)
+        array([  0., 180.])
+
+    :param coordinates: The (longitude, latitude) pairs of the points, of shape (n, 2)
+    :type coordinates: numpy.ndarray
+
+    :param longitude: The longitude of the target
+    :type longitude: float
+
+    :param latitude: The latitude of the target
+    :type latitude: float
+
+    :return: The bearings, in degrees between -180 and 180, of shape (n,)
+    :rtype: numpy.ndarray
+    """
+
+    longitudes = numpy.radians(coordinates[:, 0])
+    latitudes = numpy.radians(coordinates[:, 1])
+    longitude, latitude = numpy.radians(longitude), numpy.radians(latitude)
+
+    return numpy.degrees(
+        numpy.arctan2(
+            numpy.sin(longitude - longitudes) * numpy.cos(latitude),
+            numpy.cos(latitudes) * numpy.sin(latitude)
+            - numpy.sin(latitudes) * numpy.cos(latitude) * numpy.cos(longitude - longitudes),
+        )
+    )
+
+
+def looking_at(
+    coordinates: numpy.ndarray,
+    compass_angles: numpy.ndarray,
+    panoramas: numpy.ndarray,
+    longitude: float,
+    latitude: float,
+) -> numpy.ndarray:
+    """
+    Tells which images look at a target, as `mapillary.utils.filter.is_looking_at` does for one
+    image, i.e., the panoramas, and the images whose compass angle is within 50 degrees of the
+    bearing to the target
+
+    :param coordinates: The (longitude, latitude) pairs of the images, of shape (n, 2)
+    :type coordinates: numpy.ndarray
+
+    :param compass_angles: The compass angles of the images, negative when unknown
+    :type compass_angles: numpy.ndarray
+
+    :param panoramas: Whether each image is a panorama
+    :type panoramas: numpy.ndarray
+
+    :param longitude: The longitude of the target
+    :type longitude: float
+
+    :param latitude: The latitude of the target
+    :type latitude: float
+
+    :return: Whether each image looks at the target, of shape (n,)
+    :rtype: numpy.ndarray
+    """
+
+    difference = numpy.abs(bearings(coordinates, longitude, latitude) - compass_angles) % 360
+
+    return panoramas | (
+        (compass_angles >= 0) & ((difference > 310) | (difference < 50))
+    )
+
+
+def bearing(
+    longitude: float, latitude: float, target_longitude: float, target_latitude: float
+) -> float:
+    """
+    Computes the initial bearing from a point to a target, as `bearings` does for many points,
+    without the overhead of arrays
+
+    :param longitude: The longitude of the point
+    :type longitude: float
+
+    :param latitude: The latitude of the point
+    :type latitude: float
+
+    :param target_longitude: The longitude of the target
+    :type target_longitude: float
+
+    :param target_latitude: The latitude of the target
+    :type target_latitude: float
+
+    :return: The bearing, in degrees between -180 and 180
+    :rtype: float
+    """
+
+    longitude, latitude = math.radians(longitude), math.radians(latitude)
+    target_longitude = math.radians(target_longitude)
+    target_latitude = math.radians(target_latitude)
+
+    return math.degrees(
+        math.atan2(
+            math.sin(target_longitude - longitude) * math.cos(target_latitude),
+            math.cos(latitude) * math.sin(target_latitude)
+            - math.sin(latitude)
+            * math.cos(target_latitude)
+            * math.cos(target_longitude - longitude),
+        )
+    )
@@ -23,6 +23,7 @@ from mapillary.models.exceptions import (
 )
 from mapillary.config.api.entities import Entities
 from mapillary.models.client import Client
+from mapillary.models.config import Config
 
 # Package Imports
 import requests
@@ -293,6 +294,13 @@ def is_image_id(identity: int, fields: list = None) -> bool:
     :rtype: bool
     """
 
+    # In offline mode, the id is looked up in the local store
+    if Config.offline:
+        # Imported here, as the adapters import the utils package
+        from mapillary.models.api.entities import EntityAdapter
+
+        return EntityAdapter().is_image_id(identity=identity, fields=[])
+
     try:
         res = requests.get(
             Entities.get_image(
@@ -16,6 +16,9 @@ from . import conftest  # noqa: F401
 # Utils testing
 from . import utils as tests_utils  # noqa: F401
 
+# Models testing
+from . import models as tests_models  # noqa: F401
+
 # Helper testing
 from . import helper as tests_helper  # noqa: F401
 
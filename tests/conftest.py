@@ -20,6 +20,12 @@ import mercantile
 import mapillary as mly
 from vt2geojson.tools import vt_bytes_to_geojson
 
+# Local imports
+from mapillary.models.cache import NegativeTileCache, TileCache
+from mapillary.models.client import Client
+from mapillary.models.config import Config
+from tests.helper.tiles import TileServer
+
 logger = logging.getLogger(__name__)
 
 
@@ -162,3 +168,35 @@ def test_initialize(mly_access_token: str, directories: bool, testing_envs: dict
 
     # Return dictionary
     return {"testing_envs": testing_envs, "testing_tile_data": testing_tile_data}
+
+
+@pytest.fixture(autouse=True)
+def tile_caches(tmp_path, monkeypatch):
+    """Keeps the persistent caches of every test under a temporary directory, starting empty"""
+
+    monkeypatch.setattr(Config, "cache_dir", str(tmp_path))
+    TileCache.get_default().clear()
+    NegativeTileCache.get_default().clear()
+
+    yield
+
+    TileCache.get_default().clear()
+    NegativeTileCache.get_default().clear()
+
+
+@pytest.fixture
+def tile_server(tile_caches, monkeypatch):
+    """Answers the tile requests of the SDK from a fake tile server, with fresh tile caches"""
+
+    server = TileServer()
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+    monkeypatch.setattr(
+        "mapillary.models.client.Client.get",
+        lambda client, url=None, params=None: server.get(url),
+    )
+    server.reset()
+
+    yield server
+
+    server.reset()
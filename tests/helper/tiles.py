@@ -0,0 +1,92 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.helper.tiles
+~~~~~~~~~~~~~~~~~~
+
+A fake vector tile server, answering the tile requests of the SDK with the image layer tiles
+encoded from a list of images, so that the tile based queries can be tested offline.
+
+Contributions welcome!
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import types
+import mercantile
+import mapbox_vector_tile
+
+# Local imports
+from mapillary.models.cache import NegativeTileCache, TileCache
+
+
+def image_tile(tile: mercantile.Tile, images: list) -> bytes:
+    """Encodes the images lying within a tile as an image layer vector tile, from the
+    (id, longitude, latitude[, compass_angle[, captured_at[, is_pano[, organization_id]]]])
+    tuples of the images"""
+
+    bounds = mercantile.xy_bounds(tile)
+    features = []
+
+    for image_id, longitude, latitude, *optional in images:
+        if mercantile.tile(longitude, latitude, tile.z) != tile:
+            continue
+
+        x, y = mercantile.xy(longitude, latitude)
+        features.append(
+            {
+                "geometry": "POINT ({} {})".format(
+                    (x - bounds.left) / (bounds.right - bounds.left) * 4096,
+                    (y - bounds.bottom) / (bounds.top - bounds.bottom) * 4096,
+                ),
+                "properties": {
+                    "id": image_id,
+                    "captured_at": 1609459200000,
+                    "is_pano": False,
+                    # The compass angle, capture time, panorama flag and organization, when
+                    # given after the coordinates
+                    **dict(
+                        zip(
+                            ["compass_angle", "captured_at", "is_pano", "organization_id"],
+                            optional,
+                        )
+                    ),
+                },
+            }
+        )
+
+    return mapbox_vector_tile.encode([{"name": "image", "features": features}])
+
+
+class TileServer:
+    """
+    Serves the image layer tiles of a list of images, and records the requested tile URLs
+
+    :param images: The (id, longitude, latitude[, compass_angle[, captured_at[, is_pano[,
+        organization_id]]]]) tuples of the images served, see `image_tile`
+    :type images: list
+    """
+
+    def __init__(self, images: list = None) -> None:
+        self.images = images if images is not None else []
+        self.requested = []
+
+    def get(self, url: str) -> types.SimpleNamespace:
+        """Answers a tile request, in place of `Client.get`"""
+
+        self.requested.append(url)
+        z, x, y = (int(value) for value in url.rstrip("/").split("/")[-3:])
+
+        return types.SimpleNamespace(
+            content=image_tile(mercantile.Tile(x, y, z), self.images)
+        )
+
+    def reset(self) -> None:
+        """Forgets the requested tiles, along with the tiles cached by the SDK"""
+
+        self.requested.clear()
+        TileCache.get_default().clear()
+        NegativeTileCache.get_default().clear()
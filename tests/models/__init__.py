@@ -0,0 +1,32 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.__init__
+
+This module loads the modules under src/mapillary/models for tests
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Cache testing
+from . import test_cache  # noqa: F401
+
+# Planner testing
+from . import test_planner  # noqa: F401
+
+# Client testing
+from . import test_client  # noqa: F401
+
+# Store testing
+from . import test_store  # noqa: F401
+
+# MBTiles testing
+from . import test_mbtiles  # noqa: F401
+
+# Entities testing
+from . import test_entities  # noqa: F401
+
+# Config testing
+from . import test_config  # noqa: F401
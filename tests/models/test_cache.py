@@ -0,0 +1,237 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_cache
+~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/cache.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import json
+import time
+import types
+import logging  # Logger
+
+import pytest
+import mercantile
+import requests
+
+# Local imports
+from mapillary.config.api.vector_tiles import VectorTiles
+from mapillary.models.api.vector_tiles import DECODE_ERRORS, VectorTilesAdapter
+from mapillary.models.cache import NegativeTileCache, TileCache
+from mapillary.models.exceptions import QuarantinedTileError
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def negative_cache(tile_caches):
+    """The shared negative tile cache, kept under the temporary directory of the test"""
+
+    return NegativeTileCache.get_default()
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("adapter.fetch_tile(...) for the bad tiles, twice", "one request per tile")],
+)
+def test_known_empty_tiles_are_skipped(
+    test_initialize: dict, negative_cache, monkeypatch, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} makes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_known_empty_tiles_are_skipped] Test that {test_that}")
+
+    requested = []
+
+    def get(self, url=None, params=None):
+        requested.append(url)
+        return types.SimpleNamespace(content=b"")
+
+    monkeypatch.setattr("mapillary.models.client.Client.get", get)
+
+    adapter = VectorTilesAdapter()
+    tiles = [
+        mercantile.Tile(x=int(x), y=int(y), z=int(z))
+        for x, y, z in test_initialize["testing_tile_data"]
+    ]
+
+    for _ in range(2):
+        for tile in tiles:
+            adapter.fetch_tile(
+                url=VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z),
+                tile=tile,
+                layer="image",
+            )
+
+    # Every distinct tile was requested only once
+    assert len(requested) == len(set(requested)), f"{test_that} failed"
+
+    # ... and the empty tiles survive a reload from disk
+    negative_cache.flush()
+    reloaded = NegativeTileCache(path=negative_cache.path)
+    assert all(
+        reloaded.is_empty(NegativeTileCache.tile_key(url=url, layer="image"))
+        for url in requested
+    ), f"{test_that} failed, empty tiles were not persisted"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "adapter.fetch_tile(...) for a failing tile",
+            "the error raised, and the tile quarantined rather than taken as empty",
+        )
+    ],
+)
+def test_failing_tiles_are_quarantined(
+    negative_cache, monkeypatch, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} means {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_failing_tiles_are_quarantined] Test that {test_that}")
+
+    requested = []
+
+    def get(self, url=None, params=None):
+        requested.append(url)
+        response = requests.Response()
+        response.status_code = 503
+
+        # The messages of requests hold the URL, along with the access token
+        raise requests.HTTPError(
+            f"503 Server Error for url: {url}?access_token=MLY|SECRET", response=response
+        )
+
+    monkeypatch.setattr("mapillary.models.client.Client.get", get)
+
+    tile = mercantile.Tile(x=8530, y=5975, z=14)
+    url = VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+    key = NegativeTileCache.tile_key(url=url, layer="image")
+
+    with pytest.raises(requests.HTTPError):
+        VectorTilesAdapter().fetch_tile(url=url, tile=tile, layer="image")
+
+    assert negative_cache.is_quarantined(key), f"{test_that} failed"
+    assert negative_cache.should_skip(key), f"{test_that} failed"
+    assert negative_cache.quarantine() == [key], f"{test_that} failed"
+
+    # ... and is not requested again until it is due for a retry
+    with pytest.raises(QuarantinedTileError):
+        VectorTilesAdapter().fetch_tile(url=url, tile=tile, layer="image")
+
+    assert len(requested) == 1, f"{test_that} failed, got {requested}"
+
+    # ... without the access token being written to disk
+    negative_cache.flush()
+    with open(negative_cache.path) as cache_file:
+        assert "MLY|SECRET" not in cache_file.read(), f"{test_that} failed, token stored"
+
+    # ... and the tokens stored by earlier versions are dropped once read
+    with open(negative_cache.path, "w") as cache_file:
+        json.dump(
+            {
+                key: {
+                    "status": NegativeTileCache.FAILED,
+                    "attempts": 1,
+                    "retry_at": time.time() + 60,
+                    "error": f"503 Server Error for url: {url}?access_token=MLY|SECRET",
+                }
+            },
+            cache_file,
+        )
+
+    reloaded = NegativeTileCache(path=negative_cache.path)
+    reloaded.flush()
+    with open(negative_cache.path) as cache_file:
+        assert "MLY|SECRET" not in cache_file.read(), f"{test_that} failed, token kept"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("TileCache(size=2, ...).put(...) for three tiles", "the least recent tile evicted")],
+)
+def test_tile_cache_evicts_least_recent(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} leaves {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_tile_cache_evicts_least_recent] Test that {test_that}")
+
+    now = [1000.0]
+    monkeypatch.setattr("mapillary.models.cache.time.time", lambda: now[0])
+
+    cache = TileCache(size=2, ttl=60)
+    tiles = {
+        key: {"type": "FeatureCollection", "features": [{"id": key}]}
+        for key in ("a", "b", "c")
+    }
+
+    cache.put("a", tiles["a"])
+    cache.put("b", tiles["b"])
+
+    # Reading 'a' makes 'b' the least recently used
+    cache.get("a")["features"].clear()
+    cache.put("c", tiles["c"])
+
+    assert cache.get("b") is None, f"{test_that} failed"
+    assert cache.get("a") == tiles["a"], f"{test_that} failed, got {cache.get('a')}"
+
+    # Changing a returned feature leaves the cached tile untouched
+    cache.get("a")["features"][0]["id"] = "changed"
+    assert cache.get("a") == tiles["a"], f"{test_that} failed, got {cache.get('a')}"
+
+    # The tiles expire after the time to live
+    now[0] += 61
+
+    assert cache.get("c") is None and len(cache) == 1, f"{test_that} failed"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        ("adapter.fetch_tile(...) for a corrupted tile", "raised, and quarantined"),
+        ("adapter.fetch_tile(...) when the request hits a bug", "raised, and not quarantined"),
+    ],
+)
+def test_only_tile_failures_are_quarantined(
+    negative_cache, monkeypatch, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} is {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_only_tile_failures_are_quarantined] Test that {test_that}")
+
+    corrupted = operation.endswith("corrupted tile")
+
+    def get(self, url=None, params=None):
+        if corrupted:
+            return types.SimpleNamespace(content=b"\x1a\xff\xff\xff")
+        raise RuntimeError("A bug in the SDK")
+
+    monkeypatch.setattr("mapillary.models.client.Client.get", get)
+
+    tile = mercantile.Tile(x=8530, y=5975, z=14)
+    url = VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+    key = NegativeTileCache.tile_key(url=url, layer="image")
+
+    with pytest.raises(DECODE_ERRORS if corrupted else RuntimeError):
+        VectorTilesAdapter().fetch_tile(url=url, tile=tile, layer="image")
+
+    assert negative_cache.is_quarantined(key) == corrupted, f"{test_that} failed"
@@ -0,0 +1,138 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_client
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/client.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import logging  # Logger
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Local imports
+from mapillary.models.client import Client
+from mapillary.models.config import Config
+from mapillary.models.exceptions import OfflineError
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("Client().get(...) for the same tile from 16 threads", "a single request")],
+)
+def test_concurrent_identical_requests_are_coalesced(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} makes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(
+        f"\n[test_concurrent_identical_requests_are_coalesced] Test that {test_that}"
+    )
+
+    requested = []
+    release = threading.Event()
+
+    def initiate_request(self, url, method, params=None, headers=None):
+        requested.append(url)
+        # Hold the request in flight until every thread has joined it
+        release.wait(timeout=5)
+        return object()
+
+    monkeypatch.setattr(Client, "_initiate_request", initiate_request)
+
+    url = "https://tiles.mapillary.com/maps/vtp/mly1_public/2/14/2620/6331/"
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = [executor.submit(Client().get, url, {}) for _ in range(16)]
+        threading.Timer(0.5, release.set).start()
+        responses = [future.result() for future in futures]
+
+    assert len(requested) == 1, f"{test_that} failed, got {len(requested)} requests"
+
+    assert (
+        len({id(response) for response in responses}) == 1
+    ), f"{test_that} failed, the threads got different responses"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("Client().get(...) for tiles and entities", "no shared state modified")],
+)
+def test_requests_do_not_modify_shared_state(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} leaves {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_requests_do_not_modify_shared_state] Test that {test_that}")
+
+    sent = []
+
+    def initiate_request(self, url, method, params=None, headers=None):
+        sent.append((params, headers))
+        return object()
+
+    monkeypatch.setattr(Client, "_initiate_request", initiate_request)
+
+    client = Client(access_token="MLY|TEST")
+    params = {"fields": "id"}
+
+    client.get("https://tiles.mapillary.com/maps/vtp/mly1_public/2/14/0/0/", params)
+    client.get("https://graph.mapillary.com/1933525276802129", params)
+
+    assert params == {"fields": "id"}, f"{test_that} failed, got {params}"
+
+    assert (
+        "Authorization" not in client.session.headers
+    ), f"{test_that} failed, got {client.session.headers}"
+
+    assert sent == [
+        ({"fields": "id", "access_token": "MLY|TEST"}, {}),
+        ({"fields": "id"}, {"Authorization": "OAuth MLY|TEST"}),
+    ], f"{test_that} failed, got {sent}"
+
+    # Each thread gets its own session
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_session = executor.submit(lambda: client.session).result()
+
+    assert (
+        other_session is not client.session
+    ), f"{test_that} failed, sessions are shared"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("Client.set_token(...) and Client().get(...) offline", "no request")],
+)
+def test_offline_mode_makes_no_request(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} makes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_offline_mode_makes_no_request] Test that {test_that}")
+
+    def request(*args, **kwargs):
+        raise AssertionError(f"{test_that} failed, a request was made")
+
+    monkeypatch.setattr("requests.get", request)
+    monkeypatch.setattr(Client, "_initiate_request", request)
+    monkeypatch.setattr(Config, "offline", True)
+    monkeypatch.setattr(Client, "_Client__access_token", Client.get_token())
+
+    # The token is set without being validated
+    Client.set_token("MLY|OFFLINE")
+
+    with pytest.raises(OfflineError):
+        Client().get("https://graph.mapillary.com/1933525276802129?fields=id")
@@ -0,0 +1,45 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_config
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/config.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import logging  # Logger
+
+import pytest
+
+# Local imports
+from mapillary.models.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("Config(use_strict=False) then Config(tile_cache_size=...)", "use_strict unchanged")],
+)
+def test_config_keeps_the_settings_not_given(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} leaves {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_config_keeps_the_settings_not_given] Test that {test_that}")
+
+    # Restores the settings once the test is done
+    monkeypatch.setattr(Config, "use_strict", Config.use_strict)
+    monkeypatch.setattr(Config, "tile_cache_size", Config.tile_cache_size)
+
+    Config(use_strict=False)
+    Config(tile_cache_size=16)
+
+    assert Config.use_strict is False, f"{test_that} failed"
+    assert Config.tile_cache_size == 16, f"{test_that} failed"
@@ -0,0 +1,61 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_entities
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/api/entities.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import types
+import logging  # Logger
+
+import pytest
+
+# Local imports
+from mapillary.models.api.entities import EntityAdapter
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize(
+    "operation, content",
+    [
+        (
+            "adapter.fetch_image(...)",
+            b'{"id":"1","is_pano":true,"altitude":null,"camera_type":"perspective"}',
+        ),
+        (
+            "adapter.fetch_map_feature(...)",
+            b'{"id":"1","object_value":"regulatory--stop--g1","aligned_direction":null}',
+        ),
+    ],
+)
+def test_fetch_decodes_json_literals(monkeypatch, operation, content):
+
+    # Operation to test
+    test_that = f"{operation} decodes the JSON literals of the response"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_fetch_decodes_json_literals] Test that {test_that}")
+
+    monkeypatch.setattr(
+        "mapillary.models.client.Client.get",
+        lambda self, url=None, params=None: types.SimpleNamespace(content=content),
+    )
+
+    adapter = EntityAdapter()
+
+    entity = (
+        adapter.fetch_image(image_id=1, fields=[])
+        if "image" in operation
+        else adapter.fetch_map_feature(map_feature_id=1, fields=[])
+    )
+
+    assert entity["id"] == "1", f"{test_that} failed, got {entity}"
+    assert None in entity.values(), f"{test_that} failed, got {entity}"
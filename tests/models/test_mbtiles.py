@@ -0,0 +1,200 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_mbtiles
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/mbtiles.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import types
+import logging  # Logger
+
+import pytest
+import mercantile
+
+# Local imports
+from mapillary.config.api.vector_tiles import VectorTiles
+from mapillary.models.api.vector_tiles import VectorTilesAdapter
+from mapillary.models.config import Config
+from mapillary.models.exceptions import OfflineError
+from mapillary.models.mbtiles import MBTilesArchive
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def tile_archives():
+    """Restores the configured tile archives after the test"""
+
+    tile_archives = Config.tile_archives
+
+    yield
+
+    Config(tile_archives=tile_archives)
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("archive.download(...), interrupted then resumed", "every tile requested once")],
+)
+def test_download_resumes(tmp_path, tile_archives, monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} makes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_download_resumes] Test that {test_that}")
+
+    tiles = list(mercantile.tiles(0.0, 0.0, 0.1, 0.1, zooms=14))
+    urls = {
+        tile: VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+        for tile in tiles
+    }
+
+    requested = []
+
+    def get(self, url=None, params=None):
+        requested.append(url)
+
+        # Every other tile is empty
+        return types.SimpleNamespace(content=b"tile" if len(requested) % 2 else b"")
+
+    monkeypatch.setattr("mapillary.models.client.Client.get", get)
+
+    path = str(tmp_path / "region.mbtiles")
+
+    # The first download only covers part of the region
+    with MBTilesArchive(path=path) as archive:
+        archive.download(urls=dict(list(urls.items())[:10]), workers=4)
+
+    with MBTilesArchive(path=path) as archive:
+        summary = archive.download(urls=urls, workers=4)
+
+    assert sorted(requested) == sorted(urls.values()), f"{test_that} failed"
+    assert summary == {
+        "downloaded": len(tiles) - 10,
+        "skipped": 10,
+        "failed": 0,
+    }, f"{test_that} failed, got {summary}"
+
+    # The configured archive serves the tiles, and tells the empty ones from the missing ones
+    Config(tile_archives=[path])
+
+    contents = [MBTilesArchive.read_configured(url=url) for url in urls.values()]
+    missing = MBTilesArchive.read_configured(
+        url=VectorTiles.get_image_layer(x=0, y=0, z=14)
+    )
+
+    assert set(contents) == {b"tile", b""}, f"{test_that} failed, got {contents}"
+    assert missing is None, f"{test_that} failed, got {missing}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("archive.download(...) of many tiles", "a few responses held at once")],
+)
+def test_download_holds_few_responses(tmp_path, monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} makes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_download_holds_few_responses] Test that {test_that}")
+
+    tiles = list(mercantile.tiles(0.0, 0.0, 0.5, 0.5, zooms=14))
+    urls = {
+        tile: VectorTiles.get_image_layer(x=tile.x, y=tile.y, z=tile.z)
+        for tile in tiles
+    }
+
+    alive = {"count": 0, "most": 0}
+
+    class Response:
+        """Counts the responses not yet released"""
+
+        content = b"tile"
+
+        def __init__(self):
+            alive["count"] += 1
+            alive["most"] = max(alive["most"], alive["count"])
+
+        def __del__(self):
+            alive["count"] -= 1
+
+    monkeypatch.setattr(
+        "mapillary.models.client.Client.get",
+        lambda self, url=None, params=None: Response(),
+    )
+
+    with MBTilesArchive(path=str(tmp_path / "region.mbtiles")) as archive:
+        summary = archive.download(urls=urls, workers=2)
+
+    assert summary["downloaded"] == len(tiles) > 100, f"{test_that} failed, got {summary}"
+    assert alive["most"] <= 8, f"{test_that} failed, got {alive['most']}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "adapter.fetch_tile(...) offline",
+            "archived tiles, and an error for the others",
+        )
+    ],
+)
+def test_offline_tiles_come_from_archives(
+    tmp_path, tile_archives, monkeypatch, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_offline_tiles_come_from_archives] Test that {test_that}")
+
+    path = str(tmp_path / "region.mbtiles")
+    archived = mercantile.Tile(x=8192, y=8191, z=14)
+
+    # An empty tile, as downloaded, then back to the actual client, which makes no request
+    # offline
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            "mapillary.models.client.Client.get",
+            lambda self, url=None, params=None: types.SimpleNamespace(content=b""),
+        )
+
+        with MBTilesArchive(path=path) as archive:
+            archive.download(
+                urls={
+                    archived: VectorTiles.get_image_layer(
+                        x=archived.x, y=archived.y, z=archived.z
+                    )
+                }
+            )
+
+    monkeypatch.setattr(Config, "offline", True)
+    monkeypatch.setattr(Config, "use_negative_cache", False)
+    Config(tile_archives=[path])
+
+    adapter = VectorTilesAdapter()
+
+    geojson = adapter.fetch_tile(
+        url=VectorTiles.get_image_layer(x=archived.x, y=archived.y, z=archived.z),
+        tile=archived,
+        layer="image",
+    )
+
+    assert geojson["features"] == [], f"{test_that} failed, got {geojson}"
+
+    with pytest.raises(OfflineError):
+        adapter.fetch_tile(
+            url=VectorTiles.get_image_layer(x=8193, y=8191, z=14),
+            tile=mercantile.Tile(x=8193, y=8191, z=14),
+            layer="image",
+        )
@@ -0,0 +1,220 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_planner
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/planner.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import math
+import logging  # Logger
+
+import pytest
+import mercantile
+import numpy
+
+# Local imports
+from mapillary.models.planner import TilePlanner
+
+logger = logging.getLogger(__name__)
+
+
+class CoverageAdapter:
+    """An adapter with imagery in a single tile at zoom 14"""
+
+    def __init__(self, covered: mercantile.Tile) -> None:
+        self.covered = covered
+        self.requested = []
+
+    def fetch_tile(self, url: str, tile: mercantile.Tile, layer: str = None) -> dict:
+        self.requested.append(tile)
+
+        has_coverage = tile.z <= self.covered.z and (
+            mercantile.parent(self.covered, zoom=tile.z) == tile
+            if tile.z < self.covered.z
+            else tile == self.covered
+        )
+
+        return {
+            "type": "FeatureCollection",
+            "features": [{"type": "Feature"}] if has_coverage else [],
+        }
+
+    def is_tile_cached(self, url: str, layer: str = None) -> bool:
+        # Every other tile at zoom 14 is served locally
+        return url.endswith("/0/")
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "TilePlanner(...).plan(...) over a mostly empty bbox",
+            "only the tiles under the covered quadrant",
+        )
+    ],
+)
+def test_plan_descends_into_covered_quadrants(operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_plan_descends_into_covered_quadrants] Test that {test_that}")
+
+    covered = mercantile.tile(lng=-122.42, lat=37.79, zoom=14)
+    adapter = CoverageAdapter(covered=covered)
+
+    bbox = {"west": -124, "south": 36, "east": -121, "north": 39}
+    tiles = TilePlanner(adapter=adapter, zooms=[5, 8, 11], threshold=64).plan(
+        bbox=bbox, zoom=14
+    )
+
+    # The finest coverage check is done at zoom 11, so its 64 children remain
+    quadrant = mercantile.parent(covered, zoom=11)
+    assert sorted(tiles) == sorted(
+        mercantile.children(quadrant, zoom=14)
+    ), f"{test_that} failed, got {tiles}"
+
+    assert (
+        len(adapter.requested) < TilePlanner.count_tiles(bbox, 14) / 100
+    ), f"{test_that} failed, {len(adapter.requested)} coverage tiles were requested"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "TilePlanner(...).explain(...) over a mostly empty bbox",
+            "the cost of the query",
+        )
+    ],
+)
+def test_explain_reports_the_query_cost(operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_explain_reports_the_query_cost] Test that {test_that}")
+
+    covered = mercantile.tile(lng=-122.42, lat=37.79, zoom=14)
+    adapter = CoverageAdapter(covered=covered)
+
+    plan = TilePlanner(adapter=adapter, zooms=[5, 8, 11], threshold=64).explain(
+        query="images_in_bbox",
+        bbox={"west": -124, "south": 36, "east": -121, "north": 39},
+        zoom=14,
+        layer="image",
+        get_url=lambda x, y, z: f"https://tiles.test/{z}/{x}/{y}/{y % 2}/",
+        decoded_layer="image",
+        filters=[{"filter": "image_type", "type": "pano"}, {}],
+    )
+
+    assert plan.tile_counts["image"] == {14: 64}, f"{test_that} failed, got {plan}"
+    assert plan.cache_hits == 32, f"{test_that} failed, got {plan}"
+    assert (
+        plan.expected_requests == len(plan.coverage) + 32
+    ), f"{test_that} failed, got {plan}"
+    assert plan.to_dict()["filters"] == [
+        {"filter": "image_type", "type": "pano"}
+    ], f"{test_that} failed, got {plan.to_dict()['filters']}"
+
+
+@pytest.mark.parametrize(
+    "operation, radius",
+    [
+        ("TilePlanner.radius_tiles(...) near a tile corner", 300),
+        ("TilePlanner.radius_tiles(...) over a large circle", 5000),
+    ],
+)
+def test_radius_tiles_cover_the_circle(operation, radius):
+
+    # Operation to test
+    test_that = f"{operation} lists the tiles the circle reaches, and no other"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_radius_tiles_cover_the_circle] Test that {test_that}")
+
+    # The north west corner of a tile
+    corner = mercantile.ul(mercantile.Tile(x=8783, y=5694, z=14))
+    longitude, latitude = corner.lng + 0.0005, corner.lat - 0.0005
+
+    tiles = TilePlanner.radius_tiles(
+        longitude=longitude, latitude=latitude, radius=radius, zoom=14
+    )
+
+    # The points of the circle, and of a ring just within it
+    reached = set()
+    for bearing in range(0, 360, 2):
+        for distance in (radius * 0.999, radius * 0.5):
+            angle = distance / TilePlanner.EARTH_RADIUS
+            lat = math.asin(
+                math.sin(math.radians(latitude)) * math.cos(angle)
+                + math.cos(math.radians(latitude))
+                * math.sin(angle)
+                * math.cos(math.radians(bearing))
+            )
+            lng = math.radians(longitude) + math.atan2(
+                math.sin(math.radians(bearing))
+                * math.sin(angle)
+                * math.cos(math.radians(latitude)),
+                math.cos(angle) - math.sin(math.radians(latitude)) * math.sin(lat),
+            )
+            reached.add(mercantile.tile(math.degrees(lng), math.degrees(lat), 14))
+
+    bbox_tiles = TilePlanner.bbox_tiles(
+        bbox=TilePlanner.radius_bbox(longitude, latitude, radius), zoom=14
+    )
+
+    assert reached <= set(tiles), f"{test_that} failed, missing {reached - set(tiles)}"
+    assert set(tiles) <= set(bbox_tiles), f"{test_that} failed"
+    assert tiles[0] == mercantile.tile(longitude, latitude, 14), f"{test_that} failed"
+
+    # The corners of the bounding box of a large circle are left out
+    if radius > 1000:
+        assert len(tiles) < len(bbox_tiles), f"{test_that} failed, got {len(tiles)}"
+
+
+@pytest.mark.parametrize(
+    "operation, radius",
+    [
+        ("TilePlanner.points_tiles(...) without a radius", None),
+        ("TilePlanner.points_tiles(...) with a radius", 400),
+    ],
+)
+def test_points_tiles_match_radius_tiles(operation, radius):
+
+    # Operation to test
+    test_that = f"{operation} groups the points as the single point tile math does"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_points_tiles_match_radius_tiles] Test that {test_that}")
+
+    generator = numpy.random.default_rng(0)
+    longitudes = generator.uniform(12.9, 13.1, 200)
+    latitudes = generator.uniform(47.9, 48.1, 200)
+
+    expected = {}
+    for index, (longitude, latitude) in enumerate(zip(longitudes, latitudes)):
+        for tile in (
+            [mercantile.tile(longitude, latitude, 14)]
+            if radius is None
+            else TilePlanner.radius_tiles(longitude, latitude, radius, 14)
+        ):
+            expected.setdefault(tile, []).append(index)
+
+    groups = {
+        tile: indices.tolist()
+        for tile, indices in TilePlanner.points_tiles(
+            longitudes=longitudes, latitudes=latitudes, radius=radius, zoom=14
+        ).items()
+    }
+
+    assert groups == expected, f"{test_that} failed"
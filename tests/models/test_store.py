@@ -0,0 +1,197 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.models.test_store
+~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the classes under mapillary/models/store.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import logging  # Logger
+
+import pytest
+
+# Local imports
+from mapillary.models.store import LocalStore
+from mapillary.utils.filter import pipeline
+
+logger = logging.getLogger(__name__)
+
+
+def image_feature(
+    image_id: int, lng: float, lat: float, captured_at: int, is_pano: bool
+) -> dict:
+    """Builds an image feature, as decoded from the image layer"""
+
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lng, lat]},
+        "properties": {
+            "id": image_id,
+            "captured_at": captured_at,
+            "compass_angle": (image_id * 37) % 360,
+            "is_pano": is_pano,
+            "organization_id": 1 if image_id % 2 else 2,
+            "sequence_id": f"sequence-{image_id % 3}",
+        },
+    }
+
+
+@pytest.fixture
+def images():
+    return [
+        image_feature(
+            image_id=image_id,
+            lng=0.01 * (image_id % 10),
+            lat=0.01 * (image_id // 10),
+            captured_at=1577836800000 + image_id * 86400000 * 30,
+            is_pano=image_id % 4 == 0,
+        )
+        for image_id in range(1, 100)
+    ]
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("store.upsert(...) twice, with an update", "one feature per ID, updated")],
+)
+def test_upsert_replaces_by_id(tmp_path, images, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} keeps {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_upsert_replaces_by_id] Test that {test_that}")
+
+    with LocalStore(path=str(tmp_path / "store.sqlite")) as store:
+        store.upsert(data={"type": "FeatureCollection", "features": images})
+
+        updated = image_feature(1, 0.5, 0.5, 1577836800000, True)
+        store.upsert(data=[updated])
+
+        assert store.count(layer="image") == len(images), f"{test_that} failed"
+
+        found = store.query(
+            components=[{"filter": "sequence_id", "ids": ["sequence-1"]}]
+        )
+
+        assert updated in found, f"{test_that} failed, got {found}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "store.upsert(...) of sequences next to images sharing their IDs",
+            "the features of both layers, keyed by layer",
+        )
+    ],
+)
+def test_upsert_keys_by_layer(tmp_path, images, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} keeps {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_upsert_keys_by_layer] Test that {test_that}")
+
+    # Sequences have string IDs, and may share an ID with a feature of another layer
+    sequences = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [[0.0, 0.01 * index], [0.09, 0.01 * index]],
+            },
+            "properties": {"id": sequence_id},
+        }
+        for index, sequence_id in enumerate(["sequence-0", "sequence-1", "1"])
+    ]
+
+    with LocalStore(path=str(tmp_path / "store.sqlite")) as store:
+        store.upsert(data=images)
+        store.upsert(data=sequences, layer="sequence")
+
+        assert store.count(layer="image") == len(images), f"{test_that} failed"
+        assert store.count(layer="sequence") == len(sequences), f"{test_that} failed"
+
+        assert store.get("1", layer="sequence") == ("sequence", sequences[2]), f"{test_that} failed"
+        assert store.get(1, layer="image") == ("image", images[0]), f"{test_that} failed"
+
+        found = store.query(
+            layer="sequence",
+            components=[
+                {
+                    "filter": "features_in_bounding_box",
+                    "bbox": {"west": 0.02, "south": 0.005, "east": 0.03, "north": 0.015},
+                }
+            ],
+        )
+
+        assert found == [sequences[1]], f"{test_that} failed, got {found}"
+
+        # Deleting from a layer leaves the other one untouched
+        assert store.delete(["1"], layer="sequence") == 1, f"{test_that} failed"
+        assert store.get("1", layer="sequence") is None, f"{test_that} failed"
+        assert store.get(1) == ("image", images[0]), f"{test_that} failed"
+
+
+@pytest.mark.parametrize(
+    "operation, components",
+    [
+        (
+            "bounding box, date and image type filters",
+            [
+                {
+                    "filter": "features_in_bounding_box",
+                    "bbox": {"west": 0.015, "south": 0.0, "east": 0.085, "north": 0.07},
+                },
+                {"filter": "min_captured_at", "min_timestamp": "2021-01-01"},
+                {"filter": "image_type", "type": "flat"},
+            ],
+        ),
+        (
+            "organization, sequence and compass angle filters",
+            [
+                {"filter": "organization_id", "organization_ids": [1]},
+                {"filter": "sequence_id", "ids": ["sequence-0", "sequence-2"]},
+                {"filter": "compass_angle", "angles": (90.0, 270.0)},
+            ],
+        ),
+        (
+            "radius filter",
+            [
+                {
+                    "filter": "haversine_dist",
+                    "radius": 3000,
+                    "coords": [0.05, 0.05],
+                }
+            ],
+        ),
+    ],
+)
+def test_query_matches_pipeline(tmp_path, images, operation, components):
+
+    # Operation to test
+    test_that = f"store.query(...) with the {operation} matches the pipeline"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_query_matches_pipeline] Test that {test_that}")
+
+    expected = pipeline(
+        data={"type": "FeatureCollection", "features": images}, components=components
+    )
+
+    with LocalStore(path=str(tmp_path / "store.sqlite")) as store:
+        store.upsert(data=images)
+        found = store.query(layer="image", components=components)
+
+    assert expected, f"{test_that} failed, the filters select no image"
+    assert sorted(feature["properties"]["id"] for feature in found) == sorted(
+        feature["properties"]["id"] for feature in expected
+    ), f"{test_that} failed, got {found}"
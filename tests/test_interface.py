@@ -11,19 +11,30 @@ This module tests the interface functions provided at src/mapillary/interface
 """
 
 # Package imports
+import gzip
 import json
+import types
 import pytest
 import logging
+import requests
 import datetime
+import haversine
 import mercantile
+import numpy
 import pandas as pd
+import shapely
 
 
 # Local imports
 import mapillary as mly
+from mapillary.models.client import Client
+from mapillary.models.config import Config
 from mapillary.models.geojson import Coordinates
+from mapillary.utils.filter import is_looking_at
+from mapillary.utils.spatial import haversine_distances
 
 from dateutil.relativedelta import relativedelta
+from geojson import Feature, Point
 
 logger = logging.getLogger(__name__)
 
@@ -131,3 +142,927 @@ def test_is_image_being_looked_at_with_no_params(
             is_image_being_looked_at_fp,
             indent=2,
         )
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.get_detections_for_images(image_ids=[...], decode=True)",
+            "the decoded detections of each image, and no failed or unreadable image",
+        )
+    ],
+)
+def test_get_detections_for_images(monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} yields {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[get_detections_for_images] Test that {test_that}")
+
+    pixel_geometry = (
+        "GjUKBm1weS1vchIVEgIAABgDIg0JhiekKBoqAABKKQAPGgR0eXBlIgkKB3BvbHlnb24ogCB4AQ=="
+    )
+
+    requested = []
+
+    def get(self, url=None, params=None):
+        requested.append(url)
+
+        # The image '3' has no detections endpoint
+        if "/3/" in url:
+            raise requests.HTTPError(response=types.SimpleNamespace(status_code=404))
+
+        # The image '4' gets an error payload, and the image '5' a corrupted pixel geometry
+        if "/4/" in url:
+            return types.SimpleNamespace(content=b'{"error": {"message": "Unsupported"}}')
+
+        image_id = url.split("/")[-3]
+
+        return types.SimpleNamespace(
+            content=json.dumps(
+                {
+                    "data": [
+                        {
+                            "geometry": pixel_geometry if image_id != "5" else "bm90IGEgdGlsZQ==",
+                            "image": {
+                                "geometry": {
+                                    "type": "Point",
+                                    "coordinates": [-97.743279722222, 30.270651388889],
+                                },
+                                "id": image_id,
+                            },
+                            "value": "regulatory--no-parking--g2",
+                            "id": f"{image_id}0",
+                        }
+                    ]
+                }
+            ).encode("utf-8")
+        )
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+    monkeypatch.setattr("mapillary.models.client.Client.get", get)
+
+    detections = dict(
+        mly.interface.get_detections_for_images(
+            image_ids=(image_id for image_id in range(1, 8)),
+            fields=["geometry", "image", "value"],
+            workers=2,
+            decode=True,
+            normalized=False,
+        )
+    )
+
+    # No ID is validated with a request of its own
+    assert len(requested) == 7, f"{test_that} failed, got {requested}"
+    assert sorted(detections) == ["1", "2", "6", "7"], f"{test_that} failed"
+
+    properties = detections["1"].to_dict()["features"][0]["properties"]
+
+    assert properties["pixel_geometry"][0].tolist() == [
+        [2499, 1518],
+        [2520, 1518],
+        [2520, 1481],
+        [2499, 1481],
+        [2499, 1518],
+    ], f"{test_that} failed, got {properties}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.get_image_close_to(..., radius=250) near a tile corner",
+            "the images of the neighbouring tiles, fetched once",
+        )
+    ],
+)
+def test_get_image_close_to_searches_neighbouring_tiles(
+    tile_server, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[get_image_close_to] Test that {test_that}")
+
+    corner = mercantile.ul(mercantile.Tile(x=8783, y=5694, z=14))
+    longitude, latitude = corner.lng + 0.001, corner.lat - 0.001
+
+    # A grid of images around the corner, spanning four tiles
+    images = [
+        (row * 100 + column + 1, corner.lng + column * 0.001, corner.lat + row * 0.001)
+        for row in range(-6, 6)
+        for column in range(-6, 6)
+    ]
+
+    tile_server.images = images
+
+    actual = [
+        sorted(
+            feature.properties.id
+            for feature in mly.interface.get_image_close_to(
+                longitude=longitude, latitude=latitude, radius=250
+            ).features
+        )
+        for _ in range(2)
+    ]
+
+    expected_ids = sorted(
+        image_id
+        for image_id, lng, lat in images
+        if haversine.haversine((latitude, longitude), (lat, lng), unit="m") < 250
+    )
+
+    assert {
+        mercantile.tile(lng, lat, 14)
+        for image_id, lng, lat in images
+        if image_id in expected_ids
+    } != {mercantile.tile(longitude, latitude, 14)}, f"{test_that} failed, one tile only"
+    assert actual == [expected_ids, expected_ids], f"{test_that} failed, got {actual}"
+    requested = tile_server.requested
+    assert len(requested) == len(set(requested)) == 4, f"{test_that} failed, {requested}"
+
+
+@pytest.mark.parametrize(
+    "image_type",
+    [None, "all", "pano", "flat"],
+)
+def test_nearest_images(tile_server, image_type):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.nearest_images(..., k=5, max_distance=2000, image_type={image_type!r})"
+        " returns the 5 nearest images of that type, sorted, from the center tile only"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[nearest_images] Test that {test_that}")
+
+    center = mercantile.bounds(mercantile.Tile(x=8783, y=5694, z=14))
+    longitude = (center.west + center.east) / 2
+    latitude = (center.south + center.north) / 2
+
+    # A grid of images over the center tile and its neighbours, every other column panoramas
+    images = [
+        (
+            row * 100 + column + 1,
+            longitude + column * 0.0013,
+            latitude + row * 0.0011,
+            0.0,
+            1609459200000,
+            column % 2 == 0,
+        )
+        for row in range(-20, 21)
+        for column in range(-20, 21)
+    ]
+
+    tile_server.images = images
+
+    nearest = mly.interface.nearest_images(
+        longitude=longitude + 0.0003,
+        latitude=latitude,
+        k=5,
+        max_distance=2000,
+        # Leaving the image_type out when it is None
+        **({"image_type": image_type} if image_type is not None else {}),
+    ).to_dict()["features"]
+
+    distances = {
+        image_id: haversine.haversine(
+            (latitude, longitude + 0.0003), (lat, lng), unit="m"
+        )
+        for image_id, lng, lat, *_, is_pano in images
+        if image_type in (None, "all") or is_pano == (image_type == "pano")
+    }
+    expected_ids = sorted(distances, key=distances.get)[:5]
+
+    actual_ids = [feature["properties"]["id"] for feature in nearest]
+    actual_distances = [feature["properties"]["distance"] for feature in nearest]
+
+    assert actual_ids == expected_ids, f"{test_that} failed, got {actual_ids}"
+    assert actual_distances == sorted(actual_distances), f"{test_that} failed"
+    assert len(tile_server.requested) == 1, f"{test_that} failed, got {tile_server.requested}"
+
+
+@pytest.mark.parametrize(
+    "image_type",
+    [None, "all", "pano"],
+)
+def test_get_images_close_to(tile_server, image_type):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.get_images_close_to(..., radius=300, image_type={image_type!r})"
+        " returns the images of that type within the radius of each point, each tile fetched"
+        " once"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[get_images_close_to] Test that {test_that}")
+
+    corner = mercantile.ul(mercantile.Tile(x=8783, y=5694, z=14))
+
+    # A grid of images around the corner of four tiles, one in three a panorama
+    images = [
+        (
+            row * 100 + column + 1,
+            corner.lng + column * 0.002,
+            corner.lat + row * 0.0015,
+            0.0,
+            1609459200000,
+            (row + column) % 3 == 0,
+        )
+        for row in range(-15, 16)
+        for column in range(-15, 16)
+    ]
+
+    tile_server.images = images
+
+    points = [
+        (corner.lng + offset * 0.0007, corner.lat - offset * 0.0005)
+        for offset in range(-20, 21)
+    ]
+
+    results = mly.interface.get_images_close_to(
+        coordinates=points,
+        radius=300,
+        # Leaving the image_type out when it is None
+        **({"image_type": image_type} if image_type is not None else {}),
+    )
+
+    for (longitude, latitude), result in zip(points, results):
+        actual = sorted(
+            feature["properties"]["id"] for feature in result.to_dict()["features"]
+        )
+        expected_ids = sorted(
+            image_id
+            for image_id, lng, lat, _, _, is_pano in images
+            if haversine.haversine((latitude, longitude), (lat, lng), unit="m") < 300
+            and (image_type != "pano" or is_pano)
+        )
+
+        assert actual == expected_ids, f"{test_that} failed, got {actual}"
+
+    assert len(results) == len(points), f"{test_that} failed"
+    requested = tile_server.requested
+    assert len(requested) == len(set(requested)), f"{test_that} failed, got {requested}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.images_along_route(..., buffer_m=100)",
+            "the images within the corridor, in the order of the route",
+        )
+    ],
+)
+def test_images_along_route(tile_server, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[images_along_route] Test that {test_that}")
+
+    # A diagonal route, through a few tiles out of the many of its bounding box
+    route = [[12.95, 48.05], [13.05, 48.1], [13.15, 48.12]]
+
+    # Every third image a panorama
+    generator = numpy.random.default_rng(0)
+    images = [
+        (image_id + 1, longitude, latitude, 0.0, 1609459200000, image_id % 3 == 0)
+        for image_id, (longitude, latitude) in enumerate(
+            zip(generator.uniform(12.95, 13.15, 4000), generator.uniform(48.05, 48.12, 4000))
+        )
+    ]
+
+    tile_server.images = images
+
+    features = mly.interface.images_along_route(
+        linestring={"type": "LineString", "coordinates": route}, buffer_m=100
+    ).to_dict()["features"]
+
+    # The distances to a finely sampled route
+    samples = numpy.concatenate(
+        [
+            numpy.linspace(start, end, 5000)
+            for start, end in zip(numpy.array(route[:-1]), numpy.array(route[1:]))
+        ]
+    )
+    distances = {
+        image_id: haversine_distances(longitude, latitude, samples).min()
+        for image_id, longitude, latitude, *_ in images
+    }
+    panoramas = {image_id for image_id, *_, is_pano in images if is_pano}
+
+    actual = {feature["properties"]["id"] for feature in features}
+    positions = [feature["properties"]["position"] for feature in features]
+
+    assert {
+        image_id for image_id, distance in distances.items() if distance < 99
+    } <= actual, f"{test_that} failed, got {actual}"
+    assert all(distances[image_id] < 101 for image_id in actual), f"{test_that} failed"
+    assert positions == sorted(positions), f"{test_that} failed, got {positions}"
+    assert len(tile_server.requested) < len(
+        list(mercantile.tiles(12.95, 48.05, 13.15, 48.12, zooms=14))
+    ) / 3, f"{test_that} failed, got {len(tile_server.requested)} requests"
+
+    # Both image types are returned by default ...
+    assert actual & panoramas, f"{test_that} failed, no panoramas"
+
+    # ... and asking for one image type leaves the other out
+    for image_type in ("pano", "flat"):
+        typed = {
+            feature["properties"]["id"]
+            for feature in mly.interface.images_along_route(
+                linestring={"type": "LineString", "coordinates": route},
+                buffer_m=100,
+                image_type=image_type,
+            ).to_dict()["features"]
+        }
+        assert typed == (
+            actual & panoramas if image_type == "pano" else actual - panoramas
+        ), f"{test_that} failed for image_type={image_type!r}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.get_image_looking_at(..., max_distance=300) near a tile corner",
+            "the images of the neighbouring tiles facing the target, and no farther one",
+        )
+    ],
+)
+def test_get_image_looking_at_searches_neighbouring_tiles(
+    tile_server, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[get_image_looking_at] Test that {test_that}")
+
+    corner = mercantile.ul(mercantile.Tile(x=8783, y=5694, z=14))
+    at = {"lng": corner.lng + 0.0004, "lat": corner.lat - 0.0003}
+
+    generator = numpy.random.default_rng(0)
+    images = [
+        (image_id + 1, longitude, latitude, angle)
+        for image_id, (longitude, latitude, angle) in enumerate(
+            zip(
+                generator.uniform(corner.lng - 0.01, corner.lng + 0.01, 3000),
+                generator.uniform(corner.lat - 0.007, corner.lat + 0.007, 3000),
+                generator.uniform(0, 360, 3000),
+            )
+        )
+    ]
+
+    tile_server.images = images
+
+    features = mly.interface.get_image_looking_at(at=at, max_distance=300).to_dict()[
+        "features"
+    ]
+
+    target = Feature(geometry=Point((at["lng"], at["lat"])))
+    expected_ids = {
+        image_id
+        for image_id, longitude, latitude, angle in images
+        if haversine.haversine((at["lat"], at["lng"]), (latitude, longitude), unit="m") < 300
+        and is_looking_at(
+            Feature(
+                geometry=Point((longitude, latitude)),
+                properties={"compass_angle": angle, "is_pano": False},
+            ),
+            target,
+        )
+    }
+    actual = {feature["properties"]["id"] for feature in features}
+
+    # The images of the four tiles around the corner
+    tiles = {
+        mercantile.tile(*feature["geometry"]["coordinates"][:2], 14) for feature in features
+    }
+
+    assert actual == expected_ids, f"{test_that} failed, got {actual ^ expected_ids}"
+    assert len(tiles) == 4, f"{test_that} failed, got {tiles}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.is_image_being_looked_at(..., max_distance=300)",
+            "the answer of get_image_looking_at, from the closest tile only when it has one",
+        )
+    ],
+)
+def test_is_image_being_looked_at_stops_early(tile_server, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} gives {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[is_image_being_looked_at] Test that {test_that}")
+
+    corner = mercantile.ul(mercantile.Tile(x=8783, y=5694, z=14))
+
+    generator = numpy.random.default_rng(1)
+    images = [
+        (image_id + 1, longitude, latitude, angle)
+        for image_id, (longitude, latitude, angle) in enumerate(
+            zip(
+                generator.uniform(corner.lng - 0.01, corner.lng + 0.01, 60),
+                generator.uniform(corner.lat - 0.007, corner.lat + 0.007, 60),
+                generator.uniform(0, 360, 60),
+            )
+        )
+    ]
+
+    tile_server.images = images
+
+    for offset in range(-10, 11):
+        at = {"lng": corner.lng + offset * 0.0008, "lat": corner.lat - offset * 0.0005}
+
+        for filters in ({}, {"image_type": "flat", "min_captured_at": "2020-01-01"}):
+            tile_server.reset()
+
+            looked_at = mly.interface.is_image_being_looked_at(
+                at=at, max_distance=300, **filters
+            )
+            fetched = len(tile_server.requested)
+
+            features = mly.interface.get_image_looking_at(
+                at=at, max_distance=300, **filters
+            ).to_dict()["features"]
+
+            assert looked_at == bool(features), f"{test_that} failed at {at}"
+
+            # The tile containing 'at' comes first
+            if any(
+                mercantile.tile(*feature["geometry"]["coordinates"][:2], 14)
+                == mercantile.tile(at["lng"], at["lat"], 14)
+                for feature in features
+            ):
+                assert fetched == 1, f"{test_that} failed, got {fetched} requests"
+
+
+@pytest.mark.parametrize(
+    "organization_id, expected",
+    [("42", True), (42, True), (["7", "42"], True), ("7", False)],
+)
+def test_is_image_being_looked_at_by_an_organization(tile_server, organization_id, expected):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.is_image_being_looked_at(..., organization_id={organization_id!r})"
+        f" returns {expected}"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[is_image_being_looked_at] Test that {test_that}")
+
+    at = {"lng": 13.0, "lat": 48.0}
+
+    # Looking south at 'at' from an organization, and north at it from no organization
+    tile_server.images = [
+        (1, 13.0, 48.0005, 180.0, 1609459200000, False, 42),
+        (2, 13.0, 47.9995, 0.0),
+    ]
+
+    looked_at = mly.interface.is_image_being_looked_at(
+        at=at, organization_id=organization_id
+    )
+
+    assert looked_at == expected, f"{test_that} failed, got {looked_at}"
+
+
+@pytest.mark.parametrize(
+    "order",
+    [None, "center", "newest"],
+)
+def test_images_in_bbox_with_a_limit(tile_server, monkeypatch, order):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.images_in_bbox(..., limit=25, order={order!r}) returns the first 25"
+        " images in that order, stopping the fetching early unless ordered by time"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[images_in_bbox] Test that {test_that}")
+
+    bbox = {"west": 12.9, "south": 47.95, "east": 13.1, "north": 48.05}
+
+    generator = numpy.random.default_rng(0)
+    images = [
+        (image_id + 1, longitude, latitude, 0.0, int(captured_at))
+        for image_id, (longitude, latitude, captured_at) in enumerate(
+            zip(
+                generator.uniform(12.9, 13.1, 2000),
+                generator.uniform(47.95, 48.05, 2000),
+                generator.uniform(1.5e12, 1.6e12, 2000),
+            )
+        )
+    ]
+
+    tile_server.images = images
+    monkeypatch.setattr(Config, "use_tile_pruning", False)
+
+    features = json.loads(
+        mly.interface.images_in_bbox(bbox=bbox, limit=25, order=order, image_type="flat")
+    )["features"]
+    actual = [feature["properties"]["id"] for feature in features]
+
+    tiles = list(mercantile.tiles(12.9, 47.95, 13.1, 48.05, zooms=14))
+
+    if order == "center":
+        distances = {
+            image_id: haversine.haversine((48.0, 13.0), (latitude, longitude), unit="m")
+            for image_id, longitude, latitude, *_ in images
+        }
+        assert actual == sorted(distances, key=distances.get)[:25], f"{test_that} failed"
+
+    if order == "newest":
+        captured_at = {image_id: value for image_id, *_, value in images}
+        assert actual == sorted(captured_at, key=captured_at.get, reverse=True)[
+            :25
+        ], f"{test_that} failed, got {actual}"
+        assert len(tile_server.requested) == len(tiles), f"{test_that} failed"
+    else:
+        requested = tile_server.requested
+        assert len(requested) < len(tiles) / 2, f"{test_that} failed, got {len(requested)}"
+
+    assert len(actual) == len(set(actual)) == 25, f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "image_type",
+    [None, "pano", "flat"],
+)
+def test_images_in_regions(tile_server, monkeypatch, image_type):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.images_in_regions(..., image_type={image_type!r}) over overlapping"
+        " regions returns the images of that type in each region, each shared tile fetched once"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[images_in_regions] Test that {test_that}")
+
+    generator = numpy.random.default_rng(0)
+    images = [
+        (image_id + 1, longitude, latitude, 0.0, 1609459200000, image_id % 3 == 0)
+        for image_id, (longitude, latitude) in enumerate(
+            zip(generator.uniform(12.9, 13.1, 3000), generator.uniform(47.95, 48.05, 3000))
+        )
+    ]
+
+    triangle = [[12.95, 47.97], [13.08, 47.98], [13.0, 48.04], [12.95, 47.97]]
+    regions = [
+        {"west": 12.9, "south": 47.95, "east": 13.0, "north": 48.0},
+        {"west": 12.95, "south": 47.96, "east": 13.05, "north": 48.02},
+        {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {},
+                    "geometry": {"type": "Polygon", "coordinates": [triangle]},
+                }
+            ],
+        },
+    ]
+
+    tile_server.images = images
+    monkeypatch.setattr(Config, "use_tile_pruning", False)
+
+    results = mly.interface.images_in_regions(
+        regions=regions,
+        # Leaving the image_type out when it is None, for both image types
+        **({"image_type": image_type} if image_type is not None else {}),
+    )
+
+    shapes = [
+        shapely.geometry.box(*[region[key] for key in ["west", "south", "east", "north"]])
+        for region in regions[:2]
+    ] + [shapely.geometry.Polygon(triangle)]
+
+    for shape, result in zip(shapes, results):
+        actual = sorted(feature["properties"]["id"] for feature in result.to_dict()["features"])
+        expected_ids = sorted(
+            image_id
+            for image_id, longitude, latitude, *_, is_pano in images
+            if shape.intersects(shapely.geometry.Point(longitude, latitude))
+            and (image_type is None or is_pano == (image_type == "pano"))
+        )
+
+        assert actual == expected_ids, f"{test_that} failed, got {actual}"
+
+    # The tiles of the regions, one region at a time
+    tiles = [set(mercantile.tiles(*shape.bounds, zooms=14)) for shape in shapes]
+
+    requested = tile_server.requested
+    assert len(requested) == len(set(requested)), f"{test_that} failed, got {requested}"
+    assert len(requested) <= len(set.union(*tiles)) < sum(
+        len(region_tiles) for region_tiles in tiles
+    ), f"{test_that} failed, got {len(requested)}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            'mly.interface.images_in_shape(..., image_type="all", max_captured_at=...,'
+            " organization_id=[42])",
+            "the images of the organization captured before that date, panoramas included",
+        )
+    ],
+)
+def test_images_in_shape_with_filters(tile_server, monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} returns {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[images_in_shape] Test that {test_that}")
+
+    generator = numpy.random.default_rng(2)
+    images = [
+        (
+            image_id + 1,
+            longitude,
+            latitude,
+            0.0,
+            # Either at the start of 2021 or of 2022
+            1609459200000 + (image_id % 2) * 31536000000,
+            image_id % 3 == 0,
+            42 if image_id % 5 else 7,
+        )
+        for image_id, (longitude, latitude) in enumerate(
+            zip(generator.uniform(12.9, 13.1, 500), generator.uniform(47.95, 48.05, 500))
+        )
+    ]
+
+    triangle = [[12.95, 47.97], [13.08, 47.98], [13.0, 48.04], [12.95, 47.97]]
+    shape = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {},
+                "geometry": {"type": "Polygon", "coordinates": [triangle]},
+            }
+        ],
+    }
+
+    tile_server.images = images
+    monkeypatch.setattr(Config, "use_tile_pruning", False)
+
+    features = mly.interface.images_in_shape(
+        shape=shape,
+        image_type="all",
+        max_captured_at="2021-06-01",
+        organization_id=[42],
+    ).to_dict()["features"]
+
+    actual = sorted(feature["properties"]["id"] for feature in features)
+    expected_ids = sorted(
+        image_id
+        for image_id, longitude, latitude, _, captured_at, _, organization_id in images
+        if shapely.geometry.Polygon(triangle).contains(shapely.geometry.Point(longitude, latitude))
+        and captured_at == 1609459200000
+        and organization_id == 42
+    )
+
+    assert actual == expected_ids, f"{test_that} failed, got {actual}"
+    assert any(
+        feature["properties"]["is_pano"] for feature in features
+    ), f"{test_that} failed, got no panoramas"
+
+
+@pytest.mark.parametrize(
+    "extension, partition_by",
+    [
+        ("csv", None),
+        ("csv", "quadkey"),
+        ("geojson", None),
+        ("geojsonl", None),
+        ("sqlite", None),
+        ("geojson", "quadkey"),
+    ],
+)
+def test_save_locally_with_fields(tmp_path, monkeypatch, extension, partition_by):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.save_locally(..., extension={extension!r}, fields=[...],"
+        f" partition_by={partition_by!r}) writes the fields of the tabular formats, and"
+        " raises an InvalidOptionError for the others"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[save_locally] Test that {test_that}")
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [13.0, 48.0]},
+                "properties": {"id": 1, "captured_at": 1609459200000, "is_pano": False},
+            }
+        ],
+    }
+
+    def save():
+        return mly.interface.save_locally(
+            geojson_data=data,
+            file_path=str(tmp_path),
+            file_name="images",
+            extension=extension,
+            fields=["captured_at"],
+            partition_by=partition_by,
+        )
+
+    if extension != "csv":
+        with pytest.raises(mly.models.exceptions.InvalidOptionError):
+            save()
+        return
+
+    save()
+
+    path = (
+        tmp_path / "images.csv"
+        if partition_by is None
+        else next((tmp_path / "images").glob("*/*.csv"))
+    )
+    columns = list(pd.read_csv(path).columns)
+
+    assert columns == ["ID", "WKT", "captured_at"], f"{test_that} failed, got {columns}"
+
+
+@pytest.mark.parametrize(
+    "extension, source",
+    [
+        ("geojson", "dictionary"),
+        ("geojson", "generator"),
+        ("geojson.gz", "dictionary"),
+    ],
+)
+def test_save_locally_as_geojson(tmp_path, monkeypatch, extension, source):
+
+    # Operation to test
+    test_that = (
+        f"mly.interface.save_locally(..., extension={extension!r}) of a {source}, written a"
+        " chunk of features at a time, writes the GeoJSON as json.dumps would"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[save_locally] Test that {test_that}")
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [13.0 + image_id, 48.0]},
+                "properties": {"id": image_id, "sequence_id": "séquence", "is_pano": False},
+            }
+            for image_id in range(5)
+        ],
+    }
+
+    mly.interface.save_locally(
+        geojson_data=data if source == "dictionary" else iter(data["features"]),
+        file_path=str(tmp_path),
+        file_name="images",
+        extension=extension,
+        chunk_size=2,
+    )
+
+    with (
+        gzip.open(tmp_path / "images.geojson.gz", "rt", encoding="utf-8")
+        if extension.endswith(".gz")
+        else open(tmp_path / "images.geojson", encoding="utf-8")
+    ) as file:
+        actual = file.read()
+
+    assert actual == json.dumps(
+        data, indent=4, ensure_ascii=False
+    ), f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.save_locally(..., partition_by='quadkey', buffer_size=50)",
+            "every feature in part files of the buffered sizes, listed in the manifest",
+        )
+    ],
+)
+def test_save_locally_partitioned(tmp_path, monkeypatch, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} writes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[save_locally] Test that {test_that}")
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+
+    # Images spread over many quadkeys, none of which fills a part file on its own
+    generator = numpy.random.default_rng(0)
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+            "properties": {"id": image_id + 1},
+        }
+        for image_id, (longitude, latitude) in enumerate(
+            zip(generator.uniform(-60, 60, 1000), generator.uniform(-60, 60, 1000))
+        )
+    ]
+
+    manifest = mly.interface.save_locally(
+        geojson_data=iter(features),
+        file_path=str(tmp_path),
+        file_name="images",
+        extension="geojsonl",
+        partition_by="quadkey",
+        zoom=3,
+        part_size=1000,
+        buffer_size=50,
+    )
+
+    written = {}
+    for partition in manifest["partitions"]:
+        for part in partition["files"]:
+            with open(tmp_path / "images" / partition["path"] / part) as file:
+                written[part, partition["path"]] = [json.loads(line) for line in file]
+
+    sizes = [len(part) for part in written.values()]
+
+    assert sorted(
+        feature["properties"]["id"] for part in written.values() for feature in part
+    ) == list(range(1, 1001)), f"{test_that} failed"
+    assert manifest["count"] == 1000, f"{test_that} failed, got {manifest['count']}"
+    assert max(sizes) <= 50 and len(sizes) > len(manifest["partitions"]), f"{test_that} failed"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "mly.interface.save_locally(..., partition_by='month') with a failing part file",
+            "the error, and no manifest",
+        )
+    ],
+)
+def test_save_locally_partitioned_with_a_failing_part(
+    tmp_path, monkeypatch, operation, expected
+):
+
+    # Operation to test
+    test_that = f"{operation} raises {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[save_locally] Test that {test_that}")
+
+    monkeypatch.setattr(Client, "_Client__access_token", "MLY|TEST")
+
+    def failing_chunks(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("mapillary.controller.save.geojson_chunks", failing_chunks)
+
+    with pytest.raises(OSError):
+        mly.interface.save_locally(
+            geojson_data={
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {"type": "Point", "coordinates": [13.0, 48.0]},
+                        "properties": {"id": 1, "captured_at": 1609459200000},
+                    }
+                ],
+            },
+            file_path=str(tmp_path),
+            file_name="images",
+            extension="geojson",
+            partition_by="month",
+        )
+
+    assert not (tmp_path / "images" / "_manifest.json").exists(), f"{test_that} failed"
@@ -10,8 +10,17 @@ This module loads the modules under src/mapillary/utils for tests
 :license: MIT LICENSE
 """
 
+# Codec testing
+from . import test_codec  # noqa: F401
+
 # Exraction testing
 from . import test_extract  # noqa: F401
 
 # Filter testing
 from . import test_filter  # noqa: F401
+
+# Format testing
+from . import test_format  # noqa: F401
+
+# Spatial testing
+from . import test_spatial  # noqa: F401
@@ -0,0 +1,107 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.utils.test_codec
+~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the functions under mapillary/utils/codec.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import io
+import json
+import logging  # Logger
+
+import pytest
+
+# Local imports
+from mapillary.models.config import Config
+from mapillary.models.geojson import GeoJSON
+from mapillary.utils import codec
+
+logger = logging.getLogger(__name__)
+
+geojson = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [12.954940544167, 48.0537894275],
+            },
+            "properties": {
+                "id": 1,
+                "compass_angle": 123.456789,
+                "sequence_id": "séquence",
+            },
+        }
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "operation, json_codec",
+    [
+        ("GeoJSON(...).encode(precision=5)", "json"),
+        ("GeoJSON(...).encode(precision=5)", "orjson"),
+    ],
+)
+def test_encode_geojson(monkeypatch, operation, json_codec):
+
+    # The orjson backend is only tested when it is installed
+    if json_codec == "orjson":
+        pytest.importorskip("orjson")
+
+    monkeypatch.setattr(Config, "json_codec", json_codec)
+
+    # Operation to test
+    test_that = f"{operation} with the {json_codec} backend rounds the coordinates only"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_encode_geojson] Test that {test_that}")
+
+    encoded = GeoJSON(geojson=geojson).encode(precision=5)
+
+    assert encoded == (
+        '{"type":"FeatureCollection","features":[{"type":"Feature","geometry":'
+        '{"type":"Point","coordinates":[12.95494,48.05379]},"properties":'
+        '{"compass_angle":123.456789,"id":1,"sequence_id":"séquence"}}]}'
+    ), f"{test_that} failed, got {encoded}"
+
+
+@pytest.mark.parametrize(
+    "operation, json_codec",
+    [
+        ("codec.dump(...) then codec.loads(...)", "json"),
+        ("codec.dump(...) then codec.loads(...)", "orjson"),
+    ],
+)
+def test_round_trip(monkeypatch, operation, json_codec):
+
+    if json_codec == "orjson":
+        pytest.importorskip("orjson")
+
+    monkeypatch.setattr(Config, "json_codec", json_codec)
+
+    # Operation to test
+    test_that = f"{operation} with the {json_codec} backend gives back the GeoJSON"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_round_trip] Test that {test_that}")
+
+    binary, text = io.BytesIO(), io.StringIO()
+
+    # The GeoJSON models are encoded as their dictionaries
+    codec.dump(GeoJSON(geojson=geojson), binary)
+    codec.dump(geojson, text, indent=4)
+
+    assert codec.loads(binary.getvalue()) == geojson, f"{test_that} failed"
+    assert codec.loads(memoryview(binary.getvalue())) == geojson, f"{test_that} failed"
+    assert text.getvalue() == json.dumps(
+        geojson, indent=4, ensure_ascii=False
+    ), f"{test_that} failed, got {text.getvalue()}"
@@ -0,0 +1,353 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.utils.test_format
+~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the functions under mapillary/utils/format.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import copy
+import csv
+import gzip
+import io
+import json
+import logging  # Logger
+
+import pytest
+from shapely.geometry import shape
+
+# Local imports
+from mapillary.controller.save import (
+    save_as_csv_controller,
+    save_as_geojsonl_controller,
+    save_as_parquet_controller,
+    save_partitioned_controller,
+)
+from mapillary.utils.format import (
+    decode_pixel_geometries,
+    decode_pixel_geometry,
+    flatten_geojson,
+    geometry_to_wkt,
+)
+
+logger = logging.getLogger(__name__)
+
+feature_collection = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [12.4823, 41.8954]},
+            "properties": {"id": 1, "captured_at": 1610000000000},
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [12.0, -0.000012]},
+            "properties": {"id": 2, "value": "object--bench", "organization_id": 7},
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [feature["geometry"] for feature in feature_collection["features"]],
+)
+def test_point_wkt_matches_shapely(geometry):
+
+    # Operation to test
+    test_that = f"geometry_to_wkt({geometry}) == shape(geometry).wkt"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_point_wkt_matches_shapely] Test that {test_that}")
+
+    actual = geometry_to_wkt(geometry)
+
+    assert actual == shape(geometry).wkt, f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("save_as_csv_controller(iter(features), ...)", "the columns of every feature")],
+)
+def test_csv_header_covers_every_feature(tmp_path, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} writes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_csv_header_covers_every_feature] Test that {test_that}")
+
+    original = copy.deepcopy(feature_collection)
+
+    flatten_geojson(feature_collection)
+    save_as_csv_controller(
+        data=iter(feature_collection["features"]), path=str(tmp_path), file_name="test"
+    )
+
+    assert feature_collection == original, f"{test_that} failed, the input was modified"
+
+    with open(tmp_path / "test.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+
+    assert list(rows[0].keys()) == [
+        "ID",
+        "WKT",
+        "captured_at",
+        "longitude",
+        "latitude",
+        "value",
+        "organization_id",
+    ], f"{test_that} failed, got {list(rows[0].keys())}"
+
+    assert rows[1]["value"] == "object--bench", f"{test_that} failed, got {rows[1]}"
+    assert rows[0]["organization_id"] == "NULL", f"{test_that} failed, got {rows[0]}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("save_as_parquet_controller(iter(features), ...)", "typed GeoParquet columns")],
+)
+def test_parquet_columns_are_typed(tmp_path, operation, expected):
+
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    # Operation to test
+    test_that = f"{operation} writes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_parquet_columns_are_typed] Test that {test_that}")
+
+    save_as_parquet_controller(
+        data=iter(feature_collection["features"]), path=str(tmp_path), file_name="test"
+    )
+
+    table = pq.read_table(tmp_path / "test.parquet")
+    types = {field.name: str(field.type) for field in table.schema}
+
+    assert types == {
+        "id": "int64",
+        "captured_at": "timestamp[ms, tz=UTC]",
+        "value": "string",
+        "organization_id": "int64",
+        "geometry": "binary",
+    }, f"{test_that} failed, got {types}"
+
+    assert (
+        shape(feature_collection["features"][0]["geometry"]).wkb
+        == table.column("geometry")[0].as_py()
+    ), f"{test_that} failed, got {table.column('geometry')}"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("save_as_geojsonl_controller(..., append=True)", "one feature per line")],
+)
+def test_geojsonl_append_resumes_the_file(tmp_path, operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} writes {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_geojsonl_append_resumes_the_file] Test that {test_that}")
+
+    first, second = feature_collection["features"]
+
+    save_as_geojsonl_controller(data=[first], path=str(tmp_path), file_name="test")
+
+    # Simulate a crawl interrupted in the middle of a line
+    with open(tmp_path / "test.geojsonl", "a") as file:
+        file.write('{"type": "Feat')
+
+    save_as_geojsonl_controller(
+        data=iter([second]), path=str(tmp_path), file_name="test", append=True
+    )
+
+    with open(tmp_path / "test.geojsonl") as file:
+        actual = [json.loads(line) for line in file]
+
+    assert actual == [first, second], f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "compression, suffix",
+    [("gzip", ".gz"), ("zstd", ".zst")],
+)
+def test_compressed_outputs_round_trip(tmp_path, compression, suffix):
+
+    # Operation to test
+    test_that = (
+        f"save_as_geojsonl_controller(..., compression='{compression}') round trips"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_compressed_outputs_round_trip] Test that {test_that}")
+
+    if compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+
+    first, second = feature_collection["features"]
+
+    # Appending adds a new member, or frame, to the compressed stream
+    for feature in [first, second]:
+        save_as_geojsonl_controller(
+            data=[feature],
+            path=str(tmp_path),
+            file_name="test",
+            append=True,
+            compression=compression,
+        )
+
+    path = tmp_path / f"test.geojsonl{suffix}"
+
+    if compression == "gzip":
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            actual = [json.loads(line) for line in file]
+    else:
+        with open(path, "rb") as file:
+            reader = zstandard.ZstdDecompressor().stream_reader(
+                file, read_across_frames=True
+            )
+            actual = [json.loads(line) for line in io.TextIOWrapper(reader)]
+
+    assert actual == [first, second], f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "partition_by, expected",
+    [
+        ("quadkey", ["quadkey=12023222", "quadkey=30001000"]),
+        ("month", ["captured_month=2021-01", "captured_month=__HIVE_DEFAULT_PARTITION__"]),
+    ],
+)
+def test_partitioned_export_writes_a_manifest(tmp_path, partition_by, expected):
+
+    # Operation to test
+    test_that = f"save_partitioned_controller(..., partition_by='{partition_by}') splits"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_partitioned_export_writes_a_manifest] Test that {test_that}")
+
+    manifest = save_partitioned_controller(
+        data=feature_collection,
+        path=str(tmp_path),
+        file_name="dataset",
+        extension="geojsonl",
+        partition_by=partition_by,
+        zoom=8,
+        workers=2,
+    )
+
+    paths = [partition["path"] for partition in manifest["partitions"]]
+
+    assert paths == expected, f"{test_that} failed, got {paths}"
+    assert manifest["count"] == 2, f"{test_that} failed, got {manifest}"
+
+    with open(tmp_path / "dataset" / "_manifest.json") as file:
+        assert json.load(file) == manifest, f"{test_that} failed"
+
+    # Each feature lands in its own partition
+    for partition, feature in zip(
+        manifest["partitions"], feature_collection["features"]
+    ):
+        with open(
+            tmp_path / "dataset" / partition["path"] / partition["files"][0]
+        ) as file:
+            actual = [json.loads(line) for line in file]
+
+        assert actual == [feature], f"{test_that} failed, got {actual}"
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "LineString", "coordinates": [[12.5, 41.9], [-0.5, -0.5]]},
+        {
+            "type": "Polygon",
+            "coordinates": [[[12.5, 41.9], [-0.5, -0.5], [12.5, -0.5], [12.5, 41.9]]],
+        },
+    ],
+)
+def test_partitions_by_the_first_position(tmp_path, geometry):
+
+    # Operation to test
+    test_that = (
+        f"save_partitioned_controller(..., partition_by='quadkey') puts a {geometry['type']}"
+        " in the quadkey of its first position, not of its south-west corner"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_partitions_by_the_first_position] Test that {test_that}")
+
+    manifest = save_partitioned_controller(
+        data={
+            "type": "FeatureCollection",
+            "features": [{"type": "Feature", "geometry": geometry, "properties": {"id": 1}}],
+        },
+        path=str(tmp_path),
+        file_name="dataset",
+        extension="geojsonl",
+        partition_by="quadkey",
+        zoom=8,
+        workers=2,
+    )
+
+    paths = [partition["path"] for partition in manifest["partitions"]]
+
+    assert paths == ["quadkey=12023222"], f"{test_that} failed, got {paths}"
+
+
+@pytest.mark.parametrize(
+    "normalized, workers",
+    [(True, None), (False, None), (True, 2)],
+)
+def test_batch_pixel_geometry_decoding(normalized, workers):
+
+    # Operation to test
+    test_that = (
+        f"decode_pixel_geometries(..., normalized={normalized}, workers={workers}) matches "
+        "decode_pixel_geometry"
+    )
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_batch_pixel_geometry_decoding] Test that {test_that}")
+
+    pixel_geometry = (
+        "GjUKBm1weS1vchIVEgIAABgDIg0JhiekKBoqAABKKQAPGgR0eXBlIgkKB3BvbHlnb24ogCB4AQ=="
+    )
+
+    detections = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": {}, "properties": {"pixel_geometry": value}}
+            for value in [pixel_geometry, None, pixel_geometry]
+        ],
+    }
+
+    decoded = decode_pixel_geometries(
+        detections, normalized=normalized, workers=workers
+    )
+
+    expected = [[2499, 1518], [2520, 1518], [2520, 1481], [2499, 1481], [2499, 1518]]
+
+    if normalized:
+        expected = [[x / 4096, y / 4096] for x, y in expected]
+
+    assert len(decoded) == 3 and decoded[1] == [], f"{test_that} failed, got {decoded}"
+
+    for arrays in (decoded[0], decoded[2]):
+        assert [array.tolist() for array in arrays] == [
+            expected
+        ], f"{test_that} failed, got {arrays}"
+
+    # The pixel coordinates are those of the single detection decoder
+    if not normalized:
+        assert decode_pixel_geometry(pixel_geometry, normalized=False) == {
+            "coordinates": [expected]
+        }, f"{test_that} failed"
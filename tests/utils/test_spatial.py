@@ -0,0 +1,145 @@
+# Copyright (c) Facebook, Inc. and its affiliates. (http://www.facebook.com)
+# -*- coding: utf-8 -*-
+
+"""
+tests.utils.test_spatial
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+For testing the functions under mapillary/utils/spatial.py
+
+:copyright: (c) 2021 Facebook
+:license: MIT LICENSE
+"""
+
+# Package imports
+import logging  # Logger
+
+import haversine
+import numpy
+import pytest
+from geojson import Feature, Point
+
+# Local imports
+from mapillary.utils.filter import is_looking_at
+from mapillary.utils.spatial import (
+    coordinates_array,
+    haversine_distances,
+    looking_at,
+    route_distances,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("haversine_distances(...)", "the distances of the haversine package")],
+)
+def test_haversine_distances(operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} gives {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_haversine_distances] Test that {test_that}")
+
+    features = [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lng, lat]}}
+        for lng, lat in [(13.0, 48.0), (13.05, 48.02), (-70.5, -33.4), (179.9, 0.1)]
+    ]
+
+    coordinates = coordinates_array(features)
+    distances = haversine_distances(13.01, 48.01, coordinates)
+
+    expected_distances = [
+        haversine.haversine((48.01, 13.01), (lat, lng), unit="m")
+        for lng, lat in coordinates
+    ]
+
+    assert coordinates.shape == (4, 2), f"{test_that} failed, got {coordinates.shape}"
+    assert numpy.allclose(
+        distances, expected_distances
+    ), f"{test_that} failed, got {distances}"
+    assert coordinates_array([]).shape == (0, 2), f"{test_that} failed"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("route_distances(...)", "the distances to, and positions along, a sampled route")],
+)
+def test_route_distances(operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} gives {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_route_distances] Test that {test_that}")
+
+    route = numpy.array([[13.0, 48.0], [13.01, 48.0], [13.01, 48.01], [13.03, 48.02]])
+
+    # The route, sampled every few centimeters, with the length of the route up to each sample
+    samples = numpy.concatenate(
+        [numpy.linspace(start, end, 20000) for start, end in zip(route[:-1], route[1:])]
+    )
+    lengths = numpy.concatenate(
+        [[0.0], numpy.cumsum(haversine_distances(samples[:-1, 0], samples[:-1, 1], samples[1:]))]
+    )
+
+    generator = numpy.random.default_rng(0)
+    coordinates = numpy.column_stack(
+        [generator.uniform(12.99, 13.04, 50), generator.uniform(47.99, 48.03, 50)]
+    )
+
+    distances, positions = route_distances(coordinates=coordinates, route=route)
+
+    for (longitude, latitude), distance, position in zip(coordinates, distances, positions):
+        sampled = haversine_distances(longitude, latitude, samples)
+        closest = numpy.argmin(sampled)
+
+        assert abs(distance - sampled[closest]) < 0.5, f"{test_that} failed, got {distance}"
+
+        # Where two parts of the route are about as close, either position is right
+        if numpy.sum(sampled < sampled[closest] + 1.0) < 100:
+            assert abs(position - lengths[closest]) < 1.0, f"{test_that} failed"
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [("looking_at(...)", "the images that is_looking_at tells look at the target")],
+)
+def test_looking_at(operation, expected):
+
+    # Operation to test
+    test_that = f"{operation} gives {expected}"
+
+    # Logging the intended operation to be tested
+    logger.info(f"\n[test_looking_at] Test that {test_that}")
+
+    generator = numpy.random.default_rng(0)
+    coordinates = numpy.column_stack(
+        [generator.uniform(12.9, 13.1, 500), generator.uniform(47.9, 48.1, 500)]
+    )
+    compass_angles = generator.uniform(-10, 360, 500)
+    panoramas = generator.random(500) < 0.1
+
+    hits = looking_at(
+        coordinates=coordinates,
+        compass_angles=compass_angles,
+        panoramas=panoramas,
+        longitude=13.0,
+        latitude=48.0,
+    )
+
+    target = Feature(geometry=Point((13.0, 48.0)))
+    expected_hits = [
+        is_looking_at(
+            Feature(
+                geometry=Point(tuple(point)),
+                properties={"compass_angle": angle, "is_pano": bool(panorama)},
+            ),
+            target,
+        )
+        for point, angle, panorama in zip(coordinates, compass_angles, panoramas)
+    ]
+
+    assert hits.tolist() == expected_hits, f"{test_that} failed"